@@ -1,114 +1,731 @@
 # framework/
 # ├── base/
 # │   ├── __init__.py
+# │   ├── async_base_page.py
 # │   ├── base_page.py
-# │   └── base_test.py
+# │   ├── base_test.py
+# │   └── wait_engine.py
+# ├── benchmarks/
+# │   ├── __init__.py
+# │   ├── bench_framework.py
+# │   └── static_server.py
 # ├── config/
 # │   ├── __init__.py
 # │   └── config.py
 # ├── pages/
 # │   ├── __init__.py
+# │   ├── async_home_page.py
+# │   ├── async_login_page.py
 # │   ├── home_page.py
-# │   └── login_page.py
+# │   ├── login_page.py
+# │   └── registration_page.py
 # ├── tests/
 # │   ├── __init__.py
-# │   └── test_login.py
+# │   ├── data/
+# │   │   └── registration_cases.yaml
+# │   ├── test_artifacts.py
+# │   ├── test_async_webdriver.py
+# │   ├── test_auth.py
+# │   ├── test_backend_stub.py
+# │   ├── test_base_page.py
+# │   ├── test_bench_framework.py
+# │   ├── test_browser_contexts.py
+# │   ├── test_driver_pool.py
+# │   ├── test_driver_startup.py
+# │   ├── test_form_matrix.py
+# │   ├── test_grid.py
+# │   ├── test_locator_analyzer.py
+# │   ├── test_login.py
+# │   ├── test_login_async.py
+# │   ├── test_login_page.py
+# │   ├── test_logger.py
+# │   ├── test_parallel_runner.py
+# │   ├── test_registration_matrix.py
+# │   ├── test_registration_page.py
+# │   ├── test_result_cache.py
+# │   ├── test_scheduler.py
+# │   ├── test_stream_reporter.py
+# │   ├── test_tracer.py
+# │   ├── test_visual.py
+# │   └── test_wait_engine.py
 # ├── utils/
 # │   ├── __init__.py
+# │   ├── artifacts.py
+# │   ├── async_webdriver.py
+# │   ├── auth.py
+# │   ├── backend_stub.py
+# │   ├── browser_contexts.py
 # │   ├── driver_factory.py
-# │   └── logger.py
+# │   ├── driver_pool.py
+# │   ├── driver_startup.py
+# │   ├── form_matrix.py
+# │   ├── grid.py
+# │   ├── locator_analyzer.py
+# │   ├── logger.py
+# │   ├── parallel_runner.py
+# │   ├── profiler.py
+# │   ├── result_cache.py
+# │   ├── scheduler.py
+# │   ├── stream_reporter.py
+# │   ├── tracer.py
+# │   └── visual.py
 # ├── conftest.py
 # └── requirements.txt
 
+# base/wait_engine.py
+import logging
+import time
+from selenium.common.exceptions import (
+    JavascriptException, StaleElementReferenceException, TimeoutException, WebDriverException
+)
+from utils.profiler import Profiler
+
+# Поиск первого элемента по локатору Selenium (By, значение) внутри страницы
+FIND_ELEMENT_SCRIPT = """
+        function find(by, value) {
+            switch (by) {
+                case 'id': return document.getElementById(value);
+                case 'css selector': return document.querySelector(value);
+                case 'xpath': return document.evaluate(value, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                case 'class name': return document.getElementsByClassName(value)[0] || null;
+                case 'name': return document.getElementsByName(value)[0] || null;
+                case 'tag name': return document.getElementsByTagName(value)[0] || null;
+                case 'link text': return Array.prototype.find.call(document.links,
+                    function (a) { return a.textContent.trim() === value; }) || null;
+                case 'partial link text': return Array.prototype.find.call(document.links,
+                    function (a) { return a.textContent.indexOf(value) !== -1; }) || null;
+            }
+            return null;
+        }
+"""
+
+class WaitEngine:
+    """Ожидание условий на странице по событиям DOM.
+    
+    Скрипт, установленный через execute_async_script, подписывается на
+    MutationObserver и readystatechange и возвращает результат сразу после
+    выполнения условия. Если браузер не поддерживает асинхронные скрипты,
+    используется опрос с растущим интервалом.
+    """
+    
+    PRESENT = "present"
+    VISIBLE = "visible"
+    # Элемента нет в DOM или он не виден
+    HIDDEN = "hidden"
+    PAGE_LOADED = "page_loaded"
+    
+    EVENT = "event"
+    POLL = "poll"
+    
+    # Настройки по умолчанию, переопределяются из Config через configure()
+    strategy = EVENT
+    poll_interval = 0.05
+    max_poll_interval = 0.5
+    
+    # Одно ожидание в браузере короче стандартного таймаута скриптов (30 с)
+    MAX_SCRIPT_WAIT = 20
+    # Сколько ошибок JavaScript подряд допускается до перехода на опрос
+    MAX_SCRIPT_ERRORS = 3
+    
+    WAIT_SCRIPT = FIND_ELEMENT_SCRIPT + """
+        var conditions = arguments[0], timeoutMs = arguments[1];
+        var done = arguments[arguments.length - 1];
+        
+        function isVisible(el) {
+            if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+            var style = window.getComputedStyle(el);
+            return style.visibility !== 'hidden' && style.opacity !== '0';
+        }
+        function evaluate(condition) {
+            if (condition.kind === 'page_loaded') return document.readyState === 'complete';
+            var el = find(condition.by, condition.value);
+            if (condition.kind === 'hidden') return el && isVisible(el) ? null : true;
+            if (!el) return null;
+            if (condition.kind === 'visible' && !isVisible(el)) return null;
+            return el;
+        }
+        function check() {
+            for (var i = 0; i < conditions.length; i++) {
+                var result = evaluate(conditions[i]);
+                if (result) return {index: i, element: result === true ? null : result};
+            }
+            return null;
+        }
+        
+        var result = check();
+        if (result) { done(result); return; }
+        
+        var finished = false, scheduled = false;
+        function finish(value) {
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            clearInterval(fallback);
+            document.removeEventListener('readystatechange', onChange);
+            window.removeEventListener('load', onChange);
+            done(value);
+        }
+        function onChange() {
+            if (scheduled || finished) return;
+            scheduled = true;
+            Promise.resolve().then(function () {
+                scheduled = false;
+                var value = check();
+                if (value) finish(value);
+            });
+        }
+        var observer = new MutationObserver(onChange);
+        observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+        document.addEventListener('readystatechange', onChange);
+        window.addEventListener('load', onChange);
+        // CSS-анимации меняют видимость без мутаций DOM
+        var fallback = setInterval(onChange, 100);
+        var timer = setTimeout(function () { finish(null); }, timeoutMs);
+    """
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.logger = logging.getLogger(__name__)
+        self.strategy = WaitEngine.strategy
+        
+    @classmethod
+    def configure(cls, config):
+        """Применить настройки ожиданий из конфигурации."""
+        cls.strategy = config.wait_strategy
+        cls.poll_interval = config.poll_interval
+        cls.max_poll_interval = config.max_poll_interval
+        
+    def until_present(self, locator, timeout):
+        """Дождаться появления элемента в DOM. Вернуть элемент или None."""
+        return self.wait_for([(self.PRESENT, locator)], timeout)[1]
+        
+    def until_visible(self, locator, timeout):
+        """Дождаться видимости элемента. Вернуть элемент или None."""
+        return self.wait_for([(self.VISIBLE, locator)], timeout)[1]
+        
+    def until_hidden(self, locator, timeout):
+        """Дождаться, пока элемент исчезнет или станет невидимым."""
+        return self.wait_for([(self.HIDDEN, locator)], timeout)[0] is not None
+        
+    def until_page_loaded(self, timeout):
+        """Дождаться document.readyState == 'complete'."""
+        return self.wait_for([(self.PAGE_LOADED, None)], timeout)[0] is not None
+        
+    def wait_for(self, conditions, timeout):
+        """Дождаться первого выполненного условия из списка (вид, локатор).
+        
+        Вернуть пару (индекс условия, элемент); для PAGE_LOADED и HIDDEN
+        вместо элемента возвращается True. Если ни одно условие не выполнилось
+        за timeout секунд, вернуть (None, None).
+        """
+        start = time.monotonic()
+        try:
+            deadline = start + timeout
+            if self.strategy == self.EVENT:
+                result = self._wait_for_events(conditions, deadline)
+                if result is not None:
+                    return result
+            return self._poll(conditions, deadline)
+        finally:
+            profiler = Profiler.current()
+            if profiler is not None:
+                profiler.record_wait(time.monotonic() - start)
+        
+    def _wait_for_events(self, conditions, deadline):
+        """Ожидание в браузере. Вернуть None, если нужно перейти к опросу."""
+        payload = [
+            {"kind": kind, "by": locator[0] if locator else None, "value": locator[1] if locator else None}
+            for kind, locator in conditions
+        ]
+        errors = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, None
+            wait_ms = int(min(remaining, self.MAX_SCRIPT_WAIT) * 1000)
+            try:
+                result = self.driver.execute_async_script(self.WAIT_SCRIPT, payload, wait_ms)
+            except TimeoutException:
+                continue
+            except JavascriptException as e:
+                # Обычно страница перезагрузилась во время ожидания - ждём уже на новой
+                errors += 1
+                if errors < self.MAX_SCRIPT_ERRORS:
+                    continue
+                self.logger.warning("Ошибка скрипта ожидания, переключаемся на опрос: %s", e.msg)
+                return None
+            except WebDriverException as e:
+                self.logger.warning("Ожидание по событиям недоступно, переключаемся на опрос: %s", e.msg)
+                self.strategy = self.POLL
+                return None
+            if result:
+                element = result["element"]
+                return result["index"], True if element is None else element
+                
+    def _poll(self, conditions, deadline):
+        """Опрос условий с интервалом, растущим от poll_interval до max_poll_interval."""
+        interval = self.poll_interval
+        while True:
+            for index, (kind, locator) in enumerate(conditions):
+                result = self._check(kind, locator)
+                if result:
+                    return index, result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, None
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 1.5, self.max_poll_interval)
+            
+    def _check(self, kind, locator):
+        """Однократно проверить условие."""
+        try:
+            if kind == self.PAGE_LOADED:
+                return self.driver.execute_script("return document.readyState") == "complete"
+            elements = self.driver.find_elements(*locator)
+            if kind == self.HIDDEN:
+                return not elements or not elements[0].is_displayed()
+            if not elements:
+                return None
+            if kind == self.VISIBLE and not elements[0].is_displayed():
+                return None
+            return elements[0]
+        except StaleElementReferenceException:
+            return None
+
 # base/base_page.py
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import StaleElementReferenceException
+from base.wait_engine import WaitEngine, FIND_ELEMENT_SCRIPT
+from utils.profiler import profiled
+from utils.visual import VisualComparator, VisualResult
 import logging
 
 class BasePage:
     """Базовый класс для всех страниц."""
     
-    def __init__(self, driver):
+    READ_MANY_SCRIPT = FIND_ELEMENT_SCRIPT + """
+        return arguments[0].map(function (locator) {
+            var el = find(locator[0], locator[1]);
+            return el ? el.innerText : null;
+        });
+    """
+    
+    # Значение задаётся через сеттер прототипа, чтобы его заметили
+    # фреймворки, отслеживающие value (например, React)
+    FILL_FORM_SCRIPT = FIND_ELEMENT_SCRIPT + """
+        var fields = arguments[0], nativeTags = ['INPUT', 'TEXTAREA', 'SELECT'];
+        return fields.map(function (field) {
+            var el = find(field[0], field[1]), value = field[2];
+            if (!el) return 'missing';
+            if (nativeTags.indexOf(el.tagName) === -1 || el.type === 'file' || el.readOnly) return 'native';
+            if (el.type === 'checkbox' || el.type === 'radio') {
+                el.checked = Boolean(value);
+            } else {
+                var proto = Object.getPrototypeOf(el);
+                Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+            }
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+            return 'ok';
+        });
+    """
+    
+    # Области игнорируемых элементов в пикселях снимка относительно снимаемого элемента
+    IGNORE_RECTS_SCRIPT = FIND_ELEMENT_SCRIPT + """
+        var origin = arguments[0] ? arguments[0].getBoundingClientRect() : {left: 0, top: 0};
+        var ratio = window.devicePixelRatio || 1, rects = [];
+        arguments[1].forEach(function (locator) {
+            var el = find(locator[0], locator[1]);
+            if (!el) return;
+            var r = el.getBoundingClientRect();
+            rects.push([Math.floor((r.left - origin.left) * ratio), Math.floor((r.top - origin.top) * ratio),
+                        Math.ceil(r.width * ratio), Math.ceil(r.height * ratio)]);
+        });
+        return rects;
+    """
+    
+    def __init__(self, driver, cache_elements=False):
         self.driver = driver
         self.logger = logging.getLogger(__name__)
+        self.waits = WaitEngine(driver)
         
+        # Кэш найденных элементов по локатору (включается явно)
+        self.cache_elements = cache_elements
+        self._element_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_stale = 0
+        
+    @profiled("open")
     def open(self, url):
         """Открыть указанный URL."""
         self.driver.get(url)
-        self.logger.info(f"Открыта страница: {url}")
+        self.invalidate_cache()
+        self.logger.info("Открыта страница: %s", url)
         
+    @profiled("find_element")
     def find_element(self, locator, timeout=10):
-        """Найти элемент по локатору с ожиданием."""
+        """Найти элемент по локатору с ожиданием.
+        
+        Элемент всегда ищется заново: кэш используется только действиями
+        страницы, которые умеют повторить поиск устаревшего элемента.
+        """
+        element = self.waits.until_present(locator, timeout)
+        if element is None:
+            self.logger.error("Элемент %s не найден за %s секунд", locator, timeout)
+        return element
+        
+    def _cached_element(self, locator, timeout):
+        """Взять элемент из кэша или найти его и запомнить."""
+        if self.cache_elements:
+            element = self._element_cache.get(locator)
+            if element is not None:
+                self.cache_hits += 1
+                return element
+            self.cache_misses += 1
+            
+        element = self.find_element(locator, timeout)
+        if element is not None and self.cache_elements:
+            self._element_cache[locator] = element
+        return element
+        
+    def invalidate_cache(self):
+        """Очистить кэш элементов, например после перехода на другую страницу."""
+        self._element_cache.clear()
+        
+    def element_cache_stats(self):
+        """Статистика кэша элементов: попадания, промахи и устаревшие элементы."""
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "stale": self.cache_stale}
+        
+    def _with_element(self, locator, timeout, action):
+        """Выполнить действие над элементом.
+        
+        Вернуть пару (найден ли элемент, результат действия). Если элемент
+        из кэша устарел (страница перестроилась или была навигация), он
+        находится заново, и действие повторяется.
+        """
+        element = self._cached_element(locator, timeout)
+        if element is None:
+            return False, None
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
-            return element
-        except TimeoutException:
-            self.logger.error(f"Элемент {locator} не найден за {timeout} секунд")
-            return None
+            return True, action(element)
+        except StaleElementReferenceException:
+            if not self.cache_elements:
+                raise
+            self.cache_stale += 1
+            self._element_cache.pop(locator, None)
+            element = self._cached_element(locator, timeout)
+            if element is None:
+                return False, None
+            return True, action(element)
             
+    @profiled("click")
     def click(self, locator, timeout=10):
         """Нажать на элемент."""
-        element = self.find_element(locator, timeout)
-        if element:
-            element.click()
-            self.logger.info(f"Клик по элементу: {locator}")
+        found, _ = self._with_element(locator, timeout, lambda element: element.click())
+        if found:
+            self.logger.info("Клик по элементу: %s", locator)
             return True
         return False
         
+    @profiled("input_text")
     def input_text(self, locator, text, timeout=10):
         """Ввести текст в элемент."""
-        element = self.find_element(locator, timeout)
-        if element:
+        def type_text(element):
             element.clear()
             element.send_keys(text)
-            self.logger.info(f"Введен текст '{text}' в элемент: {locator}")
+            
+        found, _ = self._with_element(locator, timeout, type_text)
+        if found:
+            self.logger.info("Введен текст '%s' в элемент: %s", text, locator)
             return True
         return False
         
+    @profiled("get_text")
     def get_text(self, locator, timeout=10):
         """Получить текст элемента."""
-        element = self.find_element(locator, timeout)
-        if element:
-            text = element.text
-            self.logger.info(f"Получен текст '{text}' из элемента: {locator}")
+        found, text = self._with_element(locator, timeout, lambda element: element.text)
+        if found:
+            self.logger.info("Получен текст '%s' из элемента: %s", text, locator)
             return text
         return None
         
+    @profiled("read_many")
+    def read_many(self, locators, timeout=10):
+        """Получить тексты нескольких элементов за один запрос к драйверу.
+        
+        Для элементов, которых ещё нет в DOM, выполняется обычное ожидание.
+        """
+        texts = self.driver.execute_script(self.READ_MANY_SCRIPT, [list(loc) for loc in locators])
+        for index, locator in enumerate(locators):
+            if texts[index] is None:
+                texts[index] = self.get_text(locator, timeout)
+        self.logger.info("Получены тексты %s элементов", len(locators))
+        return texts
+        
+    @profiled("fill_form")
+    def fill_form(self, values, timeout=10, native_fields=()):
+        """Заполнить поля формы за один запрос к драйверу.
+        
+        values - словарь {локатор: значение}. Для каждого поля генерируются
+        события input и change. Поля из native_fields, поля файлов и
+        нестандартные элементы (contenteditable и т.п.) заполняются обычным
+        вводом с клавиатуры, как и поля, которых ещё нет в DOM.
+        Вернуть True, если заполнены все поля.
+        """
+        batch = [loc for loc in values if loc not in native_fields]
+        statuses = self.driver.execute_script(
+            self.FILL_FORM_SCRIPT, [[loc[0], loc[1], values[loc]] for loc in batch]
+        )
+        fallback = [loc for loc in native_fields if loc in values]
+        fallback += [loc for loc, status in zip(batch, statuses) if status != "ok"]
+        
+        success = True
+        for locator in fallback:
+            success = self.input_text(locator, values[locator], timeout) and success
+        self.logger.info("Заполнено полей: %s, из них вводом с клавиатуры: %s", len(values), len(fallback))
+        return success
+        
+    @profiled("is_element_visible")
     def is_element_visible(self, locator, timeout=10):
         """Проверить видимость элемента."""
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
-            return bool(element)
-        except TimeoutException:
-            self.logger.info(f"Элемент {locator} не виден за {timeout} секунд")
+        if self.waits.until_visible(locator, timeout) is None:
+            self.logger.info("Элемент %s не виден за %s секунд", locator, timeout)
             return False
+        return True
             
+    @profiled("wait_for_page_load")
     def wait_for_page_load(self, timeout=10):
         """Дождаться загрузки страницы."""
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+        if self.waits.until_page_loaded(timeout):
             self.logger.info("Страница полностью загружена")
             return True
-        except TimeoutException:
-            self.logger.error(f"Страница не загрузилась за {timeout} секунд")
-            return False
+        self.logger.error("Страница не загрузилась за %s секунд", timeout)
+        return False
+        
+    @profiled("wait_for_any")
+    def wait_for_any(self, outcomes, timeout=10, visible=True):
+        """Дождаться первого из нескольких исходов.
+        
+        outcomes - словарь {название исхода: локатор}. Вернуть название
+        исхода, элемент которого появился первым, или None по таймауту.
+        """
+        names = list(outcomes)
+        kind = WaitEngine.VISIBLE if visible else WaitEngine.PRESENT
+        index, _ = self.waits.wait_for([(kind, outcomes[name]) for name in names], timeout)
+        if index is None:
+            self.logger.info("Ни один из исходов %s не наступил за %s секунд", names, timeout)
+            return None
+        self.logger.info("Наступил исход: %s", names[index])
+        return names[index]
+        
+    def capture_visual(self, locator=None, ignore=(), timeout=10):
+        """Снять элемент (или видимую область страницы) для визуальной проверки.
+        
+        ignore - локаторы элементов или области (x, y, ширина, высота) в
+        пикселях снимка, которые не сравниваются. Вернуть массив и список
+        игнорируемых областей или (None, None), если элемент не найден.
+        """
+        element = None
+        if locator is None:
+            png = self.driver.get_screenshot_as_png()
+        else:
+            element = self.find_element(locator, timeout)
+            if element is None:
+                return None, None
+            png = element.screenshot_as_png
+        regions = [region for region in ignore if len(region) == 4]
+        locators = [list(region) for region in ignore if len(region) == 2]
+        if locators:
+            regions += self.driver.execute_script(self.IGNORE_RECTS_SCRIPT, element, locators)
+        return VisualComparator.decode(png), regions
+        
+    @profiled("check_visual")
+    def check_visual(self, name, locator=None, ignore=(), tolerance=None, timeout=10):
+        """Сравнить элемент (или видимую область) с эталоном name.
+        
+        Если эталона ещё нет, он сохраняется и проверка считается пройденной.
+        Вернуть VisualResult (истинен, если проверка пройдена).
+        """
+        return self.check_visuals({name: locator}, ignore, tolerance, timeout)[0]
+        
+    @profiled("check_visuals")
+    def check_visuals(self, checks, ignore=(), tolerance=None, timeout=10):
+        """Снять несколько элементов и сравнить их с эталонами одним пакетом.
+        
+        checks - словарь {имя эталона: локатор или None для видимой области}.
+        Результаты возвращаются в порядке checks.
+        """
+        items, missing = [], set()
+        for name, locator in checks.items():
+            image, regions = self.capture_visual(locator, ignore, timeout)
+            if image is None:
+                self.logger.error("Элемент %s для визуальной проверки %s не найден", locator, name)
+                missing.add(name)
+                continue
+            items.append((name, image, regions))
+        compared = iter(VisualComparator.default().compare_batch(items, tolerance))
+        results = [VisualResult(name, 1.0, False) if name in missing else next(compared) for name in checks]
+        for result in results:
+            self.logger.info("Визуальная проверка %s: отличие %.3f%%", result.name, result.mismatch * 100)
+        return results
+
+# base/async_base_page.py
+import asyncio
+import logging
+import time
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+from base.base_page import BasePage
+from base.wait_engine import WaitEngine
+
+class AsyncBasePage:
+    """Асинхронный аналог BasePage для AsyncWebDriver.
+    
+    Ожидания выполняются в браузере тем же скриптом WaitEngine, поэтому
+    ожидающая страница не занимает цикл событий.
+    """
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.logger = logging.getLogger(__name__)
+        self._script_timeout_set = False
+        
+    async def open(self, url):
+        """Открыть указанный URL."""
+        await self.driver.get(url)
+        self.logger.info("Открыта страница: %s", url)
+        
+    async def wait_for(self, conditions, timeout):
+        """Дождаться первого выполненного условия (вид, локатор); см. WaitEngine.wait_for."""
+        if not self._script_timeout_set:
+            # Таймаут скрипта должен быть больше одного ожидания в браузере
+            await self.driver.set_script_timeout(WaitEngine.MAX_SCRIPT_WAIT + 10)
+            self._script_timeout_set = True
+        payload = [
+            {"kind": kind, "by": locator[0] if locator else None, "value": locator[1] if locator else None}
+            for kind, locator in conditions
+        ]
+        deadline = time.monotonic() + timeout
+        errors = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, None
+            wait_ms = int(min(remaining, WaitEngine.MAX_SCRIPT_WAIT) * 1000)
+            try:
+                result = await self.driver.execute_async_script(WaitEngine.WAIT_SCRIPT, payload, wait_ms)
+            except TimeoutException:
+                continue
+            except JavascriptException:
+                # Страница перезагрузилась во время ожидания - ждём уже на новой
+                errors += 1
+                if errors >= WaitEngine.MAX_SCRIPT_ERRORS:
+                    raise
+                await asyncio.sleep(WaitEngine.poll_interval)
+                continue
+            if result:
+                element = result["element"]
+                return result["index"], True if element is None else element
+                
+    async def find_element(self, locator, timeout=10):
+        """Найти элемент по локатору с ожиданием."""
+        element = (await self.wait_for([(WaitEngine.PRESENT, locator)], timeout))[1]
+        if element is None:
+            self.logger.error("Элемент %s не найден за %s секунд", locator, timeout)
+        return element
+        
+    async def _with_element(self, locator, timeout, action):
+        """Выполнить действие над элементом, повторив поиск один раз, если он устарел."""
+        for attempt in range(2):
+            element = await self.find_element(locator, timeout)
+            if element is None:
+                return None
+            try:
+                return await action(element)
+            except StaleElementReferenceException:
+                if attempt:
+                    raise
+        return None
+        
+    async def click(self, locator, timeout=10):
+        """Кликнуть по элементу."""
+        async def click(element):
+            await element.click()
+            return True
+        if await self._with_element(locator, timeout, click):
+            self.logger.info("Выполнен клик по элементу: %s", locator)
+            return True
+        return False
+        
+    async def input_text(self, locator, text, timeout=10):
+        """Ввести текст в элемент."""
+        async def type_text(element):
+            await element.clear()
+            await element.send_keys(text)
+            return True
+        if await self._with_element(locator, timeout, type_text):
+            self.logger.info("Введен текст '%s' в элемент: %s", text, locator)
+            return True
+        return False
+        
+    async def get_text(self, locator, timeout=10):
+        """Получить текст элемента."""
+        async def read(element):
+            return await element.text()
+        text = await self._with_element(locator, timeout, read)
+        if text is not None:
+            self.logger.info("Получен текст '%s' из элемента: %s", text, locator)
+        return text
+        
+    async def fill_form(self, values, timeout=10):
+        """Заполнить поля формы за один запрос к драйверу (см. BasePage.fill_form)."""
+        locators = list(values)
+        statuses = await self.driver.execute_script(
+            BasePage.FILL_FORM_SCRIPT, [[loc[0], loc[1], values[loc]] for loc in locators]
+        )
+        success = True
+        for locator, status in zip(locators, statuses):
+            if status != "ok":
+                success = await self.input_text(locator, values[locator], timeout) and success
+        self.logger.info("Заполнено полей: %s", len(values))
+        return success
+        
+    async def is_element_visible(self, locator, timeout=10):
+        """Проверить видимость элемента."""
+        return (await self.wait_for([(WaitEngine.VISIBLE, locator)], timeout))[0] is not None
+        
+    async def wait_for_page_load(self, timeout=10):
+        """Дождаться загрузки страницы."""
+        return (await self.wait_for([(WaitEngine.PAGE_LOADED, None)], timeout))[0] is not None
+        
+    async def wait_for_any(self, outcomes, timeout=10, visible=True):
+        """Дождаться первого из нескольких исходов (см. BasePage.wait_for_any)."""
+        names = list(outcomes)
+        kind = WaitEngine.VISIBLE if visible else WaitEngine.PRESENT
+        index, _ = await self.wait_for([(kind, outcomes[name]) for name in names], timeout)
+        if index is None:
+            self.logger.info("Ни один из исходов %s не наступил за %s секунд", names, timeout)
+            return None
+        self.logger.info("Наступил исход: %s", names[index])
+        return names[index]
 
 # base/base_test.py
 import unittest
 import logging
+import atexit
+from utils.auth import AuthHelper
+from utils.backend_stub import BackendStub
 from utils.driver_factory import DriverFactory
+from utils.driver_pool import DriverPool
 from config.config import Config
 
 class BaseTest(unittest.TestCase):
     """Базовый класс для всех тестов."""
     
+    # Пул драйверов общий для всех тестов процесса
+    driver_pool = None
+    
     def setUp(self):
         """Подготовка к тесту."""
         self.logger = logging.getLogger(__name__)
@@ -116,15 +733,42 @@ class BaseTest(unittest.TestCase):
         
         self.config = Config()
         self.driver_factory = DriverFactory()
-        self.driver = self.driver_factory.get_driver(self.config.browser)
-        self.driver.maximize_window()
-        self.driver.implicitly_wait(self.config.implicit_wait)
-        
+        self.auth_injection = None
+        if self.config.use_driver_pool:
+            self.driver = self.get_driver_pool(self.config).acquire()
+        else:
+            self.driver = self.driver_factory.get_configured_driver(self.config)
+        # Записать или подменить ответы бэкенда до первой навигации теста
+        self.backend = BackendStub.from_config(self.config)
+        if self.backend:
+            self.backend.start(self.driver, self.id())
+            
     def tearDown(self):
         """Завершение теста."""
         if self.driver:
-            self.driver.quit()
-            self.logger.info("Драйвер закрыт")
+            if self.backend:
+                self.backend.stop(self.driver)
+            AuthHelper.eject(self.driver, self.auth_injection)
+            if self.config.use_driver_pool:
+                self.get_driver_pool(self.config).release(self.driver)
+                self.logger.info("Драйвер возвращён в пул")
+            else:
+                self.driver.quit()
+                self.logger.info("Драйвер закрыт")
+                
+    def login_via_api(self, username=None, password=None):
+        """Войти через API, минуя форму логина. Вызывать до первой навигации."""
+        auth = AuthHelper(self.config)
+        session = auth.login(username or self.config.auth_username, password or self.config.auth_password)
+        self.auth_injection = auth.inject(self.driver, session)
+        
+    @classmethod
+    def get_driver_pool(cls, config):
+        """Получить общий пул драйверов, создав его при первом обращении."""
+        if BaseTest.driver_pool is None:
+            BaseTest.driver_pool = DriverPool.from_config(config, DriverFactory())
+            atexit.register(BaseTest.driver_pool.shutdown)
+        return BaseTest.driver_pool
 
 # config/config.py
 import os
@@ -133,9 +777,19 @@ import json
 class Config:
     """Класс для работы с конфигурацией."""
     
+    # Ресурсы, которые не нужны функциональным тестам
+    DEFAULT_BLOCKED_URL_PATTERNS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp4", "*.webm", "*.mp3", "*.ogg",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*mc.yandex.ru*", "*connect.facebook.net*", "*hotjar.com*",
+    ]
+    
     def __init__(self, config_path="config/config.json"):
         self.config_path = config_path
         self.load_config()
+        self.setup_worker_paths()
         
     def load_config(self):
         """Загрузить конфигурацию из файла."""
@@ -146,9 +800,24 @@ class Config:
             # Базовые настройки
             self.base_url = config.get("base_url", "http://localhost")
             self.browser = config.get("browser", "chrome")
-            self.implicit_wait = config.get("implicit_wait", 10)
+            # Неявное ожидание суммируется с явными ожиданиями BasePage, поэтому отключено по умолчанию
+            self.implicit_wait = config.get("implicit_wait", 0)
             self.explicit_wait = config.get("explicit_wait", 15)
             
+            # Настройки ожиданий: event - по событиям DOM, poll - опрос
+            self.wait_strategy = config.get("wait_strategy", "event")
+            self.poll_interval = config.get("poll_interval", 0.05)
+            self.max_poll_interval = config.get("max_poll_interval", 0.5)
+            
+            # Кэш найденных элементов в объектах страниц
+            self.element_cache = config.get("element_cache", False)
+            
+            # Быстрый профиль браузера: без интерфейса, картинок, шрифтов и аналитики
+            self.browser_profile = config.get("browser_profile", "default")
+            self.viewport_width = config.get("viewport_width", 1366)
+            self.viewport_height = config.get("viewport_height", 768)
+            self.blocked_url_patterns = config.get("blocked_url_patterns", list(self.DEFAULT_BLOCKED_URL_PATTERNS))
+            
             # Настройки среды
             self.environment = config.get("environment", "dev")
             env_config = config.get("environments", {}).get(self.environment, {})
@@ -157,276 +826,7435 @@ class Config:
             if self.environment in config.get("environments", {}):
                 self.base_url = env_config.get("base_url", self.base_url)
                 
-            # Настройки логирования
+            # Настройки логирования: log_format - text или json (JSONL)
             self.log_level = config.get("log_level", "INFO")
+            self.log_format = config.get("log_format", "text")
             
-            # Настройки отчётов
+            # Настройки логов и отчётов
+            self.logs_dir = config.get("logs_dir", "logs")
             self.reports_dir = config.get("reports_dir", "reports")
+            # Потоковый отчёт: результаты дописываются в reports_dir/stream по ходу прогона
+            self.stream_report = config.get("stream_report", True)
             
             # Настройки скриншотов
             self.screenshots_dir = config.get("screenshots_dir", "screenshots")
             self.take_screenshot_on_failure = config.get("take_screenshot_on_failure", True)
+            # Фоновая запись скриншотов: число потоков, ширина (нужен Pillow) и бюджет на прогон в МБ
+            self.artifact_workers = config.get("artifact_workers", 2)
+            self.screenshot_max_width = config.get("screenshot_max_width", None)
+            self.artifacts_budget_mb = config.get("artifacts_budget_mb", 200)
+            
+            # Визуальные проверки: эталоны .npz, тепловые карты отличий, допустимая доля
+            # отличающихся пикселей и порог разницы цвета пикселя (0..1)
+            self.visual_baselines_dir = config.get("visual_baselines_dir", "visual/baselines")
+            self.visual_diffs_dir = config.get("visual_diffs_dir", "visual/diffs")
+            self.visual_tolerance = config.get("visual_tolerance", 0.001)
+            self.visual_threshold = config.get("visual_threshold", 0.1)
+            self.visual_update = config.get("visual_update", False)
+            
+            # Трасса последних шагов, сохраняемая только при падении (0 - выключена)
+            self.trace_steps = config.get("trace_steps", 0)
+            self.trace_screenshots = config.get("trace_screenshots", False)
+            self.traces_dir = config.get("traces_dir", "traces")
+            
+            # Настройки пула драйверов
+            self.use_driver_pool = config.get("use_driver_pool", True)
+            self.driver_pool_max_uses = config.get("driver_pool_max_uses", 50)
+            # При значении больше 1 столько воркеров parallel_runner работают одновременно
+            # в одном процессе Chromium, каждый в своём изолированном контексте
+            self.browser_contexts = config.get("browser_contexts", 1)
+            # Запуск следующего драйвера в фоне, пока идёт тест
+            self.driver_prespawn = config.get("driver_prespawn", True)
+            
+            # Ускорение запуска браузера: пути к драйверам без обращения в сеть и
+            # шаблон профиля, копируемый на каждую сессию в tmpfs
+            self.driver_cache_dir = os.path.expanduser(config.get("driver_cache_dir", "~/.cache/test-automation-framework"))
+            self.resolve_drivers = config.get("resolve_drivers", True)
+            self.profile_template = config.get("profile_template", True)
+            self.profile_tmpfs_dir = config.get("profile_tmpfs_dir", "/dev/shm")
+            
+            # История длительности тестов для параллельного запуска
+            self.durations_file = config.get("durations_file", ".test_durations.json")
+            # Общая (закоммиченная) история для --shard: шарды балансируются по ней и не
+            # перезаписывают её; без неё тесты раскладываются по шардам поровну в порядке хэша идентификатора
+            self.shard_durations_file = config.get("shard_durations_file")
+            
+            # Кэш результатов: прошедшие на той же сборке и с тем же кодом тесты пропускаются
+            # (сборка - заголовок app_build_header или ответ эндпоинта app_version_path).
+            # Выключен по умолчанию, включается здесь или флагом --result-cache
+            self.result_cache = config.get("result_cache", False)
+            self.result_cache_file = config.get("result_cache_file", ".test_results.json")
+            self.app_build_header = config.get("app_build_header", "X-App-Build")
+            self.app_version_path = config.get("app_version_path", "/version")
+            
+            # Профилирование прогона (также включается опцией --perf-profile)
+            self.perf_profile = config.get("perf_profile", False)
+            self.perf_top_n = config.get("perf_top_n", 10)
+            
+            # Вход через API вместо формы логина
+            self.auth_login_path = config.get("auth_login_path", "/api/login")
+            self.auth_token_storage_key = config.get("auth_token_storage_key", "token")
+            self.auth_session_ttl = config.get("auth_session_ttl", 900)
+            self.auth_username = config.get("auth_username", "testuser")
+            self.auth_password = config.get("auth_password", "password123")
+            
+            # Асинхронный слой страниц: адрес сервера WebDriver (грид) и размер пула соединений
+            self.webdriver_url = config.get("webdriver_url", "http://localhost:4444/wd/hub")
+            self.async_max_connections = config.get("async_max_connections", 100)
+            
+            # Узлы грида для браузера remote: строки URL или {"url": ..., "max_sessions": ...};
+            # если список пуст, используется webdriver_url
+            self.grid_endpoints = config.get("grid_endpoints", [])
+            self.grid_max_sessions = config.get("grid_max_sessions", 4)
+            self.grid_queue_timeout = config.get("grid_queue_timeout", 300)
+            self.grid_retries = config.get("grid_retries", 3)
+            
+            # Заглушка бэкенда: live - реальный сервер, record - запись трафика в HAR, replay - ответы из HAR
+            self.backend_mode = config.get("backend_mode", "live")
+            self.har_dir = config.get("har_dir", "har")
+            # Задержка ответов при воспроизведении: recorded - как при записи, число - мс, none - без задержки
+            self.backend_latency = config.get("backend_latency", "recorded")
+            # Строгое сопоставление: незаписанный запрос получает ошибку 599 вместо обращения к серверу
+            self.backend_strict = config.get("backend_strict", False)
         else:
             # Стандартные настройки
             self.base_url = "http://localhost"
             self.browser = "chrome"
-            self.implicit_wait = 10
+            self.implicit_wait = 0
             self.explicit_wait = 15
+            self.wait_strategy = "event"
+            self.poll_interval = 0.05
+            self.max_poll_interval = 0.5
+            self.element_cache = False
+            self.browser_profile = "default"
+            self.viewport_width = 1366
+            self.viewport_height = 768
+            self.blocked_url_patterns = list(self.DEFAULT_BLOCKED_URL_PATTERNS)
             self.environment = "dev"
             self.log_level = "INFO"
+            self.log_format = "text"
+            self.logs_dir = "logs"
             self.reports_dir = "reports"
+            self.stream_report = True
             self.screenshots_dir = "screenshots"
             self.take_screenshot_on_failure = True
+            self.artifact_workers = 2
+            self.screenshot_max_width = None
+            self.artifacts_budget_mb = 200
+            self.visual_baselines_dir = "visual/baselines"
+            self.visual_diffs_dir = "visual/diffs"
+            self.visual_tolerance = 0.001
+            self.visual_threshold = 0.1
+            self.visual_update = False
+            self.trace_steps = 0
+            self.trace_screenshots = False
+            self.traces_dir = "traces"
+            self.use_driver_pool = True
+            self.driver_pool_max_uses = 50
+            self.browser_contexts = 1
+            self.driver_prespawn = True
+            self.driver_cache_dir = os.path.expanduser("~/.cache/test-automation-framework")
+            self.resolve_drivers = True
+            self.profile_template = True
+            self.profile_tmpfs_dir = "/dev/shm"
+            self.durations_file = ".test_durations.json"
+            self.shard_durations_file = None
+            self.result_cache = False
+            self.result_cache_file = ".test_results.json"
+            self.app_build_header = "X-App-Build"
+            self.app_version_path = "/version"
+            self.perf_profile = False
+            self.perf_top_n = 10
+            self.auth_login_path = "/api/login"
+            self.auth_token_storage_key = "token"
+            self.auth_session_ttl = 900
+            self.auth_username = "testuser"
+            self.auth_password = "password123"
+            self.webdriver_url = "http://localhost:4444/wd/hub"
+            self.async_max_connections = 100
+            self.grid_endpoints = []
+            self.grid_max_sessions = 4
+            self.grid_queue_timeout = 300
+            self.grid_retries = 3
+            self.backend_mode = "live"
+            self.har_dir = "har"
+            self.backend_latency = "recorded"
+            self.backend_strict = False
+            
+    def setup_worker_paths(self):
+        """Развести логи, скриншоты, трассы и отчёты параллельных воркеров по своим каталогам."""
+        self.worker_id = os.environ.get("TEST_WORKER_ID") or os.environ.get("PYTEST_XDIST_WORKER")
+        if self.worker_id:
+            self.logs_dir = os.path.join(self.logs_dir, self.worker_id)
+            self.screenshots_dir = os.path.join(self.screenshots_dir, self.worker_id)
+            self.traces_dir = os.path.join(self.traces_dir, self.worker_id)
+            self.visual_diffs_dir = os.path.join(self.visual_diffs_dir, self.worker_id)
+            self.reports_dir = os.path.join(self.reports_dir, self.worker_id)
 
 # utils/driver_factory.py
+from urllib.parse import quote
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+from base.wait_engine import WaitEngine
+from config.config import Config
+from utils.backend_stub import BackendStub
+from utils.browser_contexts import SHARED_BROWSER_ENV, BrowserContextManager
+from utils.driver_startup import DriverBinaryCache, ProfileTemplate
+from utils.grid import GridClient
+from utils.profiler import Profiler
 import logging
+import os
+import time
 
 class DriverFactory:
     """Фабрика драйверов для разных браузеров."""
     
+    # Суффикс имени браузера для быстрого профиля, например chrome-fast
+    FAST_SUFFIX = "-fast"
+    
+    # Флаги Chromium для быстрого профиля: без фоновой сети, обновлений и картинок
+    FAST_CHROMIUM_ARGUMENTS = [
+        "--headless=new",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-client-side-phishing-detection",
+        "--disable-features=Translate,OptimizationHints,MediaRouter",
+        "--metrics-recording-only",
+        "--no-first-run",
+        "--mute-audio",
+        "--blink-settings=imagesEnabled=false",
+    ]
+    
+    # Настройки Firefox для быстрого профиля
+    FAST_FIREFOX_PREFERENCES = {
+        "permissions.default.image": 2,
+        "gfx.downloadable_fonts.enabled": False,
+        "media.autoplay.default": 5,
+        "network.prefetch-next": False,
+        "network.dns.disablePrefetch": True,
+        "network.captive-portal-service.enabled": False,
+        "network.connectivity-service.enabled": False,
+        "app.update.auto": False,
+        "extensions.update.enabled": False,
+        "browser.search.update": False,
+        "browser.safebrowsing.malware.enabled": False,
+        "browser.safebrowsing.phishing.enabled": False,
+        "browser.shell.checkDefaultBrowser": False,
+        "datareporting.healthreport.uploadEnabled": False,
+        "toolkit.telemetry.enabled": False,
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-    def get_driver(self, browser_name):
-        """Получить драйвер для указанного браузера."""
-        browser_name = browser_name.lower()
+    def get_driver(self, browser_name, config=None):
+        """Получить драйвер для указанного браузера.
         
+        Быстрый профиль включается суффиксом -fast в имени браузера
+        (например, chrome-fast) или настройкой browser_profile = "fast".
+        """
+        browser_name = browser_name.lower()
+        fast = browser_name.endswith(self.FAST_SUFFIX)
+        if fast:
+            browser_name = browser_name[:-len(self.FAST_SUFFIX)]
+        elif config is not None:
+            fast = config.browser_profile == "fast"
+        if fast and config is None:
+            config = Config()
+            
         if browser_name == "chrome":
             options = ChromeOptions()
-            options.add_argument("--start-maximized")
-            options.add_argument("--disable-extensions")
-            driver = webdriver.Chrome(options=options)
+            if fast:
+                self._apply_fast_chromium_options(options, config)
+            else:
+                options.add_argument("--start-maximized")
+                options.add_argument("--disable-extensions")
+            logging_prefs = self._logging_prefs(config)
+            if logging_prefs:
+                options.set_capability("goog:loggingPrefs", logging_prefs)
+            driver = self._start_local("chrome", config, options, webdriver.Chrome, ChromeService)
             self.logger.info("Инициализирован Chrome драйвер")
             
         elif browser_name == "firefox":
             options = FirefoxOptions()
-            driver = webdriver.Firefox(options=options)
+            if fast:
+                self._apply_fast_firefox_options(options, config)
+            driver = self._start_local("firefox", config, options, webdriver.Firefox, FirefoxService)
             self.logger.info("Инициализирован Firefox драйвер")
             
         elif browser_name == "edge":
             options = EdgeOptions()
-            driver = webdriver.Edge(options=options)
+            if fast:
+                self._apply_fast_chromium_options(options, config)
+            driver = self._start_local("edge", config, options, webdriver.Edge, EdgeService)
             self.logger.info("Инициализирован Edge драйвер")
             
         elif browser_name == "safari":
+            if fast:
+                self.logger.warning("Быстрый профиль не поддерживается в Safari")
             driver = webdriver.Safari()
             self.logger.info("Инициализирован Safari драйвер")
             
         elif browser_name == "remote":
             options = ChromeOptions()
-            driver = webdriver.Remote(
-                command_executor="http://localhost:4444/wd/hub",
-                options=options
-            )
-            self.logger.info("Инициализирован Remote драйвер")
+            if fast:
+                self._apply_fast_chromium_options(options, config)
+            logging_prefs = self._logging_prefs(config)
+            if logging_prefs:
+                options.set_capability("goog:loggingPrefs", logging_prefs)
+            # Сессия создаётся на наименее загруженном узле грида из настроек
+            driver = GridClient.for_config(config or Config()).create_session(options)
+            self.logger.info("Инициализирован Remote драйвер на %s", driver.grid_endpoint)
             
         else:
-            self.logger.warning(f"Неизвестный браузер: {browser_name}, используем Chrome")
+            self.logger.warning("Неизвестный браузер: %s, используем Chrome", browser_name)
             options = ChromeOptions()
             driver = webdriver.Chrome(options=options)
             
+        if fast:
+            self.block_urls(driver, config)
+            self.logger.info("Применён быстрый профиль браузера")
         return driver
-
-# utils/logger.py
-import logging
-import os
-from datetime import datetime
-
-class Logger:
-    """Настройка логирования."""
-    
+        
+    def _logging_prefs(self, config):
+        """Журналы ChromeDriver: консоль для трассы шагов, сеть для записи трафика."""
+        prefs = {}
+        if config is None:
+            return prefs
+        if config.trace_steps:
+            # Сообщения консоли всех уровней для трассы теста
+            prefs["browser"] = "ALL"
+        if config.backend_mode == BackendStub.RECORD:
+            # События Network.* для записи трафика на стороне драйвера
+            prefs["performance"] = "ALL"
+        return prefs
+        
+    def _start_local(self, browser_name, config, options, driver_class, service_class):
+        """Запустить локальный браузер с драйвером из кэша и копией шаблона профиля.
+        
+        Копия профиля удаляется при закрытии драйвера.
+        """
+        if config is None:
+            return driver_class(options=options)
+        binaries = DriverBinaryCache(config.driver_cache_dir) if config.resolve_drivers else None
+        profile_dir = None
+        if config.profile_template:
+            template = ProfileTemplate(browser_name, config.driver_cache_dir, config.profile_tmpfs_dir)
+            template.ensure(lambda path: self._warm_profile(browser_name, path, options, driver_class, service_class, binaries))
+            profile_dir = template.copy()
+            self._add_profile_argument(browser_name, options, profile_dir)
+            
+        try:
+            driver = self._launch(browser_name, options, driver_class, service_class, binaries)
+        except Exception:
+            if profile_dir:
+                ProfileTemplate.remove(profile_dir)
+            raise
+            
+        if profile_dir:
+            original_quit = driver.quit
+            
+            def quit():
+                try:
+                    original_quit()
+                finally:
+                    ProfileTemplate.remove(profile_dir)
+                    
+            driver.quit = quit
+        return driver
+        
+    def _launch(self, browser_name, options, driver_class, service_class, binaries):
+        """Создать драйвер; если закэшированный драйвер не подходит к браузеру, определить его заново."""
+        def start():
+            path = binaries.resolve(browser_name) if binaries else None
+            return driver_class(options=options, service=service_class(path) if path else service_class())
+            
+        try:
+            return start()
+        except SessionNotCreatedException:
+            if binaries is None:
+                raise
+            self.logger.warning("Драйвер %s не подходит к версии браузера, определяем заново", browser_name)
+            binaries.invalidate(browser_name)
+            return start()
+            
+    def _warm_profile(self, browser_name, path, options, driver_class, service_class, binaries):
+        """Один раз запустить браузер с новым шаблоном, чтобы он создал файлы профиля."""
+        warm_options = type(options)()
+        warm_options.add_argument("-headless" if browser_name == "firefox" else "--headless=new")
+        self._add_profile_argument(browser_name, warm_options, path)
+        try:
+            self._launch(browser_name, warm_options, driver_class, service_class, binaries).quit()
+        except Exception as e:
+            self.logger.warning("Не удалось прогреть шаблон профиля %s: %s", browser_name, e)
+            
     @staticmethod
-    def setup_logger(log_level="INFO", log_file=None):
-        """Настроить логгер."""
-        # Создать каталог логов, если он не существует
-        if log_file:
-            log_dir = os.path.dirname(log_file)
-            if not os.path.exists(log_dir):
-                os.makedirs(log_dir)
-                
-        # Настройка уровня логирования
-        numeric_level = getattr(logging, log_level.upper(), None)
-        if not isinstance(numeric_level, int):
-            numeric_level = logging.INFO
+    def _add_profile_argument(browser_name, options, path):
+        if browser_name == "firefox":
+            options.add_argument("-profile")
+            options.add_argument(path)
+        else:
+            options.add_argument(f"--user-data-dir={path}")
+            options.add_argument("--no-first-run")
+            options.add_argument("--no-default-browser-check")
             
-        # Формат логов
-        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        date_format = "%Y-%m-%d %H:%M:%S"
+    def is_fast_profile(self, config):
+        """Проверить, используется ли быстрый профиль."""
+        return config.browser.lower().endswith(self.FAST_SUFFIX) or config.browser_profile == "fast"
+        
+    def get_configured_driver(self, config):
+        """Получить драйвер, настроенный согласно конфигурации."""
+        start = time.perf_counter()
+        driver = self.get_driver(config.browser, config)
+        profiler = Profiler.current()
+        if profiler is not None:
+            profiler.record_startup(time.perf_counter() - start)
+            Profiler.instrument_driver(driver)
+        # В быстром профиле размер окна фиксирован
+        if not self.is_fast_profile(config):
+            driver.maximize_window()
+        if config.implicit_wait:
+            self.logger.warning("Неявное ожидание включено и суммируется с явными ожиданиями")
+            driver.implicitly_wait(config.implicit_wait)
+        WaitEngine.configure(config)
+        return driver
+        
+    def get_context_manager(self, config):
+        """Менеджер изолированных контекстов одного браузера.
         
-        # Конфигурация логгера
-        logging.basicConfig(
-            level=numeric_level,
-            format=log_format,
-            datefmt=date_format,
-            filename=log_file
+        Под parallel_runner воркеры подключаются к общему браузеру, адрес
+        которого передан в окружении; иначе браузер запускается здесь.
+        """
+        prepare_context = None
+        if self.is_fast_profile(config):
+            prepare_context = lambda driver: self.block_urls(driver, config)
+        host = None
+        address = os.environ.get(SHARED_BROWSER_ENV)
+        if not address:
+            host = self.get_configured_driver(config)
+            address = BrowserContextManager.debugger_address(host)
+        return BrowserContextManager(
+            address, lambda address: self.attach_driver(address, config), host, prepare_context
         )
         
-        # Добавить обработчик для вывода в консоль
-        console = logging.StreamHandler()
-        console.setLevel(numeric_level)
-        console.setFormatter(logging.Formatter(log_format))
-        logging.getLogger('').addHandler(console)
+    def attach_driver(self, address, config):
+        """Подключить новую сессию WebDriver к запущенному Chrome или Edge."""
+        browser_name = config.browser.lower()
+        if browser_name.endswith(self.FAST_SUFFIX):
+            browser_name = browser_name[:-len(self.FAST_SUFFIX)]
+        if browser_name == "edge":
+            options, driver_class, service_class = EdgeOptions(), webdriver.Edge, EdgeService
+        else:
+            browser_name = "chrome"
+            options, driver_class, service_class = ChromeOptions(), webdriver.Chrome, ChromeService
+            logging_prefs = self._logging_prefs(config)
+            if logging_prefs:
+                options.set_capability("goog:loggingPrefs", logging_prefs)
+        options.debugger_address = address
+        binaries = DriverBinaryCache(config.driver_cache_dir) if config.resolve_drivers else None
         
-        return logging.getLogger()
+        start = time.perf_counter()
+        driver = self._launch(browser_name, options, driver_class, service_class, binaries)
+        profiler = Profiler.current()
+        if profiler is not None:
+            profiler.record_startup(time.perf_counter() - start)
+            Profiler.instrument_driver(driver)
+        if config.implicit_wait:
+            driver.implicitly_wait(config.implicit_wait)
+        return driver
+        
+    def block_urls(self, driver, config):
+        """Заблокировать загрузку ресурсов по шаблонам URL через CDP.
+        
+        Блокировка действует на текущую вкладку. В Firefox тот же эффект
+        даёт PAC-скрипт из настроек профиля.
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": config.blocked_url_patterns})
+        
+    def _apply_fast_chromium_options(self, options, config):
+        """Настроить Chrome/Edge для быстрого профиля."""
+        for argument in self.FAST_CHROMIUM_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_argument(f"--window-size={config.viewport_width},{config.viewport_height}")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+        
+    def _apply_fast_firefox_options(self, options, config):
+        """Настроить Firefox для быстрого профиля."""
+        options.add_argument("-headless")
+        options.add_argument(f"--width={config.viewport_width}")
+        options.add_argument(f"--height={config.viewport_height}")
+        for name, value in self.FAST_FIREFOX_PREFERENCES.items():
+            options.set_preference(name, value)
+            
+        # Запросы по шаблонам уходят на закрытый порт и сразу завершаются ошибкой
+        rules = "".join(
+            f'if (shExpMatch(url, "{pattern}")) return "PROXY 127.0.0.1:9";'
+            for pattern in config.blocked_url_patterns
+        )
+        pac = f"function FindProxyForURL(url, host) {{ {rules} return \"DIRECT\"; }}"
+        options.set_preference("network.proxy.type", 2)
+        options.set_preference("network.proxy.autoconfig_url", "data:text/plain," + quote(pac))
 
-# pages/login_page.py
-from selenium.webdriver.common.by import By
-from base.base_page import BasePage
+# utils/driver_startup.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
-class LoginPage(BasePage):
-    """Класс для работы со страницей логина."""
+class DriverBinaryCache:
+    """Пути к драйверам браузеров, определённые один раз на машине.
     
-    # Локаторы
-    USERNAME_INPUT = (By.ID, "username")
-    PASSWORD_INPUT = (By.ID, "password")
-    LOGIN_BUTTON = (By.ID, "login-button")
-    ERROR_MESSAGE = (By.CLASS_NAME, "error-message")
+    webdriver-manager (и встроенный Selenium Manager) при каждом запуске
+    обращаются в сеть за последней версией драйвера. Здесь найденный путь
+    сохраняется в JSON-файле и используется, пока файл драйвера существует;
+    при несовместимости с обновившимся браузером запись сбрасывается.
+    """
     
-    def __init__(self, driver):
-        super().__init__(driver)
-        
-    def open_login_page(self, url):
-        """Открыть страницу логина."""
-        self.open(url)
+    MANAGERS = {
+        "chrome": ChromeDriverManager,
+        "firefox": GeckoDriverManager,
+        "edge": EdgeChromiumDriverManager,
+    }
+    
+    def __init__(self, cache_dir):
+        self.cache_file = os.path.join(cache_dir, "drivers.json")
+        self.logger = logging.getLogger(__name__)
         
-    def login(self, username, password):
-        """Войти в систему с указанными учетными данными."""
-        self.input_text(self.USERNAME_INPUT, username)
-        self.input_text(self.PASSWORD_INPUT, password)
-        self.click(self.LOGIN_BUTTON)
+    def _read(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+    def _write(self, entries):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+        # Параллельные воркеры читают файл, поэтому он заменяется атомарно
+        os.replace(temp_path, self.cache_file)
         
-    def get_error_message(self):
-        """Получить сообщение об ошибке."""
-        return self.get_text(self.ERROR_MESSAGE)
+    def resolve(self, browser_name):
+        """Путь к драйверу браузера; None, если браузер не поддерживается."""
+        if browser_name not in self.MANAGERS:
+            return None
+        entry = self._read().get(browser_name)
+        if entry and os.path.exists(entry["path"]):
+            return entry["path"]
+            
+        start = time.perf_counter()
+        path = self.MANAGERS[browser_name]().install()
+        entries = self._read()
+        entries[browser_name] = {"path": path, "resolved": time.time()}
+        self._write(entries)
+        self.logger.info("Драйвер %s определён за %.1f с: %s", browser_name, time.perf_counter() - start, path)
+        return path
         
-    def is_login_successful(self):
-        """Проверить, успешен ли логин."""
-        return not self.is_element_visible(self.ERROR_MESSAGE, timeout=2)
-
-# pages/home_page.py
-from selenium.webdriver.common.by import By
-from base.base_page import BasePage
+    def invalidate(self, browser_name):
+        """Забыть путь к драйверу, например после обновления браузера."""
+        entries = self._read()
+        if entries.pop(browser_name, None) is not None:
+            self._write(entries)
 
-class HomePage(BasePage):
-    """Класс для работы с домашней страницей."""
+class ProfileTemplate:
+    """Шаблон профиля браузера, создаваемый один раз и копируемый на каждую сессию.
     
-    # Локаторы
-    WELCOME_MESSAGE = (By.ID, "welcome-message")
-    USER_PROFILE = (By.ID, "user-profile")
-    LOGOUT_BUTTON = (By.ID, "logout")
+    В шаблоне уже пройден первый запуск и заданы настройки без обновлений,
+    подсказок и синхронизации. Копия профиля создаётся в tmpfs, чтобы
+    браузер не писал профиль на диск.
+    """
     
-    def __init__(self, driver):
-        super().__init__(driver)
+    CHROMIUM_PREFERENCES = {
+        "browser": {"check_default_browser": False, "has_seen_welcome_page": True},
+        "distribution": {
+            "skip_first_run_ui": True,
+            "import_bookmarks": False,
+            "make_chrome_default": False,
+            "suppress_first_run_default_browser_prompt": True,
+        },
+        "credentials_enable_service": False,
+        "profile": {"exit_type": "Normal", "exited_cleanly": True, "password_manager_enabled": False},
+        "translate": {"enabled": False},
+        "safebrowsing": {"enabled": False},
+        "sync_promo": {"show_on_first_run_allowed": False},
+    }
+    
+    FIREFOX_PREFERENCES = {
+        "browser.shell.checkDefaultBrowser": False,
+        "browser.startup.homepage_override.mstone": "ignore",
+        "browser.aboutwelcome.enabled": False,
+        "browser.rights.3.shown": True,
+        "datareporting.policy.dataSubmissionPolicyBypassNotification": True,
+        "toolkit.telemetry.reportingpolicy.firstRun": False,
+        "app.update.auto": False,
+        "app.update.enabled": False,
+        "extensions.update.enabled": False,
+        "browser.search.update": False,
+    }
+    
+    # Блокировки запущенного браузера и кэши не копируются
+    COPY_IGNORE = staticmethod(shutil.ignore_patterns(
+        "Singleton*", "lock", ".parentlock", "parent.lock",
+        "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "Crashpad", "cache2",
+    ))
+    STAMP_FILE = ".template"
+    
+    def __init__(self, browser_name, cache_dir, tmpfs_dir="/dev/shm"):
+        self.browser_name = browser_name
+        self.template_dir = os.path.join(cache_dir, "profiles", browser_name)
+        self.tmpfs_dir = tmpfs_dir
+        self.logger = logging.getLogger(__name__)
         
-    def get_welcome_message(self):
-        """Получить приветственное сообщение."""
-        return self.get_text(self.WELCOME_MESSAGE)
+    @property
+    def preferences(self):
+        if self.browser_name == "firefox":
+            return self.FIREFOX_PREFERENCES
+        return self.CHROMIUM_PREFERENCES
         
-    def open_user_profile(self):
-        """Открыть профиль пользователя."""
-        self.click(self.USER_PROFILE)
+    def _stamp(self):
+        """Отпечаток настроек: шаблон пересобирается, если они изменились."""
+        return hashlib.sha1(json.dumps(self.preferences, sort_keys=True).encode()).hexdigest()
         
-    def logout(self):
-        """Выйти из системы."""
-        self.click(self.LOGOUT_BUTTON)
+    def _is_current(self, stamp_path):
+        if not os.path.exists(stamp_path):
+            return False
+        with open(stamp_path, 'r', encoding="utf-8") as f:
+            return f.read() == self._stamp()
+            
+    def ensure(self, warm=None):
+        """Создать шаблон, если его нет или он устарел.
         
-    def is_user_logged_in(self):
-        """Проверить, вошел ли пользователь в систему."""
-        return self.is_element_visible(self.LOGOUT_BUTTON)
+        warm(path) - необязательный запуск браузера с профилем, чтобы он
+        создал свои базы данных один раз, а не в каждой сессии.
+        """
+        stamp_path = os.path.join(self.template_dir, self.STAMP_FILE)
+        if self._is_current(stamp_path):
+            return self.template_dir
+                    
+        parent = os.path.dirname(self.template_dir)
+        os.makedirs(parent, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=f"{self.browser_name}-build-", dir=parent)
+        start = time.perf_counter()
+        self._write_preferences(build_dir)
+        if warm is not None:
+            warm(build_dir)
+        with open(os.path.join(build_dir, self.STAMP_FILE), 'w', encoding="utf-8") as f:
+            f.write(self._stamp())
+            
+        # Готовый шаблон подменяется целиком; если его уже собрал другой воркер, берётся тот
+        if self._is_current(stamp_path):
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return self.template_dir
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+        try:
+            os.rename(build_dir, self.template_dir)
+        except OSError:
+            shutil.rmtree(build_dir, ignore_errors=True)
+        self.logger.info("Шаблон профиля %s собран за %.1f с", self.browser_name, time.perf_counter() - start)
+        return self.template_dir
+        
+    def _write_preferences(self, path):
+        if self.browser_name == "firefox":
+            lines = [f"user_pref({json.dumps(name)}, {json.dumps(value)});" for name, value in self.preferences.items()]
+            with open(os.path.join(path, "user.js"), 'w', encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            return
+        os.makedirs(os.path.join(path, "Default"), exist_ok=True)
+        with open(os.path.join(path, "Default", "Preferences"), 'w', encoding="utf-8") as f:
+            json.dump(self.preferences, f)
+        # Наличие файла отключает сценарий первого запуска
+        open(os.path.join(path, "First Run"), 'w').close()
+        
+    def copy(self):
+        """Скопировать шаблон в новый каталог сессии (в tmpfs, если он доступен)."""
+        base = self.tmpfs_dir if self.tmpfs_dir and os.access(self.tmpfs_dir, os.W_OK) else None
+        path = tempfile.mkdtemp(prefix=f"{self.browser_name}-profile-", dir=base)
+        shutil.copytree(self.template_dir, path, ignore=self.COPY_IGNORE, dirs_exist_ok=True, symlinks=True)
+        return path
+        
+    @staticmethod
+    def remove(path):
+        """Удалить копию профиля после закрытия браузера."""
+        shutil.rmtree(path, ignore_errors=True)
 
-# tests/test_login.py
-import unittest
-from base.base_test import BaseTest
-from pages.login_page import LoginPage
+# utils/form_matrix.py
+import csv
+import os
+import yaml
+
+class FormCase:
+    """Один случай проверки формы: значения полей и ожидаемые ошибки."""
+    
+    def __init__(self, case_id, values, errors):
+        self.case_id = case_id
+        self.values = values
+        # Поле -> ожидаемый фрагмент текста ошибки; пустой словарь - форма должна отправиться
+        self.errors = errors
+        
+    def mismatches(self, actual, submitted):
+        """Расхождения фактических ошибок {поле: текст} и отправки формы с ожидаемыми."""
+        problems = []
+        if submitted and self.errors:
+            problems.append("форма отправлена, хотя ожидались ошибки")
+        elif not submitted and not self.errors:
+            problems.append("форма не отправлена")
+        for field, expected in self.errors.items():
+            text = actual.get(field) or ""
+            if expected.lower() not in text.lower():
+                problems.append(f"{field}: ожидалась ошибка '{expected}', получено '{text}'")
+        for field, text in actual.items():
+            if text and field not in self.errors:
+                problems.append(f"{field}: неожиданная ошибка '{text}'")
+        return problems
+        
+    def __repr__(self):
+        return f"FormCase({self.case_id!r})"
+
+def load_cases(path):
+    """Загрузить таблицу случаев из YAML или CSV.
+    
+    YAML: {"defaults": {поле: значение}, "cases": [{"id", "values", "errors"}]},
+    значения случая дополняют defaults. CSV: столбец id, столбцы полей и
+    столбцы error.<поле> с ожидаемым текстом ошибки (пустая ячейка - ошибки нет).
+    Случай без ожидаемых ошибок считается пройденным, если форма отправилась.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".yaml", ".yml"):
+        with open(path, 'r', encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        if isinstance(data, list):
+            data = {"cases": data}
+        defaults = data.get("defaults", {})
+        return [
+            FormCase(
+                str(case.get("id", f"case_{index}")),
+                {**defaults, **(case.get("values") or {})},
+                {field: str(text) for field, text in (case.get("errors") or {}).items()},
+            )
+            for index, case in enumerate(data["cases"], 1)
+        ]
+    if extension == ".csv":
+        cases = []
+        with open(path, 'r', encoding="utf-8", newline="") as f:
+            for index, row in enumerate(csv.DictReader(f), 1):
+                case_id = row.pop("id", None) or f"case_{index}"
+                # Флажки задаются значениями true/false
+                values = {
+                    name: {"true": True, "false": False}.get(value.lower(), value)
+                    for name, value in row.items() if not name.startswith("error.")
+                }
+                errors = {name[len("error."):]: text for name, text in row.items() if name.startswith("error.") and text}
+                cases.append(FormCase(case_id, values, errors))
+        return cases
+    raise ValueError(f"Неподдерживаемый формат таблицы случаев: {path}")
+
+# utils/grid.py
+import logging
+import statistics
+import threading
+import time
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+class GridEndpoint:
+    """Узел грида (или отдельный chromedriver/standalone) и его загрузка."""
+    
+    def __init__(self, url, max_sessions):
+        self.url = url.rstrip("/")
+        self.max_sessions = max_sessions
+        self.active = 0
+        # Занятые слоты по данным /status, включая сессии других процессов
+        self.reported_busy = None
+        self.status_time = 0.0
+        # Узел не ответил на /status; в очередь к нему не встаём
+        self.down = False
+        self.sessions = 0
+        self.failures = 0
+        self.latencies = []
+        
+    @property
+    def busy(self):
+        if self.reported_busy is None:
+            return self.active
+        return max(self.active, self.reported_busy)
+        
+    @property
+    def free(self):
+        return self.max_sessions - self.busy
+        
+    @property
+    def load(self):
+        return self.busy / self.max_sessions if self.max_sessions else 1.0
+
+class GridClient:
+    """Распределение сессий по нескольким узлам грида.
+    
+    Сессия создаётся на наименее загруженном узле. Если узлы доступны, но
+    свободных слотов нет, запрос ждёт в очереди, а не падает; если
+    недоступны все узлы, ошибка возникает сразу. Ошибки создания сессии
+    повторяются на других узлах. Время создания сессий и ожидания в очереди
+    доступно через stats().
+    """
+    
+    # Как часто обновлять данные о свободных слотах из /status
+    STATUS_TTL = 2.0
+    STATUS_TIMEOUT = 2.0
+    
+    _clients = {}
+    _clients_lock = threading.Lock()
+    
+    def __init__(self, endpoints, queue_timeout=300, retries=3, retry_delay=1.0):
+        self.endpoints = endpoints
+        self.queue_timeout = queue_timeout
+        # Число попыток создать сессию; при 0 сессия не создавалась бы вовсе
+        self.retries = max(retries, 1)
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger(__name__)
+        self.queue_times = []
+        self._condition = threading.Condition()
+        
+    @classmethod
+    def for_config(cls, config):
+        """Общий для процесса клиент для узлов из настроек."""
+        entries = config.grid_endpoints or [config.webdriver_url]
+        endpoints = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            endpoints.append((entry["url"], entry.get("max_sessions", config.grid_max_sessions)))
+        key = tuple(endpoints)
+        with cls._clients_lock:
+            if key not in cls._clients:
+                cls._clients[key] = cls(
+                    [GridEndpoint(url, max_sessions) for url, max_sessions in endpoints],
+                    config.grid_queue_timeout, config.grid_retries
+                )
+            return cls._clients[key]
+            
+    @classmethod
+    def clients(cls):
+        """Созданные в процессе клиенты."""
+        return list(cls._clients.values())
+        
+    def refresh_status(self, endpoint):
+        """Обновить число занятых слотов узла из /status (Selenium Grid 4)."""
+        if time.monotonic() - endpoint.status_time < self.STATUS_TTL:
+            return
+        endpoint.status_time = time.monotonic()
+        try:
+            value = requests.get(f"{endpoint.url}/status", timeout=self.STATUS_TIMEOUT).json()["value"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            if not endpoint.down:
+                self.logger.warning("Узел %s недоступен: %s", endpoint.url, e)
+            endpoint.down = True
+            return
+        endpoint.down = False
+        nodes = [node for node in value.get("nodes", []) if node.get("availability", "UP") == "UP"]
+        slots = [slot for node in nodes for slot in node.get("slots", [])]
+        if slots:
+            endpoint.max_sessions = len(slots)
+            endpoint.reported_busy = sum(1 for slot in slots if slot.get("session"))
+        else:
+            # chromedriver и standalone без списка слотов сообщают только готовность
+            endpoint.reported_busy = None if value.get("ready", True) else endpoint.max_sessions
+            
+    def _select(self, exclude):
+        candidates = [e for e in self.endpoints if e not in exclude and not e.down and e.free > 0]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: (e.load, -e.free))
+        
+    def acquire(self, exclude=()):
+        """Занять слот на наименее загруженном узле, ожидая в очереди при необходимости."""
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        while True:
+            # Опрос узлов идёт без блокировки, чтобы не задерживать освобождение слотов
+            for endpoint in self.endpoints:
+                if endpoint not in exclude:
+                    self.refresh_status(endpoint)
+            with self._condition:
+                endpoint = self._select(exclude)
+                if endpoint is not None:
+                    endpoint.active += 1
+                    waited = time.monotonic() - start
+                    self.queue_times.append(waited)
+                    break
+                if all(e.down for e in self.endpoints if e not in exclude):
+                    raise WebDriverException("Все узлы грида недоступны: " + ", ".join(
+                        e.url for e in self.endpoints if e not in exclude
+                    ))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise WebDriverException(f"Нет свободных слотов в гриде за {self.queue_timeout} с")
+                # Слоты освобождаются и в других процессах, поэтому ждём не дольше TTL статуса
+                self._condition.wait(min(remaining, self.STATUS_TTL))
+        if waited > 1:
+            self.logger.info("Запрос сессии ждал в очереди %.1f с", waited)
+        return endpoint
+        
+    def release(self, endpoint):
+        """Освободить слот узла."""
+        with self._condition:
+            endpoint.active -= 1
+            self._condition.notify()
+            
+    def create_session(self, options):
+        """Создать удалённый драйвер; при закрытии драйвера слот освобождается."""
+        failed = set()
+        for attempt in range(self.retries):
+            # Если остальные узлы уже отказали или недоступны, пробуем снова любой из них
+            available = [e for e in self.endpoints if e not in failed and not e.down]
+            endpoint = self.acquire(exclude=failed if available else ())
+            start = time.monotonic()
+            try:
+                driver = webdriver.Remote(command_executor=endpoint.url, options=options)
+            except Exception as e:
+                self.release(endpoint)
+                endpoint.failures += 1
+                # При следующем запросе узел заново опрашивается через /status
+                endpoint.status_time = 0.0
+                failed.add(endpoint)
+                if attempt + 1 == self.retries:
+                    raise
+                self.logger.warning("Не удалось создать сессию на %s: %s", endpoint.url, e)
+                time.sleep(self.retry_delay * 2 ** attempt)
+                continue
+            with self._condition:
+                endpoint.latencies.append(time.monotonic() - start)
+                endpoint.sessions += 1
+            self._bind_release(driver, endpoint)
+            self.logger.info("Сессия создана на %s", endpoint.url)
+            return driver
+            
+    def _bind_release(self, driver, endpoint):
+        original_quit = driver.quit
+        released = []
+        
+        def quit():
+            try:
+                original_quit()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.release(endpoint)
+                    
+        driver.quit = quit
+        driver.grid_endpoint = endpoint.url
+        
+    def stats(self):
+        """Загрузка узлов, время создания сессий и ожидания в очереди."""
+        def summary(values):
+            if not values:
+                return {"count": 0, "mean": 0.0, "max": 0.0}
+            return {"count": len(values), "mean": statistics.mean(values), "max": max(values)}
+            
+        return {
+            "endpoints": [
+                {"url": e.url, "active": e.active, "max_sessions": e.max_sessions, "down": e.down,
+                 "sessions": e.sessions, "failures": e.failures, "session_start": summary(e.latencies)}
+                for e in self.endpoints
+            ],
+            "queue": summary(self.queue_times),
+        }
+
+# utils/locator_analyzer.py
+import argparse
+import ast
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import sys
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from benchmarks.static_server import StaticServer
+from config.config import Config
+from utils.driver_factory import DriverFactory
+from utils.logger import Logger
+
+# Стратегии поиска Selenium (значения By.*)
+STRATEGIES = {value for name, value in vars(By).items() if name.isupper()}
+
+# Замер поиска внутри страницы: каждый локатор ищется repeat раз в rounds раундах,
+# берётся медиана раунда (performance.now() в браузере огрублён, одиночный замер неточен).
+# Для первого найденного элемента строится CSS-селектор, привязанный к ближайшему предку с id.
+MEASURE_SCRIPT = """
+    function findAll(using, value) {
+        switch (using) {
+            case 'css selector': return Array.prototype.slice.call(document.querySelectorAll(value));
+            case 'tag name': return Array.prototype.slice.call(document.getElementsByTagName(value));
+            case 'xpath':
+                var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                var nodes = [];
+                for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+                return nodes;
+            case 'link text': return Array.prototype.filter.call(document.links,
+                function (a) { return a.textContent.trim() === value; });
+            case 'partial link text': return Array.prototype.filter.call(document.links,
+                function (a) { return a.textContent.indexOf(value) !== -1; });
+        }
+        return [];
+    }
+    function findFirst(using, value) {
+        switch (using) {
+            case 'css selector': return document.querySelector(value);
+            case 'xpath': return document.evaluate(value, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return findAll(using, value)[0] || null;
+    }
+    function time(using, value, rounds, repeat) {
+        var samples = [];
+        for (var r = 0; r < rounds; r++) {
+            var start = performance.now();
+            for (var i = 0; i < repeat; i++) findFirst(using, value);
+            samples.push((performance.now() - start) / repeat);
+        }
+        samples.sort(function (a, b) { return a - b; });
+        return samples[Math.floor(samples.length / 2)];
+    }
+    function part(el) {
+        var tag = el.tagName.toLowerCase();
+        var attributes = ['data-testid', 'name', 'value', 'type', 'for'];
+        for (var i = 0; i < attributes.length; i++) {
+            if (el.hasAttribute(attributes[i])) {
+                return tag + '[' + attributes[i] + '="' + el.getAttribute(attributes[i]).replace(/"/g, '\\\\"') + '"]';
+            }
+        }
+        return tag + Array.prototype.map.call(el.classList, function (c) { return '.' + CSS.escape(c); }).join('');
+    }
+    function scopedCss(el) {
+        if (el.id && document.querySelectorAll('#' + CSS.escape(el.id)).length === 1) return '#' + CSS.escape(el.id);
+        for (var node = el.parentElement; node; node = node.parentElement) {
+            if (node.id) return '#' + CSS.escape(node.id) + ' ' + part(el);
+        }
+        return part(el);
+    }
+    var rounds = arguments[1], repeat = arguments[2];
+    return arguments[0].map(function (locator) {
+        var matches;
+        try {
+            matches = findAll(locator[0], locator[1]);
+        } catch (e) {
+            return {error: String(e)};
+        }
+        var result = {count: matches.length, ms: time(locator[0], locator[1], rounds, repeat)};
+        if (matches.length) {
+            var css = scopedCss(matches[0]);
+            result.suggestion = css;
+            result.suggestion_count = document.querySelectorAll(css).length;
+            result.suggestion_ms = time('css selector', css, rounds, repeat);
+        }
+        return result;
+    });
+"""
+
+def is_locator(value):
+    """Проверить, что значение - локатор Selenium (By, значение)."""
+    return (isinstance(value, tuple) and len(value) == 2
+            and value[0] in STRATEGIES and isinstance(value[1], str))
+
+def collect_locators(package="pages"):
+    """Собрать локаторы из классов страниц пакета: {(By, значение): [имена]}.
+    
+    Учитываются атрибуты классов - локаторы и словари локаторов (как
+    RegistrationPage.FIELDS). Общие локаторы асинхронных страниц попадают
+    под несколькими именами и замеряются один раз.
+    """
+    locators = {}
+    root = importlib.import_module(package)
+    for info in pkgutil.iter_modules(root.__path__):
+        module = importlib.import_module(f"{package}.{info.name}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for attribute, value in vars(cls).items():
+                if is_locator(value):
+                    locators.setdefault(value, []).append(f"{class_name}.{attribute}")
+                elif isinstance(value, dict):
+                    for key, item in value.items():
+                        if is_locator(item):
+                            locators.setdefault(item, []).append(f"{class_name}.{attribute}[{key!r}]")
+    return locators
+
+def scan_sources(paths, locators=None):
+    """Добавить локаторы, записанные прямо в тестах: find_element(By.X, "...") и (By.X, "...")."""
+    locators = {} if locators is None else locators
+    for path in paths:
+        with open(path, 'r', encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and len(node.args) >= 2:
+                by, value = node.args[:2]
+            elif isinstance(node, ast.Tuple) and len(node.elts) == 2:
+                by, value = node.elts
+            else:
+                continue
+            if not (isinstance(by, ast.Attribute) and isinstance(by.value, ast.Name) and by.value.id == "By"
+                    and isinstance(value, ast.Constant) and isinstance(value.value, str)):
+                continue
+            strategy = getattr(By, by.attr, None)
+            if strategy in STRATEGIES:
+                locators.setdefault((strategy, value.value), []).append(f"{os.path.basename(path)}:{node.lineno}")
+    return locators
+
+def to_w3c(locator):
+    """Перевести локатор в стратегию протокола W3C так же, как это делает Selenium перед отправкой."""
+    by, value = locator
+    if by == By.ID:
+        return "css selector", f'[id="{value}"]'
+    if by == By.CLASS_NAME:
+        return "css selector", f".{value}"
+    if by == By.NAME:
+        return "css selector", f'[name="{value}"]'
+    return by, value
+
+def static_issues(locator):
+    """Замечания, видные без страницы: поиск по всему документу без привязки к предку."""
+    by, value = locator
+    if by == By.XPATH and value.startswith("//") and "@id" not in value:
+        return ["unscoped: XPath просматривает весь документ"]
+    if by in (By.CLASS_NAME, By.TAG_NAME):
+        return [f"unscoped: поиск по {by} во всём документе"]
+    return []
+
+class LocatorAnalyzer:
+    """Замер стоимости поиска локаторов страниц на живой странице.
+    
+    Каждый локатор ищется внутри страницы одним скриптом, поэтому сетевые
+    задержки драйвера не искажают замер. Помечаются медленные (slow_ms на
+    поиск), неоднозначные (больше одного совпадения) и непривязанные
+    локаторы; для них предлагается CSS-селектор от ближайшего предка с id.
+    """
+    
+    def __init__(self, locators, slow_ms=0.1, rounds=7, repeat=50):
+        self.locators = locators
+        self.slow_ms = slow_ms
+        self.rounds = rounds
+        self.repeat = repeat
+        
+    def analyze(self, driver, url):
+        """Открыть страницу и замерить все локаторы; результат - список словарей по локаторам."""
+        driver.get(url)
+        locators = list(self.locators)
+        measured = driver.execute_script(
+            MEASURE_SCRIPT, [list(to_w3c(locator)) for locator in locators], self.rounds, self.repeat
+        )
+        return [self._result(locator, data) for locator, data in zip(locators, measured)]
+        
+    def _result(self, locator, data):
+        result = {"by": locator[0], "value": locator[1], "names": self.locators[locator], **data}
+        issues = static_issues(locator)
+        if data.get("error"):
+            issues.append(f"error: {data['error']}")
+        elif data["count"]:
+            if data["ms"] >= self.slow_ms:
+                issues.append(f"slow: {data['ms'] * 1000:.1f} мкс на поиск")
+            if data["count"] > 1:
+                issues.append(f"ambiguous: совпадений {data['count']}")
+        result["issues"] = issues
+        if not issues or not data.get("count") or data["suggestion_count"] != 1:
+            result.pop("suggestion", None)
+        return result
+
+def locator_key(result):
+    """Ключ локатора в эталоне."""
+    return f"{result['by']}={result['value']}"
+
+def compare_baseline(report, baseline, max_slowdown, min_delta_ms):
+    """Найти локаторы, поиск которых замедлился относительно эталона."""
+    regressions = []
+    for url, results in report["pages"].items():
+        previous = baseline.get("pages", {}).get(url, {})
+        for result in results:
+            before = previous.get(locator_key(result))
+            after = result.get("ms")
+            if before is None or after is None or not result.get("count"):
+                continue
+            if after > before * max_slowdown and after - before > min_delta_ms:
+                regressions.append((url, result, before))
+    return regressions
+
+def print_report(report):
+    """Вывести замечания по локаторам."""
+    for url, results in report["pages"].items():
+        print(f"[{url}]")
+        for result in sorted(results, key=lambda r: r.get("ms") or 0, reverse=True):
+            if not result["issues"]:
+                continue
+            timing = f"{result['ms'] * 1000:7.1f} мкс" if result.get("ms") is not None else "      -    "
+            print(f"  {timing} x{result.get('count', 0):<3} {', '.join(result['names'])}: "
+                  f"{result['by']}={result['value']}")
+            for issue in result["issues"]:
+                print(f"      {issue}")
+            if result.get("suggestion"):
+                print(f"      -> (By.CSS_SELECTOR, {result['suggestion']!r}), "
+                      f"{result['suggestion_ms'] * 1000:.1f} мкс")
+
+def main(argv=None):
+    """Точка входа: python -m utils.locator_analyzer --url URL [--baseline file.json]."""
+    parser = argparse.ArgumentParser(description="Анализ скорости и однозначности локаторов объектов страниц")
+    parser.add_argument("--url", action="append", default=[], help="Страница для замера (можно несколько)")
+    parser.add_argument("--root", default=None, help="Каталог статических страниц; относительные --url открываются с него")
+    parser.add_argument("--source", action="append", default=[], help="Файл тестов с локаторами вне объектов страниц")
+    parser.add_argument("--browser", default="chrome", help="Браузер, например chrome-fast")
+    parser.add_argument("--static", action="store_true", help="Только проверки без браузера")
+    parser.add_argument("--slow-ms", type=float, default=0.1, help="Порог медленного поиска, мс")
+    parser.add_argument("--baseline", default=None, help="Файл эталонных замеров JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить замеры как эталон")
+    parser.add_argument("--max-slowdown", type=float, default=1.5, help="Допустимое замедление относительно эталона, раз")
+    parser.add_argument("--min-delta-ms", type=float, default=0.02, help="Замедления меньше этого не считаются, мс")
+    parser.add_argument("--output", default=None, help="Файл результатов JSON")
+    args = parser.parse_args(argv)
+    
+    locators = scan_sources(args.source, collect_locators())
+    if args.static:
+        for locator, names in locators.items():
+            for issue in static_issues(locator):
+                print(f"{', '.join(names)}: {locator[0]}={locator[1]}: {issue}")
+        return 0
+        
+    Logger.setup_logger()
+    config = Config()
+    config.browser = args.browser
+    analyzer = LocatorAnalyzer(locators, slow_ms=args.slow_ms)
+    report = {"meta": {"started": datetime.now().isoformat(), "browser": args.browser}, "pages": {}}
+    with contextlib.ExitStack() as stack:
+        server = stack.enter_context(StaticServer(os.path.abspath(args.root))) if args.root else None
+        driver = DriverFactory().get_configured_driver(config)
+        stack.callback(driver.quit)
+        for url in args.url or [config.base_url]:
+            address = url if "://" in url or not server else f"{server.base_url}/{url.lstrip('/')}"
+            report["pages"][url] = analyzer.analyze(driver, address)
+            
+    print_report(report)
+    output = args.output or os.path.join(
+        config.reports_dir, f"locators_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    directory = os.path.dirname(output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(output, 'w', encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"Результаты сохранены: {output}")
+    
+    if not args.baseline:
+        return 0
+    timings = {url: {locator_key(r): r["ms"] for r in results if r.get("count")}
+               for url, results in report["pages"].items()}
+    if args.save_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding="utf-8") as f:
+            json.dump({"pages": timings}, f, ensure_ascii=False, indent=1)
+        print(f"Эталон сохранён: {args.baseline}")
+        return 0
+    with open(args.baseline, 'r', encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_baseline(report, baseline, args.max_slowdown, args.min_delta_ms)
+    for url, result, before in regressions:
+        print(f"Замедление {', '.join(result['names'])} на {url}: "
+              f"{before * 1000:.1f} -> {result['ms'] * 1000:.1f} мкс")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# utils/logger.py
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+# Лог-файл текущего теста; записи маршрутизируются по нему, а не по отдельным обработчикам
+current_test_log = contextvars.ContextVar("current_test_log", default=None)
+
+class TestLogFilter(logging.Filter):
+    """Запомнить в записи лог-файл теста, пока она ещё в потоке теста."""
+    
+    def filter(self, record):
+        record.test_log_file = current_test_log.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записи в одну строку JSON."""
+    
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        # Записи из очереди уже содержат текст исключения в message
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class TestRoutingHandler(logging.Handler):
+    """Запись в лог-файл теста, указанный в самой записи."""
+    
+    def __init__(self, formatter, max_open_files=16):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.max_open_files = max_open_files
+        self._files = OrderedDict()
+        
+    def emit(self, record):
+        path = getattr(record, "test_log_file", None)
+        if not path:
+            return
+        handler = self._files.pop(path, None)
+        if handler is None:
+            handler = logging.FileHandler(path, encoding="utf-8")
+            handler.setFormatter(self.formatter)
+        self._files[path] = handler
+        # Файлы завершившихся тестов закрываются по мере открытия новых
+        while len(self._files) > self.max_open_files:
+            self._files.popitem(last=False)[1].close()
+        handler.emit(record)
+        
+    def close(self):
+        for handler in self._files.values():
+            handler.close()
+        self._files.clear()
+        super().close()
+
+class Logger:
+    """Настройка логирования."""
+    
+    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    _listener = None
+    _queue_handler = None
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def setup_logger(log_level="INFO", log_file=None, json_format=False):
+        """Настроить логгер.
+        
+        Обработчики создаются один раз на процесс, запись в файлы идёт в
+        отдельном потоке. Повторные вызовы только направляют записи текущего
+        теста в log_file.
+        """
+        with Logger._lock:
+            if Logger._listener is None:
+                Logger._configure(log_level, json_format)
+        if log_file:
+            Logger.set_test_log(log_file)
+        return logging.getLogger()
+        
+    @staticmethod
+    def set_test_log(log_file):
+        """Направить записи текущего теста в log_file."""
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        return current_test_log.set(log_file)
+        
+    @staticmethod
+    @contextlib.contextmanager
+    def test_log(log_file):
+        """Контекст, в котором записи направляются в лог-файл теста."""
+        token = Logger.set_test_log(log_file)
+        try:
+            yield
+        finally:
+            current_test_log.reset(token)
+            
+    @staticmethod
+    def shutdown():
+        """Дописать оставшиеся записи и остановить поток логирования."""
+        with Logger._lock:
+            if Logger._listener is not None:
+                logging.getLogger().removeHandler(Logger._queue_handler)
+                Logger._listener.stop()
+                for handler in Logger._listener.handlers:
+                    handler.close()
+                Logger._listener = None
+                Logger._queue_handler = None
+                
+    @staticmethod
+    def _configure(log_level, json_format):
+        """Однократно подключить очередь логирования к корневому логгеру."""
+        # Настройка уровня логирования
+        numeric_level = getattr(logging, log_level.upper(), None)
+        if not isinstance(numeric_level, int):
+            numeric_level = logging.INFO
+            
+        text_formatter = logging.Formatter(Logger.LOG_FORMAT, Logger.DATE_FORMAT)
+        file_formatter = JsonFormatter(datefmt=Logger.DATE_FORMAT) if json_format else text_formatter
+        
+        console = logging.StreamHandler()
+        console.setLevel(numeric_level)
+        console.setFormatter(text_formatter)
+        
+        # Стандартный QueueHandler собирает сообщение (и текст исключения) ещё в потоке
+        # теста, поэтому изменяемые аргументы не успевают поменяться до записи
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(TestLogFilter())
+        
+        root = logging.getLogger()
+        root.setLevel(numeric_level)
+        root.addHandler(queue_handler)
+        Logger._queue_handler = queue_handler
+        
+        Logger._listener = logging.handlers.QueueListener(
+            log_queue, console, TestRoutingHandler(file_formatter), respect_handler_level=True
+        )
+        Logger._listener.start()
+        atexit.register(Logger.shutdown)
+
+# utils/artifacts.py
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+class ArtifactWriter:
+    """Фоновая запись артефактов падений (скриншотов) с дедупликацией.
+    
+    Тестовый поток только передаёт байты; уменьшение, сжатие и запись на
+    диск выполняются в пуле потоков. Одинаковые картинки (например,
+    страница ошибки при недоступной среде) хранятся один раз: имя файла -
+    хэш содержимого. После исчерпания бюджета на прогон скриншоты сначала
+    уменьшаются сильнее, а затем перестают сохраняться.
+    """
+    
+    INDEX_FILE = "index.jsonl"
+    # Доля бюджета, после которой скриншоты уменьшаются вдвое
+    DEGRADE_AT = 0.8
+    
+    def __init__(self, directory, workers=2, max_width=None, budget_mb=200):
+        self.directory = directory
+        self.max_width = max_width
+        self.budget = budget_mb * 1024 * 1024
+        self.logger = logging.getLogger(__name__)
+        self.bytes_written = 0
+        self.saved = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self._full = False
+        self._stored = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        if max_width and Image is None:
+            self.logger.warning("Pillow не установлен, скриншоты сохраняются без уменьшения")
+            
+    @property
+    def exhausted(self):
+        """Бюджет прогона исчерпан - снимать скриншот уже не нужно."""
+        return self._full or self.bytes_written >= self.budget
+        
+    def submit(self, name, data, extension="png"):
+        """Поставить артефакт в очередь записи; результат - путь к файлу или None."""
+        if self.exhausted:
+            with self._lock:
+                self.dropped += 1
+            return None
+        return self._executor.submit(self._write, name, data, extension)
+        
+    def _write(self, name, data, extension):
+        degraded = self.bytes_written >= self.budget * self.DEGRADE_AT
+        data = self._encode(data, extension, degraded)
+        digest = hashlib.sha1(data).hexdigest()[:20]
+        file_name = f"{digest}.{extension}"
+        path = os.path.join(self.directory, file_name)
+        
+        with self._lock:
+            duplicate = digest in self._stored
+            if duplicate:
+                self.duplicates += 1
+            elif self.bytes_written + len(data) > self.budget:
+                self.dropped += 1
+                self._full = True
+                self.logger.warning("Бюджет артефактов исчерпан, %s не сохранён", name)
+                return None
+            else:
+                # Место резервируется до записи, чтобы параллельные задачи не превысили бюджет
+                self._stored[digest] = path
+                self.bytes_written += len(data)
+                self.saved += 1
+                
+        if not duplicate:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        self._append_index({"name": name, "file": file_name, "bytes": len(data),
+                            "duplicate": duplicate, "degraded": degraded})
+        return path
+        
+    def _encode(self, data, extension, degraded):
+        """Уменьшить и пережать картинку, если доступен Pillow."""
+        if Image is None or extension != "png" or not (self.max_width or degraded):
+            return data
+        try:
+            image = Image.open(io.BytesIO(data))
+        except OSError:
+            return data
+        width = self.max_width or image.width
+        if degraded:
+            width = min(width, image.width) // 2
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+        
+    def _append_index(self, record):
+        with self._lock:
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'a', encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                
+    def shutdown(self):
+        """Дождаться записи всех артефактов."""
+        self._executor.shutdown(wait=True)
+        if self.saved or self.dropped:
+            self.logger.info(
+                "Артефакты: сохранено %s (%.1f МБ), повторов %s, пропущено %s",
+                self.saved, self.bytes_written / 1024 / 1024, self.duplicates, self.dropped
+            )
+
+# utils/async_webdriver.py
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+import aiohttp
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+# Ключ ссылки на элемент в протоколе W3C WebDriver
+ELEMENT_KEY = "element-6066-11e4-a52f-4f735466cecf"
+
+class AsyncWebElement:
+    """Ссылка на элемент в асинхронной сессии."""
+    
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.id = element_id
+        
+    def to_json(self):
+        return {ELEMENT_KEY: self.id}
+        
+    async def click(self):
+        await self.driver.command("POST", f"/element/{self.id}/click")
+        
+    async def clear(self):
+        await self.driver.command("POST", f"/element/{self.id}/clear")
+        
+    async def send_keys(self, text):
+        await self.driver.command("POST", f"/element/{self.id}/value", {"text": str(text)})
+        
+    async def text(self):
+        return await self.driver.command("GET", f"/element/{self.id}/text")
+        
+    async def is_displayed(self):
+        return await self.driver.command("GET", f"/element/{self.id}/displayed")
+
+class AsyncWebDriver:
+    """Минимальный асинхронный клиент протокола W3C WebDriver.
+    
+    Пока один тест ждёт ответа драйвера, цикл событий обслуживает другие
+    сессии, поэтому один поток может вести десятки браузеров. HTTP-соединения
+    берутся из общего пула aiohttp.ClientSession фабрики.
+    """
+    
+    # Ошибки протокола W3C в исключения Selenium, которые уже обрабатывает фреймворк
+    ERRORS = {
+        "no such element": NoSuchElementException,
+        "stale element reference": StaleElementReferenceException,
+        "script timeout": TimeoutException,
+        "timeout": TimeoutException,
+        "javascript error": JavascriptException,
+    }
+    
+    def __init__(self, http, server_url, session_id):
+        self.http = http
+        self.server_url = server_url.rstrip("/")
+        self.session_id = session_id
+        self.logger = logging.getLogger(__name__)
+        
+    @classmethod
+    async def start(cls, http, server_url, capabilities):
+        """Создать новую сессию браузера."""
+        driver = cls(http, server_url, None)
+        value = await driver.request("POST", "/session", {"capabilities": {"alwaysMatch": capabilities}})
+        driver.session_id = value["sessionId"]
+        return driver
+        
+    async def request(self, method, path, payload=None):
+        """Выполнить HTTP-запрос к серверу и вернуть поле value ответа."""
+        async with self.http.request(method, self.server_url + path, json=payload) as response:
+            text = await response.text()
+        try:
+            body = json.loads(text)
+        except ValueError:
+            # Прокси перед гридом отвечает на ошибки текстом или HTML
+            body = text
+        value = body.get("value") if isinstance(body, dict) else None
+        if response.status >= 400 or (isinstance(value, dict) and "error" in value):
+            error = value.get("error", "") if isinstance(value, dict) else ""
+            message = value.get("message", "") if isinstance(value, dict) else str(body)
+            raise self.ERRORS.get(error, WebDriverException)(message)
+        return value
+        
+    async def command(self, method, path, payload=None):
+        """Выполнить команду в текущей сессии."""
+        if method == "POST" and payload is None:
+            payload = {}
+        return self._unwrap(await self.request(method, f"/session/{self.session_id}{path}", payload))
+        
+    def _unwrap(self, value):
+        """Заменить ссылки на элементы объектами AsyncWebElement."""
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncWebElement(self, value[ELEMENT_KEY])
+            return {key: self._unwrap(item) for key, item in value.items()}
+        return value
+        
+    @staticmethod
+    def _wrap(value):
+        if isinstance(value, AsyncWebElement):
+            return value.to_json()
+        if isinstance(value, (list, tuple)):
+            return [AsyncWebDriver._wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: AsyncWebDriver._wrap(item) for key, item in value.items()}
+        return value
+        
+    async def get(self, url):
+        await self.command("POST", "/url", {"url": url})
+        
+    async def find_elements(self, by, value):
+        return await self.command("POST", "/elements", {"using": by, "value": value})
+        
+    async def execute_script(self, script, *args):
+        return await self.command("POST", "/execute/sync", {"script": script, "args": self._wrap(args)})
+        
+    async def execute_async_script(self, script, *args):
+        return await self.command("POST", "/execute/async", {"script": script, "args": self._wrap(args)})
+        
+    async def set_script_timeout(self, seconds):
+        await self.command("POST", "/timeouts", {"script": int(seconds * 1000)})
+        
+    async def get_screenshot_as_base64(self):
+        return await self.command("GET", "/screenshot")
+        
+    async def quit(self):
+        if self.session_id is None:
+            return
+        try:
+            await self.request("DELETE", f"/session/{self.session_id}")
+        except (WebDriverException, aiohttp.ClientError) as e:
+            self.logger.warning("Не удалось закрыть сессию %s: %s", self.session_id, e)
+        self.session_id = None
+
+class AsyncDriverFactory:
+    """Создание асинхронных сессий с общим пулом HTTP-соединений."""
+    
+    def __init__(self, server_url, capabilities, max_connections=100):
+        self.server_url = server_url
+        self.capabilities = capabilities
+        self.max_connections = max_connections
+        self.logger = logging.getLogger(__name__)
+        self._http = None
+        
+    @classmethod
+    def from_config(cls, config):
+        """Фабрика для браузера и сервера WebDriver из настроек."""
+        return cls(config.webdriver_url, cls.capabilities_for(config), config.async_max_connections)
+        
+    @staticmethod
+    def capabilities_for(config):
+        """Возможности сессии для браузера из настроек (с учётом быстрого профиля)."""
+        # Импорт здесь: driver_factory импортирует модули, которым асинхронный слой не нужен
+        from utils.driver_factory import DriverFactory
+        browser = config.browser.lower()
+        fast = browser.endswith(DriverFactory.FAST_SUFFIX) or config.browser_profile == "fast"
+        if browser.endswith(DriverFactory.FAST_SUFFIX):
+            browser = browser[:-len(DriverFactory.FAST_SUFFIX)]
+        if browser == "firefox":
+            options = FirefoxOptions()
+            if fast:
+                options.add_argument("-headless")
+                for name, value in DriverFactory.FAST_FIREFOX_PREFERENCES.items():
+                    options.set_preference(name, value)
+        else:
+            options = ChromeOptions()
+            if fast:
+                for argument in DriverFactory.FAST_CHROMIUM_ARGUMENTS:
+                    options.add_argument(argument)
+                options.add_argument(f"--window-size={config.viewport_width},{config.viewport_height}")
+        return options.to_capabilities()
+        
+    @property
+    def http(self):
+        if self._http is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._http = aiohttp.ClientSession(connector=connector)
+        return self._http
+        
+    async def new_driver(self):
+        """Открыть новую сессию браузера."""
+        driver = await AsyncWebDriver.start(self.http, self.server_url, self.capabilities)
+        self.logger.info("Открыта асинхронная сессия %s", driver.session_id)
+        return driver
+        
+    @asynccontextmanager
+    async def sessions(self, count):
+        """Открыть count сессий одновременно и закрыть их по выходе."""
+        results = await asyncio.gather(*(self.new_driver() for _ in range(count)), return_exceptions=True)
+        drivers = [result for result in results if isinstance(result, AsyncWebDriver)]
+        try:
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            yield drivers
+        finally:
+            await asyncio.gather(*(driver.quit() for driver in drivers))
+            
+    async def close(self):
+        """Закрыть пул соединений."""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+# utils/auth.py
+import json
+import logging
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+import requests
+
+class AuthSession:
+    """Cookies и токен пользователя, полученные при входе через API."""
+    
+    def __init__(self, cookies, token, expires_at):
+        self.cookies = cookies
+        self.token = token
+        self.expires_at = expires_at
+        
+    def is_expired(self, margin=30):
+        """Сессия истекла или истечёт в ближайшие margin секунд."""
+        return time.time() + margin >= self.expires_at
+
+class AuthHelper:
+    """Вход через HTTP API с кэшированием сессий и подстановкой их в браузер.
+    
+    Форму логина проходят только тесты самого логина, остальные получают
+    уже авторизованный браузер.
+    """
+    
+    # Сессии общие для всех тестов процесса: (base_url, пользователь) -> AuthSession
+    _sessions = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, config):
+        self.base_url = config.base_url
+        self.login_url = urljoin(config.base_url, config.auth_login_path)
+        self.token_storage_key = config.auth_token_storage_key
+        self.session_ttl = config.auth_session_ttl
+        self.logger = logging.getLogger(__name__)
+        
+    def login(self, username, password):
+        """Получить сессию пользователя из кэша или войти через API."""
+        key = (self.base_url, username)
+        with self._lock:
+            session = self._sessions.get(key)
+        if session is not None and not session.is_expired():
+            return session
+            
+        response = requests.post(self.login_url, json={"username": username, "password": password}, timeout=10)
+        response.raise_for_status()
+        
+        expires_at = time.time() + self.session_ttl
+        cookies = []
+        for cookie in response.cookies:
+            entry = {
+                "name": cookie.name,
+                "value": cookie.value,
+                "path": cookie.path or "/",
+                "secure": bool(cookie.secure),
+                "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+            }
+            if cookie.domain_specified:
+                entry["domain"] = cookie.domain
+            if cookie.expires:
+                entry["expiry"] = int(cookie.expires)
+                expires_at = min(expires_at, cookie.expires)
+            cookies.append(entry)
+            
+        token = None
+        if "json" in response.headers.get("Content-Type", ""):
+            body = response.json()
+            token = body.get("token") or body.get("access_token")
+            if body.get("expires_in"):
+                expires_at = min(expires_at, time.time() + body["expires_in"])
+                
+        session = AuthSession(cookies, token, expires_at)
+        with self._lock:
+            self._sessions[key] = session
+        self.logger.info("Выполнен вход через API: %s", username)
+        return session
+        
+    def inject(self, driver, session):
+        """Подставить cookies и токен сессии в браузер.
+        
+        В Chromium это делается через CDP до первой навигации; вернуть
+        идентификатор скрипта, который нужно передать в eject после теста.
+        В остальных браузерах cookies можно ставить только на открытой
+        странице того же домена, поэтому сначала открывается base_url.
+        """
+        origin = "{0.scheme}://{0.netloc}".format(urlparse(self.base_url))
+        storage_script = None
+        if session.token:
+            storage_script = (
+                f"if (window.location.origin === {json.dumps(origin)}) "
+                f"window.localStorage.setItem({json.dumps(self.token_storage_key)}, {json.dumps(session.token)});"
+            )
+            
+        if hasattr(driver, "execute_cdp_cmd"):
+            cdp_cookies = []
+            for cookie in session.cookies:
+                entry = {key: value for key, value in cookie.items() if key != "expiry"}
+                if "domain" not in entry:
+                    entry["url"] = origin
+                if "expiry" in cookie:
+                    entry["expires"] = cookie["expiry"]
+                cdp_cookies.append(entry)
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp_cookies})
+            if storage_script:
+                return driver.execute_cdp_cmd(
+                    "Page.addScriptToEvaluateOnNewDocument", {"source": storage_script}
+                )["identifier"]
+            return None
+            
+        driver.get(self.base_url)
+        for cookie in session.cookies:
+            driver.add_cookie(cookie)
+        if storage_script:
+            driver.execute_script(storage_script)
+        return None
+        
+    @staticmethod
+    def eject(driver, injection):
+        """Убрать скрипт подстановки токена, чтобы он не достался следующему тесту пула."""
+        if injection is not None:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": injection})
+
+# utils/backend_stub.py
+import base64
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+
+def body_hash(text):
+    """FNV-1a по UTF-16 кодам символов - тот же хэш, что считает скрипт в браузере."""
+    value = 0x811c9dc5
+    data = (text or "").encode("utf-16-le")
+    for i in range(0, len(data), 2):
+        value = ((value ^ (data[i] | data[i + 1] << 8)) * 0x01000193) & 0xffffffff
+    return f"{value:08x}"
+
+class BackendStub:
+    """Запись и воспроизведение XHR/fetch-трафика приложения в HAR-файлы.
+    
+    Запись идёт на стороне драйвера: события Network.* читаются из журнала
+    performance ChromeDriver, тела ответов - командой Network.getResponseBody.
+    Страница ничего не хранит, поэтому переходы между доменами и новые
+    вкладки трафик не теряют. Для воспроизведения в браузер до загрузки
+    страницы встраивается обёртка над fetch и XMLHttpRequest, которая отдаёт
+    ответы из индекса по ключу «метод + URL + хэш тела запроса».
+    """
+    
+    RECORD = "record"
+    REPLAY = "replay"
+    LIVE = "live"
+    
+    # Типы ресурсов, которые записываются: запросы приложения к бэкенду
+    RECORDED_TYPES = ("XHR", "Fetch")
+    
+    # Буфер тел ответов в браузере, чтобы они дожили до конца теста
+    RESOURCE_BUFFER_SIZE = 64 * 1024 * 1024
+    TOTAL_BUFFER_SIZE = 256 * 1024 * 1024
+    
+    SHIM_SCRIPT = """
+    (function (settings) {
+        if (window.__qaBackendInstalled) return;
+        window.__qaBackendInstalled = true;
+        var NULL_BODY = [101, 204, 205, 304];
+        var MISSING = {status: 599, headers: {'content-type': 'text/plain'}, text: 'No recorded response', time: 0};
+        var served = {};
+        
+        function hash(text) {
+            var h = 0x811c9dc5;
+            text = text || '';
+            for (var i = 0; i < text.length; i++) h = Math.imul(h ^ text.charCodeAt(i), 0x01000193) >>> 0;
+            return ('0000000' + h.toString(16)).slice(-8);
+        }
+        function absolute(url) { return new URL(url, document.baseURI).href; }
+        function lenientKey(method, url) {
+            var parsed = new URL(url);
+            return method.toUpperCase() + ' ' + parsed.origin + parsed.pathname;
+        }
+        function lookup(method, url, body) {
+            var key = method.toUpperCase() + ' ' + url + ' ' + hash(body);
+            var list = settings.entries[key];
+            if (!list && !settings.strict) {
+                key = lenientKey(method, url);
+                list = settings.entries[key];
+            }
+            if (!list) return settings.strict ? MISSING : null;
+            // Повторные одинаковые запросы получают записанные ответы по порядку
+            var index = served[key] || 0;
+            served[key] = index + 1;
+            return list[Math.min(index, list.length - 1)];
+        }
+        function delay(entry) {
+            if (settings.latency === 'recorded') return entry.time || 0;
+            return typeof settings.latency === 'number' ? settings.latency : 0;
+        }
+        
+        var originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            var request = new Request(input, init), url = absolute(request.url);
+            return request.clone().text().then(function (body) {
+                var entry = lookup(request.method, url, body);
+                if (!entry) return originalFetch(input, init);
+                return new Promise(function (resolve) {
+                    setTimeout(function () {
+                        var text = NULL_BODY.indexOf(entry.status) === -1 ? entry.text : null;
+                        resolve(new Response(text, {status: entry.status, headers: entry.headers}));
+                    }, delay(entry));
+                });
+            });
+        };
+        
+        var proto = XMLHttpRequest.prototype, originalOpen = proto.open, originalSend = proto.send;
+        proto.open = function (method, url) {
+            this.__qa = {method: method, url: absolute(url)};
+            return originalOpen.apply(this, arguments);
+        };
+        proto.send = function (body) {
+            var xhr = this, info = xhr.__qa, text = typeof body === 'string' ? body : '';
+            var entry = info && lookup(info.method, info.url, text);
+            if (!entry) return originalSend.apply(xhr, arguments);
+            setTimeout(function () { replayXhr(xhr, entry); }, delay(entry));
+        };
+        function replayXhr(xhr, entry) {
+            var headers = entry.headers || {}, text = entry.text || '', response = text;
+            if (xhr.responseType === 'json') {
+                try { response = JSON.parse(text); } catch (e) { response = null; }
+            }
+            var values = {readyState: 4, status: entry.status, statusText: '', responseText: text,
+                          response: response, responseURL: xhr.__qa.url};
+            Object.keys(values).forEach(function (name) {
+                Object.defineProperty(xhr, name, {value: values[name], configurable: true});
+            });
+            xhr.getAllResponseHeaders = function () {
+                return Object.keys(headers).map(function (name) { return name + ': ' + headers[name]; }).join('\\r\\n');
+            };
+            xhr.getResponseHeader = function (name) {
+                var value = headers[name.toLowerCase()];
+                return value === undefined ? null : value;
+            };
+            ['readystatechange', 'load', 'loadend'].forEach(function (type) {
+                xhr.dispatchEvent(new ProgressEvent(type));
+            });
+        }
+    })(%s);
+    """
+    
+    # Индексы последних прочитанных HAR-файлов, чтобы не разбирать их для каждого теста
+    _index_cache = OrderedDict()
+    INDEX_CACHE_SIZE = 64
+    
+    def __init__(self, mode, har_dir, latency="recorded", strict=False):
+        self.mode = mode
+        self.har_dir = har_dir
+        self.latency = latency
+        self.strict = strict
+        self.logger = logging.getLogger(__name__)
+        self._script_id = None
+        self._har_path = None
+        self._recording = False
+        self._requests = {}
+        self._entries = []
+        
+    @classmethod
+    def from_config(cls, config):
+        """Создать заглушку по настройкам; для режима live вернуть None."""
+        if config.backend_mode == cls.LIVE:
+            return None
+        return cls(config.backend_mode, config.har_dir, config.backend_latency, config.backend_strict)
+        
+    def har_path(self, test_name):
+        """Путь к HAR-файлу теста."""
+        return os.path.join(self.har_dir, re.sub(r"[^\w.-]+", "_", test_name) + ".har")
+        
+    def start(self, driver, test_name):
+        """Начать запись трафика или встроить обёртку воспроизведения до первой навигации теста."""
+        if not hasattr(driver, "execute_cdp_cmd"):
+            self.logger.warning("Запись и воспроизведение трафика поддерживаются только в Chromium")
+            return
+        self._har_path = self.har_path(test_name)
+        if self.mode == self.RECORD:
+            self._start_recording(driver)
+            return
+        entries = self.load_index(self._har_path)
+        if not entries:
+            self.logger.warning("Нет записанного трафика для %s", test_name)
+        settings = {"strict": self.strict, "latency": self.latency, "entries": entries}
+        self._script_id = driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": self.SHIM_SCRIPT % json.dumps(settings, ensure_ascii=False)}
+        )["identifier"]
+        
+    def stop(self, driver):
+        """Снять обёртку или закончить запись и сохранить трафик теста."""
+        if self._recording:
+            self.collect(driver)
+            self.save(self._har_path, self._entries)
+            self._recording = False
+            self._requests = {}
+            self._entries = []
+        if self._script_id is not None:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": self._script_id})
+            self._script_id = None
+            
+    def _start_recording(self, driver):
+        """Включить буфер тел ответов и отбросить события, накопленные до теста."""
+        try:
+            driver.get_log("performance")
+        except WebDriverException:
+            self.logger.warning("Журнал performance недоступен, трафик не записывается")
+            return
+        driver.execute_cdp_cmd("Network.enable", {
+            "maxResourceBufferSize": self.RESOURCE_BUFFER_SIZE,
+            "maxTotalBufferSize": self.TOTAL_BUFFER_SIZE,
+        })
+        self._recording = True
+        
+    def collect(self, driver):
+        """Перенести завершённые запросы из журнала драйвера в запись теста.
+        
+        Вызывается при остановке записи; перед закрытием вкладки или уходом
+        с тяжёлой страницы его можно вызвать раньше, пока браузер хранит тела ответов.
+        """
+        if not self._recording:
+            return
+        for log_entry in driver.get_log("performance"):
+            message = json.loads(log_entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                if params.get("type") in self.RECORDED_TYPES:
+                    self._requests[request_id] = {"request": params["request"], "sent": params}
+            elif request_id not in self._requests:
+                continue
+            elif method == "Network.responseReceived":
+                self._requests[request_id]["response"] = params["response"]
+            elif method == "Network.loadingFinished":
+                info = self._requests.pop(request_id)
+                if "response" in info:
+                    self._entries.append(self._entry(driver, request_id, info, params["timestamp"]))
+            elif method == "Network.loadingFailed":
+                self._requests.pop(request_id)
+                
+    def _entry(self, driver, request_id, info, finished):
+        """Собрать запись запроса с телами запроса и ответа."""
+        request, sent, response = info["request"], info["sent"], info["response"]
+        body = request.get("postData")
+        if body is None and request.get("hasPostData"):
+            body = self._cdp_text(driver, "Network.getRequestPostData", request_id, "postData")
+        text = self._cdp_text(driver, "Network.getResponseBody", request_id, "body")
+        return {
+            "method": request["method"].upper(),
+            "url": request["url"],
+            "body": body,
+            "bodyHash": body_hash(body),
+            "status": response["status"],
+            "headers": {name.lower(): value for name, value in response.get("headers", {}).items()},
+            "text": text,
+            "time": round((finished - sent["timestamp"]) * 1000),
+            "started": datetime.fromtimestamp(sent["wallTime"], timezone.utc).isoformat(),
+        }
+        
+    def _cdp_text(self, driver, command, request_id, field):
+        """Прочитать тело через CDP; недоступное тело записывается как None с предупреждением."""
+        try:
+            result = driver.execute_cdp_cmd(command, {"requestId": request_id})
+        except WebDriverException as e:
+            self.logger.warning("Тело запроса %s не получено (%s): %s", request_id, command, e)
+            return None
+        if result.get("base64Encoded"):
+            return base64.b64decode(result[field]).decode("utf-8", errors="replace")
+        return result[field]
+        
+    def save(self, path, entries):
+        """Сохранить записанные запросы в формате HAR 1.2."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        har_entries = []
+        for entry in entries:
+            request = {"method": entry["method"], "url": entry["url"], "headers": [], "_bodyHash": entry["bodyHash"]}
+            if entry["body"]:
+                request["postData"] = {"mimeType": "", "text": entry["body"]}
+            headers = entry["headers"] or {}
+            har_entries.append({
+                "startedDateTime": entry["started"],
+                "time": entry["time"],
+                "request": request,
+                "response": {
+                    "status": entry["status"],
+                    "headers": [{"name": name, "value": value} for name, value in headers.items()],
+                    "content": {"mimeType": headers.get("content-type", ""), "text": entry["text"]},
+                },
+            })
+        har = {"log": {"version": "1.2", "creator": {"name": "test-automation-framework", "version": "1.0"},
+                       "entries": har_entries}}
+        with open(path, 'w', encoding="utf-8") as f:
+            json.dump(har, f, ensure_ascii=False, indent=1)
+        self._index_cache.pop(path, None)
+        self.logger.info("Записано запросов: %s в %s", len(har_entries), path)
+        
+    @classmethod
+    def load_index(cls, path):
+        """Построить индекс ответов: точный ключ и ключ без query и тела."""
+        if path in cls._index_cache:
+            cls._index_cache.move_to_end(path)
+            return cls._index_cache[path]
+        if not os.path.exists(path):
+            return {}
+            
+        with open(path, 'r', encoding="utf-8") as f:
+            har = json.load(f)
+        index = {}
+        for entry in har["log"]["entries"]:
+            request, response = entry["request"], entry["response"]
+            method = request["method"].upper()
+            digest = request.get("_bodyHash") or body_hash(request.get("postData", {}).get("text"))
+            parsed = urlsplit(request["url"])
+            served = {
+                "status": response["status"],
+                "headers": {h["name"]: h["value"] for h in response.get("headers", [])},
+                "text": response.get("content", {}).get("text"),
+                "time": entry.get("time", 0),
+            }
+            index.setdefault(f"{method} {request['url']} {digest}", []).append(served)
+            index.setdefault(f"{method} {parsed.scheme}://{parsed.netloc}{parsed.path}", []).append(served)
+            
+        cls._index_cache[path] = index
+        if len(cls._index_cache) > cls.INDEX_CACHE_SIZE:
+            cls._index_cache.popitem(last=False)
+        return index
+
+# utils/browser_contexts.py
+import logging
+import threading
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+# Переменная окружения с адресом общего браузера, который parallel_runner
+# запускает для нескольких воркеров (host:port отладочного порта Chromium)
+SHARED_BROWSER_ENV = "TEST_SHARED_BROWSER"
+
+class BrowserContext:
+    """Изолированный контекст браузера со своими cookies и хранилищем."""
+    
+    def __init__(self, context_id, driver, home_handle):
+        self.context_id = context_id
+        self.driver = driver
+        # Служебная вкладка сессии в основном контексте браузера:
+        # из неё контекст закрывается, вкладки контекста при этом исчезают
+        self.home_handle = home_handle
+
+class BrowserContextManager:
+    """Несколько изолированных контекстов внутри одного процесса Chromium.
+    
+    Каждый контекст обслуживает собственная сессия WebDriver, подключённая
+    к уже запущенному браузеру по отладочному адресу (debuggerAddress) и
+    переключённая на вкладку контекста. Сессии ничего не делят, поэтому
+    команды разных контекстов выполняются одновременно: тесты из нескольких
+    потоков или воркеров parallel_runner работают в одном браузере.
+    """
+    
+    def __init__(self, address, attach, host=None, prepare_context=None):
+        self.address = address
+        # attach(address) -> новая сессия WebDriver, подключённая к браузеру
+        self.attach = attach
+        # Драйвер, запустивший браузер; None, если браузер запущен другим процессом
+        self.host = host
+        self.prepare_context = prepare_context
+        self.logger = logging.getLogger(__name__)
+        # Защищает только учёт контекстов, команды браузеру идут без блокировки
+        self._lock = threading.Lock()
+        self._contexts = {}
+        
+    @staticmethod
+    def debugger_address(driver):
+        """Отладочный адрес браузера, запущенного локальным chromedriver/msedgedriver."""
+        capabilities = driver.capabilities
+        for key in ("goog:chromeOptions", "ms:edgeOptions"):
+            address = capabilities.get(key, {}).get("debuggerAddress")
+            if address:
+                return address
+        raise ValueError("Изолированные контексты поддерживаются только в локальных Chromium-браузерах")
+        
+    def new_context(self):
+        """Создать изолированный контекст и вернуть драйвер для работы с ним."""
+        driver = self.attach(self.address)
+        try:
+            context = self._open(driver, self._home_window(driver))
+        except WebDriverException:
+            driver.quit()
+            raise
+        self._bind(context)
+        with self._lock:
+            self._contexts[id(driver)] = context
+        if self.prepare_context:
+            self.prepare_context(driver)
+        self.logger.info("Создан изолированный контекст браузера: %s", context.context_id)
+        return driver
+        
+    def renew(self, driver):
+        """Заменить контекст сессии новым, не подключаясь к браузеру заново.
+        
+        Используется пулом вместо очистки: новый контекст пуст, а его
+        создание дешевле новой сессии. Вернуть False, если сессия неисправна.
+        """
+        with self._lock:
+            context = self._contexts.get(id(driver))
+        if context is None:
+            return False
+        try:
+            self._dispose(context)
+            fresh = self._open(driver, context.home_handle)
+        except WebDriverException as e:
+            self.logger.warning("Не удалось пересоздать контекст браузера: %s", e)
+            return False
+        context.context_id = fresh.context_id
+        if self.prepare_context:
+            self.prepare_context(driver)
+        return True
+        
+    def close_context(self, driver):
+        """Закрыть контекст вместе со всеми его окнами и отключить его сессию."""
+        with self._lock:
+            context = self._contexts.pop(id(driver), None)
+        if context is None:
+            return
+        try:
+            self._dispose(context)
+            driver.close()
+        finally:
+            # Сессия, подключённая по debuggerAddress, закрывается без браузера
+            type(driver).quit(driver)
+        self.logger.info("Закрыт контекст браузера: %s", context.context_id)
+        
+    def shutdown(self):
+        """Закрыть все контексты и браузер, если он запущен этим менеджером."""
+        with self._lock:
+            drivers = [context.driver for context in self._contexts.values()]
+        for driver in drivers:
+            try:
+                self.close_context(driver)
+            except WebDriverException as e:
+                self.logger.warning("Не удалось закрыть контекст браузера: %s", e)
+        if self.host is not None:
+            self.host.quit()
+            
+    def _home_window(self, driver):
+        """Открыть служебную вкладку сессии в основном контексте браузера.
+        
+        Текущим окном новой сессии может оказаться вкладка чужого контекста,
+        которая закроется вместе с ним.
+        """
+        target_id = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"]
+        handle = self._handle_for_target(driver, target_id)
+        driver.switch_to.window(handle)
+        return handle
+        
+    def _open(self, driver, home_handle):
+        """Создать контекст с вкладкой и переключить на неё сессию."""
+        size = driver.get_window_size()
+        context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        target_id = driver.execute_cdp_cmd("Target.createTarget", {
+            "url": "about:blank",
+            "browserContextId": context_id,
+            "width": size["width"],
+            "height": size["height"],
+        })["targetId"]
+        driver.switch_to.window(self._handle_for_target(driver, target_id))
+        return BrowserContext(context_id, driver, home_handle)
+        
+    def _dispose(self, context):
+        """Закрыть контекст; команда CDP выполняется во вкладке текущего окна сессии."""
+        driver = context.driver
+        driver.switch_to.window(context.home_handle)
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context.context_id})
+        
+    def _bind(self, context):
+        """Ограничить список окон сессии окнами контекста, quit - закрытием контекста."""
+        driver = context.driver
+        execute = driver.execute
+        
+        def context_execute(command, params=None):
+            response = execute(command, params)
+            if command == Command.W3C_GET_WINDOW_HANDLES:
+                response["value"] = self._context_handles(context, response["value"])
+            return response
+            
+        # Атрибуты экземпляра перекрывают методы класса, в том числе
+        # для WebElement, которые вызывают execute своего драйвера
+        driver.execute = context_execute
+        driver.quit = lambda: self.close_context(driver)
+        
+    def _context_handles(self, context, handles):
+        """Оставить только окна, принадлежащие контексту."""
+        targets = context.driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        target_ids = [
+            target["targetId"] for target in targets
+            if target.get("browserContextId") == context.context_id
+        ]
+        return [h for h in handles if any(self._matches(h, t) for t in target_ids)]
+        
+    def _handle_for_target(self, driver, target_id):
+        """Найти дескриптор окна WebDriver, соответствующий вкладке CDP."""
+        for handle in type(driver).execute(driver, Command.W3C_GET_WINDOW_HANDLES)["value"]:
+            if self._matches(handle, target_id):
+                return handle
+        raise WebDriverException(f"Не найдено окно для вкладки {target_id}")
+        
+    @staticmethod
+    def _matches(handle, target_id):
+        """Старые версии chromedriver добавляют к идентификатору префикс CDwindow-."""
+        return handle == target_id or handle.endswith(target_id)
+
+# utils/driver_pool.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException, NoAlertPresentException
+
+class DriverPool:
+    """Пул прогретых драйверов, переиспользуемых между тестами.
+    
+    С prespawn=True замена драйвера, который будет закрыт после теста
+    (исчерпан max_uses или сессия неисправна), запускается в фоне, пока
+    тест ещё выполняется.
+    """
+    
+    # Всё, что браузер хранит для origin: cookies, localStorage, IndexedDB,
+    # service workers, Cache Storage и т. д. (Storage.clearDataForOrigin).
+    # sessionStorage сюда не входит: он живёт во вкладке и исчезает вместе с ней
+    CLEAR_STORAGE_TYPES = "all"
+    
+    # Без CDP хранилища origin очищаются со страницы этого origin; берётся лёгкий ресурс
+    RESET_PATH = "/robots.txt"
+    CLEAR_STORAGE_SCRIPT = "window.localStorage.clear(); window.sessionStorage.clear();"
+    
+    def __init__(self, create_driver, max_uses=50, max_idle=1, on_shutdown=None, prespawn=False,
+                 origins=(), prepare_window=None, renew=None):
+        self.create_driver = create_driver
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.on_shutdown = on_shutdown
+        # Origin приложения очищаются всегда: без CDP историю посещений не узнать
+        self.origins = {origin for origin in map(self._origin, origins) if origin}
+        # Настройка новой вкладки после сброса (например, блокировка URL быстрого профиля)
+        self.prepare_window = prepare_window
+        # Замена сброса: renew(driver) -> False, если сессия неисправна
+        self.renew = renew
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._uses = {}
+        self._drivers = []
+        self._spare = None
+        self._spawner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-prespawn") if prespawn else None
+        
+    def _create(self):
+        driver = self.create_driver()
+        with self._lock:
+            self._drivers.append(driver)
+            self._uses[id(driver)] = 0
+        self.logger.info("В пул добавлен новый драйвер")
+        return driver
+        
+    def acquire(self):
+        """Выдать драйвер из пула, запущенный в фоне или новый."""
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+            spare = None
+            if driver is None:
+                spare, self._spare = self._spare, None
+                
+        if spare is not None:
+            try:
+                driver = spare.result()
+            except Exception as e:
+                self.logger.warning("Не удалось заранее запустить драйвер: %s", e)
+        if driver is None:
+            driver = self._create()
+            
+        with self._lock:
+            self._uses[id(driver)] += 1
+            last_use = self._uses[id(driver)] >= self.max_uses
+        if last_use:
+            self._prespawn()
+        return driver
+        
+    def _prespawn(self):
+        """Запустить следующий драйвер в фоне, если свободных в пуле нет."""
+        if self._spawner is None:
+            return
+        with self._lock:
+            if self._spare is not None or self._idle:
+                return
+            self._spare = self._spawner.submit(self._create)
+        
+    def release(self, driver):
+        """Вернуть драйвер в пул, сбросив состояние браузера."""
+        with self._lock:
+            uses = self._uses.get(id(driver), 0)
+        if uses >= self.max_uses:
+            self.logger.info("Драйвер использован %s раз, пересоздаём", uses)
+            self.discard(driver)
+            return
+            
+        reset = self.renew or self.reset
+        if not reset(driver):
+            self.discard(driver)
+            self._prespawn()
+            return
+            
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self.discard(driver)
+        
+    def reset(self, driver):
+        """Сбросить cookies, хранилища всех посещённых origin и окна.
+        
+        Тест продолжается в новой вкладке, старые закрываются - вместе с ними
+        исчезает sessionStorage. В Chromium данные origin из истории всех окон
+        очищаются через CDP; в остальных браузерах cookies, localStorage и
+        sessionStorage очищаются на странице каждого известного origin.
+        Вернуть False, если сессия неисправна - тогда нужна новая сессия.
+        """
+        cdp = hasattr(driver, "execute_cdp_cmd")
+        try:
+            try:
+                driver.switch_to.alert.dismiss()
+            except NoAlertPresentException:
+                pass
+                
+            # Посещённые origin собираются из истории и фреймов каждого окна до его закрытия
+            handles = driver.window_handles
+            origins = set(self.origins)
+            for handle in handles:
+                driver.switch_to.window(handle)
+                if cdp:
+                    origins |= self._visited_origins(driver)
+                else:
+                    origins.add(self._origin(driver.current_url))
+            origins.discard(None)
+            if cdp:
+                origins |= self._cookie_origins(driver)
+                
+            driver.switch_to.new_window("tab")
+            fresh = driver.current_window_handle
+            for handle in handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            
+            if cdp:
+                self._clear_with_cdp(driver, origins)
+            else:
+                self._clear_with_webdriver(driver, origins)
+            if self.prepare_window:
+                self.prepare_window(driver)
+            return True
+        except (WebDriverException, IndexError) as e:
+            self.logger.warning("Драйвер неисправен и будет пересоздан: %s", e)
+            return False
+            
+    def _clear_with_cdp(self, driver, origins):
+        """Очистить данные origin и cookies всех доменов через CDP."""
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": origin, "storageTypes": self.CLEAR_STORAGE_TYPES,
+            })
+        # Удаляет cookies всех доменов, в том числе не попавших в историю
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        
+    def _clear_with_webdriver(self, driver, origins):
+        """Очистить cookies и хранилища средствами WebDriver: они доступны только со страницы origin."""
+        for origin in sorted(origins):
+            driver.get(origin + self.RESET_PATH)
+            driver.delete_all_cookies()
+            driver.execute_script(self.CLEAR_STORAGE_SCRIPT)
+        driver.get("about:blank")
+        
+    @staticmethod
+    def _origin(url):
+        """Origin страницы или None для about:blank, data: и т. п."""
+        parts = urlsplit(url or "")
+        if parts.scheme in ("http", "https") and parts.netloc:
+            return f"{parts.scheme}://{parts.netloc}"
+        return None
+        
+    def _visited_origins(self, driver):
+        """Origin из истории навигации окна и его текущих фреймов."""
+        urls = [entry["url"] for entry in driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]]
+        frames = [driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]]
+        while frames:
+            node = frames.pop()
+            urls.append(node["frame"].get("url"))
+            frames.extend(node.get("childFrames", []))
+        return {origin for origin in map(self._origin, urls) if origin}
+        
+    def _cookie_origins(self, driver):
+        """Origin доменов cookies: сайт мог ставить их из запросов без навигации."""
+        origins = set()
+        for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]:
+            domain = cookie["domain"].lstrip(".")
+            origins.update({f"https://{domain}", f"http://{domain}"})
+        return origins
+            
+    def discard(self, driver):
+        """Закрыть драйвер и убрать его из пула."""
+        with self._lock:
+            if driver in self._idle:
+                self._idle.remove(driver)
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            self.logger.warning("Не удалось корректно закрыть драйвер: %s", e)
+            
+    def shutdown(self):
+        """Закрыть все драйверы пула."""
+        if self._spawner is not None:
+            # Дождаться запускаемого в фоне драйвера, чтобы закрыть и его
+            self._spawner.shutdown(wait=True)
+        with self._lock:
+            self._spare = None
+            drivers = list(self._drivers)
+        for driver in drivers:
+            self.discard(driver)
+        if self.on_shutdown:
+            self.on_shutdown()
+        self.logger.info("Пул драйверов закрыт")
+        
+    @classmethod
+    def from_config(cls, config, driver_factory):
+        """Создать пул согласно конфигурации.
+        
+        При browser_contexts > 1 драйверы пула - сессии в изолированных
+        контекстах общего процесса браузера. После теста контекст сессии
+        заменяется новым: это быстрее очистки и не оставляет состояния.
+        """
+        prepare_window = None
+        if driver_factory.is_fast_profile(config):
+            prepare_window = lambda driver: driver_factory.block_urls(driver, config)
+        if config.browser_contexts > 1:
+            contexts = driver_factory.get_context_manager(config)
+            return cls(
+                contexts.new_context,
+                max_uses=config.driver_pool_max_uses,
+                prespawn=config.driver_prespawn,
+                on_shutdown=contexts.shutdown,
+                renew=contexts.renew
+            )
+        return cls(
+            lambda: driver_factory.get_configured_driver(config),
+            max_uses=config.driver_pool_max_uses,
+            prespawn=config.driver_prespawn,
+            origins=[config.base_url],
+            prepare_window=prepare_window
+        )
+
+# utils/parallel_runner.py
+import argparse
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from config.config import Config
+from utils.browser_contexts import SHARED_BROWSER_ENV, BrowserContextManager
+from utils.driver_factory import DriverFactory
+from utils.logger import Logger
+from utils.result_cache import ResultCache
+from utils.scheduler import DurationHistory, durations_path, split_longest_first
+from utils.stream_reporter import RUN_ID_ENV
+
+# Pytest возвращает 5, если воркеру не досталось тестов
+NO_TESTS_COLLECTED = 5
+# Код pytest при прерванном сборе (ошибки импорта тестов и т. п.)
+INTERRUPTED = 2
+# Переменная окружения с путём, куда плагин сбора пишет идентификаторы тестов
+COLLECT_OUTPUT_ENV = "PARALLEL_RUNNER_COLLECT_OUTPUT"
+
+class CollectionError(Exception):
+    """Сбор тестов завершился ошибкой."""
+
+def pytest_collection_finish(session):
+    """Плагин сбора (-p utils.parallel_runner): записать идентификаторы тестов в файл.
+    
+    Вывод --collect-only зависит от -q/-v пользователя, поэтому не разбирается.
+    """
+    output = os.environ.get(COLLECT_OUTPUT_ENV)
+    if output:
+        with open(output, 'w', encoding="utf-8") as f:
+            f.write("\n".join(item.nodeid for item in session.items))
+
+def collect_node_ids(pytest_args):
+    """Собрать идентификаторы тестов без их запуска."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "node_ids.txt")
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-p", "utils.parallel_runner", *pytest_args],
+            capture_output=True, text=True, env=dict(os.environ, **{COLLECT_OUTPUT_ENV: output})
+        )
+        if result.returncode not in (0, NO_TESTS_COLLECTED) or not os.path.exists(output):
+            raise CollectionError(
+                f"Сбор тестов завершился с кодом {result.returncode}:\n{result.stdout[-4000:]}{result.stderr[-4000:]}"
+            )
+        with open(output, 'r', encoding="utf-8") as f:
+            return f.read().splitlines()
+
+def start_shared_browsers(config, workers, driver_factory=None):
+    """Запустить по браузеру на каждые browser_contexts воркеров.
+    
+    Вернуть запущенные драйверы и отладочный адрес браузера для каждого
+    воркера; при browser_contexts <= 1 воркеры запускают браузеры сами.
+    """
+    if config.browser_contexts <= 1:
+        return [], []
+    driver_factory = driver_factory or DriverFactory()
+    hosts = []
+    try:
+        for _ in range(math.ceil(workers / config.browser_contexts)):
+            hosts.append(driver_factory.get_configured_driver(config))
+        addresses = [
+            BrowserContextManager.debugger_address(hosts[index // config.browser_contexts])
+            for index in range(workers)
+        ]
+    except Exception:
+        for host in hosts:
+            host.quit()
+        raise
+    return hosts, addresses
+
+def shard_option(pytest_args):
+    """Значение --shard из опций pytest, переданных воркерам."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--shard")
+    known, _ = parser.parse_known_args(pytest_args)
+    return known.shard
+
+def run_parallel(workers, pytest_args, evict_results=None):
+    """Запустить тесты в нескольких процессах pytest и вернуть код выхода."""
+    logger = logging.getLogger(__name__)
+    config = Config()
+    history = DurationHistory(config.durations_file)
+    
+    try:
+        node_ids = collect_node_ids(pytest_args)
+    except CollectionError as e:
+        logger.error("%s", e)
+        return INTERRUPTED
+    if not node_ids:
+        logger.error("Не найдено ни одного теста")
+        return NO_TESTS_COLLECTED
+        
+    groups, loads = split_longest_first(node_ids, history, workers)
+    run_dir = os.path.join(config.reports_dir, "parallel")
+    if not os.path.exists(run_dir):
+        os.makedirs(run_dir)
+        
+    active = [index for index, group in enumerate(groups) if group]
+    hosts, addresses = start_shared_browsers(config, len(active))
+    # Потоковые отчёты воркеров помечаются одним прогоном
+    run_id = uuid.uuid4().hex
+    processes = []
+    exit_code = 0
+    try:
+        for position, index in enumerate(active):
+            worker_id = f"gw{index}"
+            tests_file = os.path.join(run_dir, f"{worker_id}.txt")
+            with open(tests_file, 'w', encoding="utf-8") as f:
+                f.write("\n".join(groups[index]))
+            logger.info("Воркер %s: %s тестов, ~%.1f с", worker_id, len(groups[index]), loads[index])
+            
+            env = dict(os.environ, TEST_WORKER_ID=worker_id, **{RUN_ID_ENV: run_id})
+            if addresses:
+                # Воркер работает в своих контекстах общего браузера
+                env[SHARED_BROWSER_ENV] = addresses[position]
+            command = [sys.executable, "-m", "pytest", *pytest_args, "--worker-tests", tests_file]
+            processes.append((worker_id, subprocess.Popen(command, env=env)))
+            
+        for worker_id, process in processes:
+            code = process.wait()
+            if code not in (0, NO_TESTS_COLLECTED):
+                exit_code = exit_code or code
+    finally:
+        for host in hosts:
+            host.quit()
+            
+
+    # Воркеры пишут замеры в отдельные файлы, чтобы не конфликтовать; замеры
+    # шарда собираются в его файл, общая история остаётся как есть
+    shard = shard_option(pytest_args)
+    output = durations_path(config.durations_file, shard)
+    durations = history if output == history.path else DurationHistory(output)
+    for worker_id, _ in processes:
+        worker_file = durations_path(config.durations_file, shard, worker_id)
+        if os.path.exists(worker_file):
+            durations.merge(DurationHistory.read(worker_file))
+            os.remove(worker_file)
+    durations.save()
+    
+    # Кэш результатов тоже собирается из изменений воркеров (если он включён)
+    results = ResultCache(config.result_cache_file)
+    merged = False
+    for worker_id, _ in processes:
+        worker_file = f"{config.result_cache_file}.{worker_id}"
+        if os.path.exists(worker_file):
+            results.merge(ResultCache.read(worker_file))
+            os.remove(worker_file)
+            merged = True
+    if evict_results is not None:
+        results.evict(evict_results)
+    if merged or evict_results is not None:
+        results.save()
+    return exit_code
+
+def main(argv=None):
+    """Точка входа: python -m utils.parallel_runner -n 4 [--shard i/n] [опции pytest]."""
+    parser = argparse.ArgumentParser(description="Параллельный запуск тестов с балансировкой по длительности")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1, help="Число процессов")
+    parser.add_argument("--evict-results", type=float, default=None, metavar="DAYS",
+                        help="Удалить из кэша результатов записи старше DAYS дней")
+    args, pytest_args = parser.parse_known_args(argv)
+    Logger.setup_logger()
+    return run_parallel(max(args.workers, 1), pytest_args, args.evict_results)
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# utils/result_cache.py
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+import requests
+
+class ResultCache:
+    """Кэш результатов тестов, чтобы не перезапускать то, что не менялось.
+    
+    Ключ теста - хэш исходного кода теста, модулей проекта, которые он
+    импортирует (страницы, base, utils - транзитивно), conftest.py, среды
+    Config и идентификатора сборки приложения. Тест, прошедший с тем же
+    ключом, при следующем запуске пропускается.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.entries = self.read(path)
+        self.changes = {}
+        self.logger = logging.getLogger(__name__)
+        self._module_hashes = {}
+        
+    @staticmethod
+    def read(path):
+        """Прочитать записи кэша из файла."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+    @staticmethod
+    def detect_build(config):
+        """Идентификатор сборки приложения или None, если его не удалось получить.
+        
+        Берётся заголовок app_build_header ответа version-эндпоинта (или
+        главной страницы), иначе хэш ответа эндпоинта app_version_path.
+        """
+        try:
+            response = requests.get(config.base_url.rstrip("/") + config.app_version_path, timeout=3)
+            if config.app_build_header in response.headers:
+                return response.headers[config.app_build_header]
+            if response.ok:
+                return hashlib.sha1(response.content).hexdigest()[:16]
+            response = requests.head(config.base_url, timeout=3)
+            return response.headers.get(config.app_build_header)
+        except requests.RequestException:
+            return None
+            
+    def _module_hash(self, module, root):
+        """Хэш файла модуля и модулей проекта, которые он использует."""
+        name = module.__name__
+        if name in self._module_hashes:
+            return self._module_hashes[name]
+        self._module_hashes[name] = ""
+        digest = hashlib.sha1()
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+        dependencies = set()
+        for value in vars(module).values():
+            target = value if inspect.ismodule(value) else sys.modules.get(getattr(value, "__module__", None) or "")
+            file = getattr(target, "__file__", None)
+            if target is None or target is module or not file:
+                continue
+            file = os.path.abspath(file)
+            if file.startswith(root) and "site-packages" not in file:
+                dependencies.add(target)
+        for dependency in sorted(dependencies, key=lambda m: m.__name__):
+            digest.update(self._module_hash(dependency, root).encode())
+        self._module_hashes[name] = digest.hexdigest()
+        return self._module_hashes[name]
+        
+    def key(self, item, context):
+        """Ключ результата теста pytest для среды и сборки из context."""
+        root = os.path.abspath(str(item.config.rootpath))
+        digest = hashlib.sha1(json.dumps(context, sort_keys=True).encode())
+        # Для тестов unittest важны и setUp/tearDown, поэтому берётся весь класс
+        digest.update(inspect.getsource(item.cls or item.function).encode())
+        digest.update(self._module_hash(item.module, root).encode())
+        for plugin in item.config.pluginmanager.get_plugins():
+            if getattr(plugin, "__file__", "").endswith("conftest.py"):
+                digest.update(self._module_hash(plugin, root).encode())
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None:
+            # Параметры таблиц данных: их изменение тоже меняет ключ
+            digest.update(json.dumps(
+                callspec.params, sort_keys=True, default=lambda value: getattr(value, "__dict__", repr(value))
+            ).encode())
+        return digest.hexdigest()
+        
+    def is_passed(self, node_id, key):
+        """Тест уже прошёл с тем же ключом."""
+        entry = self.entries.get(node_id)
+        return entry is not None and entry["key"] == key and entry["outcome"] == "passed"
+        
+    def record(self, node_id, key, outcome):
+        """Запомнить результат; непрошедшие тесты удаляются из кэша."""
+        self.changes[node_id] = {"key": key, "outcome": outcome, "time": time.time()} if outcome == "passed" else None
+        
+    def merge(self, changes):
+        """Применить изменения (в том числе из файлов воркеров)."""
+        for node_id, entry in changes.items():
+            if entry is None:
+                self.entries.pop(node_id, None)
+            else:
+                self.entries[node_id] = entry
+                
+    def evict(self, max_age_days):
+        """Удалить записи старше max_age_days дней; вернуть их число."""
+        threshold = time.time() - max_age_days * 86400
+        old = [node_id for node_id, entry in self.entries.items() if entry["time"] < threshold]
+        for node_id in old:
+            del self.entries[node_id]
+        return len(old)
+        
+    def save(self, path=None):
+        """Сохранить кэш с изменениями текущего прогона."""
+        self.merge(self.changes)
+        self.changes = {}
+        self._write(path or self.path, self.entries)
+        
+    def save_changes(self, path):
+        """Сохранить только изменения прогона (для воркеров parallel_runner)."""
+        self._write(path, self.changes)
+        
+    @staticmethod
+    def _write(path, data):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, path)
+
+# utils/scheduler.py
+import hashlib
+import json
+import logging
+import os
+
+class DurationHistory:
+    """История длительности тестов в локальном JSON-файле."""
+    
+    # Вес нового замера при сглаживании, чтобы единичный выброс не ломал план
+    SMOOTHING = 0.5
+    DEFAULT_DURATION = 1.0
+    
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.durations = self.read(path)
+        
+    @staticmethod
+    def read(path):
+        """Прочитать длительности из файла истории."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                return json.load(f).get("durations", {})
+        except (ValueError, OSError):
+            logging.getLogger(__name__).warning("Файл истории %s повреждён и будет перезаписан", path)
+            return {}
+            
+    def record(self, node_id, duration):
+        """Учесть новый замер длительности теста."""
+        previous = self.durations.get(node_id)
+        if previous is None:
+            self.durations[node_id] = duration
+        else:
+            self.durations[node_id] = self.SMOOTHING * duration + (1 - self.SMOOTHING) * previous
+            
+    def merge(self, durations):
+        """Учесть замеры, собранные другим процессом."""
+        for node_id, duration in durations.items():
+            self.record(node_id, duration)
+            
+    def save(self, path=None):
+        """Атомарно сохранить историю."""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump({"durations": self.durations}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        
+    def estimate(self, node_id):
+        """Оценить длительность теста; для новых тестов берётся медиана."""
+        if node_id in self.durations:
+            return self.durations[node_id]
+        return self._median()
+        
+    def _median(self):
+        if not self.durations:
+            return self.DEFAULT_DURATION
+        values = sorted(self.durations.values())
+        return values[len(values) // 2]
+
+def parse_shard(value):
+    """Разобрать строку вида i/n в пару (i, n), где 1 <= i <= n."""
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Неверный формат шарда '{value}', ожидается i/n")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Неверный номер шарда '{value}'")
+    return index, total
+
+def durations_path(durations_file, shard=None, worker_id=None):
+    """Файл замеров процесса pytest.
+    
+    Шард пишет в .shardIofN, чтобы не менять историю, по которой разложены
+    остальные шарды; воркер parallel_runner - в свой файл с суффиксом .gwK,
+    такие файлы объединяет parallel_runner.
+    """
+    path = durations_file
+    if shard:
+        index, total = parse_shard(shard)
+        path = f"{path}.shard{index}of{total}"
+    if worker_id:
+        path = f"{path}.{worker_id}"
+    return path
+
+def split_longest_first(node_ids, history, buckets):
+    """Разложить тесты по корзинам: самые долгие первыми в наименее загруженную.
+    
+    Результат детерминирован для одного и того же списка тестов и истории,
+    поэтому для шардов история должна быть общей для всех машин CI и не
+    меняться между запусками шардов (shard_durations_file).
+    """
+    ordered = sorted(set(node_ids), key=lambda node_id: (-history.estimate(node_id), node_id))
+    groups = [[] for _ in range(buckets)]
+    loads = [0.0] * buckets
+    for node_id in ordered:
+        target = min(range(buckets), key=lambda i: (loads[i], i))
+        groups[target].append(node_id)
+        loads[target] += history.estimate(node_id)
+    return groups, loads
+
+def split_by_hash(node_ids, buckets):
+    """Разложить тесты по корзинам поровну в порядке хэша идентификатора.
+    
+    Раскладка зависит только от набора тестов, а не от локальной истории,
+    поэтому шарды не пересекаются при любом порядке запусков и на любых
+    машинах. Порядок хэша разносит тесты одного модуля по разным корзинам.
+    """
+    ordered = sorted(set(node_ids), key=lambda node_id: hashlib.sha1(node_id.encode("utf-8")).hexdigest())
+    return [ordered[index::buckets] for index in range(buckets)]
+
+# utils/profiler.py
+import functools
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from utils.tracer import Tracer
+
+class Profiler:
+    """Замеры времени действий BasePage и команд WebDriver по тестам.
+    
+    Пока профилировщик не активирован, обёртки сразу вызывают исходный
+    метод, поэтому в обычных прогонах накладных расходов почти нет.
+    """
+    
+    _active = None
+    
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.logger = logging.getLogger(__name__)
+        self.tests = []
+        self.commands = defaultdict(lambda: {"count": 0, "time": 0.0})
+        self.round_trips = 0
+        self.wait_time = 0.0
+        self._test = None
+        self._depth = 0
+        
+    @classmethod
+    def current(cls):
+        """Активный профилировщик или None."""
+        return cls._active
+        
+    def activate(self):
+        """Сделать профилировщик активным для процесса."""
+        Profiler._active = self
+        
+    def deactivate(self):
+        """Отключить профилировщик."""
+        if Profiler._active is self:
+            Profiler._active = None
+            
+    def start_test(self, test_id):
+        """Начать замеры нового теста."""
+        self._test = {
+            "test": test_id, "duration": 0.0, "outcome": None, "startup": 0.0,
+            "round_trips": self.round_trips, "wait": self.wait_time, "steps": [],
+        }
+        
+    def finish_test(self, duration, outcome):
+        """Завершить замеры текущего теста."""
+        test = self._test
+        if test is None:
+            return
+        test["duration"] = duration
+        test["outcome"] = outcome
+        # До этого момента здесь хранились значения счётчиков на начало теста
+        test["round_trips"] = self.round_trips - test["round_trips"]
+        test["wait"] = self.wait_time - test["wait"]
+        self.tests.append(test)
+        self._test = None
+        
+    def record_command(self, command, duration):
+        """Учесть одно обращение к драйверу."""
+        self.round_trips += 1
+        stats = self.commands[command]
+        stats["count"] += 1
+        stats["time"] += duration
+        
+    def record_wait(self, duration):
+        """Учесть время ожидания условия на странице."""
+        self.wait_time += duration
+        
+    def record_startup(self, duration):
+        """Учесть время запуска драйвера."""
+        if self._test is not None:
+            self._test["startup"] += duration
+            
+    @contextmanager
+    def action(self, name, page, locator):
+        """Замерить действие страницы. Вложенные действия входят во внешнее."""
+        self._depth += 1
+        start = time.perf_counter()
+        round_trips, wait_time = self.round_trips, self.wait_time
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._test is not None:
+                wall = time.perf_counter() - start
+                wait = self.wait_time - wait_time
+                self._test["steps"].append({
+                    "action": name,
+                    "page": page,
+                    "locator": list(locator) if locator else None,
+                    "wall": wall,
+                    "wait": wait,
+                    "act": wall - wait,
+                    "round_trips": self.round_trips - round_trips,
+                })
+                
+    @staticmethod
+    def instrument_driver(driver):
+        """Обернуть исполнитель команд драйвера для подсчёта обращений.
+        
+        Обёртка ставится один раз и обращается к активному профилировщику
+        при каждом вызове.
+        """
+        executor = driver.command_executor
+        if getattr(executor, "profiled", False):
+            return
+        original = executor.execute
+        
+        def execute(command, params):
+            start = time.perf_counter()
+            try:
+                return original(command, params)
+            finally:
+                profiler = Profiler.current()
+                if profiler is not None:
+                    profiler.record_command(command, time.perf_counter() - start)
+                    
+        executor.execute = execute
+        executor.profiled = True
+        
+    def summary(self):
+        """Самые медленные локаторы, страницы и тесты."""
+        locators = defaultdict(lambda: {"time": 0.0, "count": 0})
+        pages = defaultdict(lambda: {"time": 0.0, "count": 0})
+        for test in self.tests:
+            for step in test["steps"]:
+                if step["locator"]:
+                    key = f"{step['locator'][0]}={step['locator'][1]}"
+                    locators[key]["time"] += step["wall"]
+                    locators[key]["count"] += 1
+                pages[step["page"]]["time"] += step["wall"]
+                pages[step["page"]]["count"] += 1
+                
+        def top(stats):
+            rows = [dict(name=name, **values) for name, values in stats.items()]
+            return sorted(rows, key=lambda row: row["time"], reverse=True)[:self.top_n]
+            
+        tests = sorted(self.tests, key=lambda test: test["duration"], reverse=True)[:self.top_n]
+        return {
+            "slowest_locators": top(locators),
+            "slowest_pages": top(pages),
+            "slowest_tests": [
+                {"name": t["test"], "time": t["duration"], "startup": t["startup"],
+                 "wait": t["wait"], "round_trips": t["round_trips"]}
+                for t in tests
+            ],
+            "commands": top(self.commands),
+            "totals": {
+                "tests": len(self.tests),
+                "round_trips": self.round_trips,
+                "wait": self.wait_time,
+                "startup": sum(t["startup"] for t in self.tests),
+            },
+        }
+        
+    def save(self, path):
+        """Сохранить профиль прогона в JSON."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'w', encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "tests": self.tests}, f, ensure_ascii=False, indent=1)
+        self.logger.info("Профиль прогона сохранён: %s", path)
+
+def profiled(action):
+    """Декоратор метода страницы: замер активным профилировщиком и запись в трассу."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = Profiler.current()
+            tracer = Tracer.current()
+            if profiler is None and tracer is None:
+                return method(self, *args, **kwargs)
+            page = type(self).__name__
+            locator = args[0] if args and isinstance(args[0], tuple) else None
+            measure = profiler.action(action, page, locator) if profiler else nullcontext()
+            trace = tracer.step(action, page, locator, self.driver) if tracer else nullcontext()
+            with measure, trace:
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# utils/stream_reporter.py
+import argparse
+import glob
+import html
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from xml.sax.saxutils import escape, quoteattr
+
+# Переменная окружения с идентификатором прогона, общим для воркеров parallel_runner
+RUN_ID_ENV = "TEST_RUN_ID"
+
+class StreamReporter:
+    """Потоковый отчёт: каждый результат дописывается в JSONL и JUnit XML сразу.
+    
+    В памяти хранятся только счётчики и последние падения, поэтому объём
+    памяти не зависит от числа тестов. Краткая сводка summary.json
+    обновляется во время прогона; HTML строится из потока после него.
+    """
+    
+    RESULTS_FILE = "results.jsonl"
+    JUNIT_FILE = "junit.xml"
+    SUMMARY_FILE = "summary.json"
+    # Сколько последних падений показывать в сводке
+    RECENT_FAILURES = 50
+    MAX_MESSAGE = 4000
+    
+    def __init__(self, directory, summary_interval=5.0, run_id=None):
+        self.directory = directory
+        self.summary_interval = summary_interval
+        # По идентификатору прогона сводка отделяет его каталоги от оставшихся с прошлых
+        self.run_id = run_id or uuid.uuid4().hex
+        self.counts = {"passed": 0, "failed": 0, "skipped": 0}
+        self.duration = 0.0
+        self.recent_failures = deque(maxlen=self.RECENT_FAILURES)
+        self.started = time.time()
+        self._summary_time = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Построчная буферизация: каждая строка сразу видна читателям файла
+        self._results = open(os.path.join(directory, self.RESULTS_FILE), 'w', encoding="utf-8", buffering=1)
+        self._junit = open(os.path.join(directory, self.JUNIT_FILE), 'w', encoding="utf-8", buffering=1)
+        self._junit.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuite name="pytest">\n')
+        # Сводка прошлого прогона сразу заменяется пустой
+        self._write_summary(finished=False)
+        
+    def record(self, test, outcome, duration, message=None, log_path=None, artifacts=()):
+        """Дописать результат теста."""
+        message = message[-self.MAX_MESSAGE:] if message else None
+        entry = {
+            "event": "result", "test": test, "outcome": outcome, "duration": round(duration, 3),
+            "time": time.time(), "message": message, "log": log_path, "artifacts": list(artifacts),
+        }
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            self.duration += duration
+            if outcome == "failed":
+                self.recent_failures.append({"test": test, "log": log_path, "artifacts": list(artifacts)})
+            self._results.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._junit.write(self._junit_case(test, outcome, duration, message))
+            if time.time() - self._summary_time >= self.summary_interval:
+                self._write_summary(finished=False)
+                
+    def record_artifact(self, test, path):
+        """Дописать артефакт, сохранённый уже после результата (например, в фоне)."""
+        if not path:
+            return
+        with self._lock:
+            self._results.write(json.dumps({"event": "artifact", "test": test, "path": path}, ensure_ascii=False) + "\n")
+            
+    @staticmethod
+    def _junit_case(test, outcome, duration, message):
+        path, _, name = test.rpartition("::")
+        classname = path.replace(".py", "").replace("/", ".").replace("::", ".")
+        case = f'  <testcase classname={quoteattr(classname)} name={quoteattr(name)} time="{duration:.3f}"'
+        if outcome == "passed":
+            return case + "/>\n"
+        tag = "failure" if outcome == "failed" else "skipped"
+        return f"{case}>\n    <{tag} message={quoteattr((message or '').splitlines()[-1] if message else '')}>{escape(message or '')}</{tag}>\n  </testcase>\n"
+        
+    def _write_summary(self, finished):
+        elapsed = time.time() - self.started
+        total = sum(self.counts.values())
+        summary = {
+            "run": self.run_id,
+            "finished": finished,
+            "started": self.started,
+            "updated": time.time(),
+            "elapsed": round(elapsed, 1),
+            "total": total,
+            "counts": dict(self.counts),
+            "tests_per_minute": round(total / elapsed * 60, 1) if elapsed else 0.0,
+            "test_time": round(self.duration, 1),
+            "recent_failures": list(self.recent_failures),
+        }
+        path = os.path.join(self.directory, self.SUMMARY_FILE)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, path)
+        self._summary_time = time.time()
+        
+    def close(self):
+        """Завершить JUnit XML и записать итоговую сводку."""
+        with self._lock:
+            if self._junit.closed:
+                return
+            self._junit.write("</testsuite>\n")
+            self._junit.close()
+            self._results.close()
+            self._write_summary(finished=True)
+
+def read_stream(paths):
+    """Построчно прочитать события из файлов results.jsonl."""
+    for path in paths:
+        with open(path, 'r', encoding="utf-8") as f:
+            for line in f:
+                # Последняя строка может быть недописана, если прогон ещё идёт
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+def build_html(paths, output):
+    """Построить HTML-отчёт из потоков результатов за два прохода, не загружая их в память целиком."""
+    counts, artifacts_count = {}, 0
+    for event in read_stream(paths):
+        if event["event"] == "result":
+            counts[event["outcome"]] = counts.get(event["outcome"], 0) + 1
+            
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding="utf-8") as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Отчёт о тестировании</title>\n"
+                "<style>body{font-family:sans-serif}td{padding:2px 8px;vertical-align:top}"
+                ".failed{background:#fdd}.skipped{background:#ffd}pre{white-space:pre-wrap;margin:0}</style>\n"
+                "</head><body>\n<h1>Отчёт о тестировании</h1>\n<p>")
+        f.write(", ".join(f"{html.escape(outcome)}: {count}" for outcome, count in sorted(counts.items())))
+        f.write("</p>\n<table>\n<tr><th>Тест</th><th>Результат</th><th>Время, с</th><th>Подробности</th></tr>\n")
+        for event in read_stream(paths):
+            if event["event"] == "artifact":
+                artifacts_count += 1
+                f.write(f'<tr><td colspan="3">{html.escape(event["test"])}</td>'
+                        f'<td>артефакт: {html.escape(event["path"])}</td></tr>\n')
+                continue
+            details = []
+            if event.get("message"):
+                details.append(f"<pre>{html.escape(event['message'])}</pre>")
+            if event.get("log"):
+                details.append(f"лог: {html.escape(event['log'])}")
+            details += [f"артефакт: {html.escape(path)}" for path in event.get("artifacts", [])]
+            f.write(f'<tr class="{html.escape(event["outcome"])}"><td>{html.escape(event["test"])}</td>'
+                    f'<td>{html.escape(event["outcome"])}</td><td>{event["duration"]}</td>'
+                    f'<td>{"<br>".join(details)}</td></tr>\n')
+        f.write("</table>\n</body></html>\n")
+    return counts
+
+def latest_run(paths):
+    """Оставить сводки последнего прогона.
+    
+    Каталоги прежних прогонов (например, reports/stream рядом с reports/gwN
+    после параллельного запуска) в сводку и отчёт не попадают.
+    """
+    summaries = {}
+    for path in paths:
+        with open(path, 'r', encoding="utf-8") as f:
+            summaries[path] = json.load(f)
+    if not summaries:
+        return []
+    latest = max(summaries.values(), key=lambda summary: summary.get("started", 0)).get("run")
+    return [path for path, summary in summaries.items() if summary.get("run") == latest]
+
+def merge_summaries(paths):
+    """Объединить сводки воркеров в одну."""
+    merged = {"finished": True, "total": 0, "counts": {}, "recent_failures": []}
+    for path in paths:
+        with open(path, 'r', encoding="utf-8") as f:
+            summary = json.load(f)
+        merged["finished"] = merged["finished"] and summary["finished"]
+        merged["total"] += summary["total"]
+        for outcome, count in summary["counts"].items():
+            merged["counts"][outcome] = merged["counts"].get(outcome, 0) + count
+        merged["recent_failures"] += summary["recent_failures"]
+    return merged
+
+def main(argv=None):
+    """Точка входа: python -m utils.stream_reporter summary|html <каталоги отчётов>."""
+    parser = argparse.ArgumentParser(description="Сводка и HTML-отчёт по потоковым результатам тестов")
+    parser.add_argument("command", choices=["summary", "html"])
+    parser.add_argument("directories", nargs="*", default=["reports"], help="Каталоги с потоковыми отчётами")
+    parser.add_argument("-o", "--output", default=os.path.join("reports", "report.html"), help="Файл HTML-отчёта")
+    args = parser.parse_args(argv)
+    
+    # Каталоги воркеров parallel_runner (reports/gwN/stream) находятся рекурсивно,
+    # из них берутся только каталоги последнего прогона
+    def find(name):
+        return sorted(
+            path for directory in args.directories
+            for path in glob.glob(os.path.join(directory, "**", name), recursive=True)
+        )
+        
+    summaries = latest_run(find(StreamReporter.SUMMARY_FILE))
+    if args.command == "summary":
+        paths = summaries
+        if not paths:
+            print("Сводки не найдены")
+            return 1
+        summary = merge_summaries(paths)
+        state = "завершён" if summary["finished"] else "идёт"
+        print(f"Прогон {state}, тестов: {summary['total']}; " +
+              ", ".join(f"{outcome}: {count}" for outcome, count in sorted(summary["counts"].items())))
+        for failure in summary["recent_failures"]:
+            print(f"  FAILED {failure['test']}")
+        return 0
+        
+    paths = [os.path.join(os.path.dirname(path), StreamReporter.RESULTS_FILE) for path in summaries]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        print("Потоки результатов не найдены")
+        return 1
+    counts = build_html(paths, args.output)
+    print(f"HTML-отчёт: {args.output}, тестов: {sum(counts.values())}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# utils/tracer.py
+import base64
+import json
+import logging
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from contextlib import contextmanager
+
+class Tracer:
+    """Кольцевой буфер последних шагов теста, сохраняемый на диск только при падении.
+    
+    Шаг записывается без обращений к браузеру: действие, страница, локатор,
+    время и ошибка; по желанию - сжатый скриншот. URL, заголовок и DOM
+    снимаются один раз при сохранении трассы упавшего теста. В успешных
+    тестах буфер просто перезаписывается и ничего не пишется на диск.
+    """
+    
+    _active = None
+    
+    # Состояние страницы на момент падения
+    STATE_SCRIPT = """
+        return {url: location.href, title: document.title,
+                html: document.documentElement ? document.documentElement.outerHTML : ''};
+    """
+    
+    def __init__(self, size=20, screenshots=False, screenshot_quality=50):
+        self.size = size
+        self.screenshots = screenshots
+        self.screenshot_quality = screenshot_quality
+        self.logger = logging.getLogger(__name__)
+        self.steps = deque(maxlen=size)
+        self._test = None
+        self._driver = None
+        self._depth = 0
+        
+    @classmethod
+    def current(cls):
+        """Активный трассировщик или None."""
+        return cls._active
+        
+    def activate(self):
+        """Сделать трассировщик активным для процесса."""
+        Tracer._active = self
+        
+    def deactivate(self):
+        """Отключить трассировщик."""
+        if Tracer._active is self:
+            Tracer._active = None
+            
+    def start_test(self, test_id):
+        """Очистить буфер перед новым тестом."""
+        self._test = test_id
+        self._driver = None
+        self.steps.clear()
+        
+    @contextmanager
+    def step(self, name, page, locator, driver):
+        """Записать действие страницы в буфер. Вложенные действия входят во внешнее."""
+        self._depth += 1
+        start = time.time()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._test is not None:
+                self._driver = driver
+                step = {
+                    "action": name,
+                    "page": page,
+                    "locator": list(locator) if locator else None,
+                    "time": start,
+                    "duration": time.time() - start,
+                    "error": error,
+                }
+                if self.screenshots:
+                    try:
+                        step["screenshot"] = self._screenshot(driver)
+                    except Exception as e:
+                        step["capture_error"] = str(e)
+                self.steps.append(step)
+                
+    def _page_state(self):
+        """Снять URL, заголовок и DOM страницы; ошибки драйвера не должны мешать сохранению трассы."""
+        try:
+            return self._driver.execute_script(self.STATE_SCRIPT)
+        except Exception as e:
+            return {"capture_error": str(e)}
+        
+    def _screenshot(self, driver):
+        """Скриншот шага: в Chromium - JPEG через CDP, иначе PNG."""
+        if hasattr(driver, "execute_cdp_cmd"):
+            data = driver.execute_cdp_cmd(
+                "Page.captureScreenshot", {"format": "jpeg", "quality": self.screenshot_quality}
+            )["data"]
+            return ("jpg", base64.b64decode(data))
+        return ("png", driver.get_screenshot_as_png())
+        
+    def _console_logs(self):
+        """Сообщения консоли браузера за время шагов в буфере."""
+        if self._driver is None or not self.steps:
+            return []
+        try:
+            entries = self._driver.get_log("browser")
+        except Exception:
+            return []
+        since = self.steps[0]["time"] * 1000
+        return [entry for entry in entries if entry.get("timestamp", 0) >= since]
+        
+    def flush(self, directory, phase):
+        """Сохранить буфер текущего теста одним zip-архивом и вернуть путь к нему."""
+        if self._test is None or not self.steps:
+            return None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        name = re.sub(r"[^\w.-]+", "_", self._test)
+        path = os.path.join(directory, f"{name}_{phase}_{int(time.time() * 1000)}.zip")
+        
+        steps = []
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for index, step in enumerate(self.steps):
+                step = dict(step)
+                screenshot = step.pop("screenshot", None)
+                if screenshot:
+                    extension, data = screenshot
+                    step["screenshot"] = f"screenshots/step_{index:03d}.{extension}"
+                    # Картинки уже сжаты, повторно их не сжимаем
+                    archive.writestr(step["screenshot"], data, compress_type=zipfile.ZIP_STORED)
+                steps.append(step)
+            state = self._page_state() if self._driver is not None else {}
+            html = state.pop("html", None)
+            if html is not None:
+                state["dom_size"] = len(html)
+                state["dom"] = "dom.html"
+                archive.writestr("dom.html", html)
+            trace = {"test": self._test, "phase": phase, "steps": steps, "state": state,
+                     "console": self._console_logs()}
+            archive.writestr("trace.json", json.dumps(trace, ensure_ascii=False, indent=1))
+            
+        self.steps.clear()
+        self.logger.info("Трасса теста сохранена: %s", path)
+        return path
+
+# utils/visual.py
+import io
+import logging
+import os
+import re
+from collections import OrderedDict
+
+class VisualResult:
+    """Результат визуальной проверки."""
+    
+    def __init__(self, name, mismatch, passed, diff_path=None, baseline_created=False):
+        self.name = name
+        self.mismatch = mismatch
+        self.passed = passed
+        self.diff_path = diff_path
+        self.baseline_created = baseline_created
+        
+    def __bool__(self):
+        return self.passed
+        
+    def __repr__(self):
+        return f"VisualResult({self.name!r}, mismatch={self.mismatch:.5f}, passed={self.passed})"
+
+class VisualComparator:
+    """Сравнение скриншотов с эталонами на NumPy без циклов по пикселям.
+    
+    Эталоны хранятся сжатыми массивами .npz и кэшируются в памяти. Пиксель
+    считается отличающимся, если взвешенная по яркости разница цвета больше
+    threshold (0..1); проверка проходит, если доля таких пикселей вне
+    игнорируемых областей не больше tolerance. Тепловая карта отличий
+    сохраняется только для не прошедших проверок.
+    
+    NumPy и Pillow импортируются при первом сравнении: без визуальных
+    проверок фреймворк работает и без них.
+    """
+    
+    # Вклад каналов RGB в воспринимаемую яркость
+    CHANNEL_WEIGHTS = (0.299, 0.587, 0.114)
+    CACHE_SIZE = 128
+    
+    _default = None
+    _cache = OrderedDict()
+    
+    def __init__(self, baselines_dir="visual/baselines", diffs_dir="visual/diffs",
+                 tolerance=0.001, threshold=0.1, update=False):
+        self.baselines_dir = baselines_dir
+        self.diffs_dir = diffs_dir
+        self.tolerance = tolerance
+        self.threshold = threshold
+        self.update = update
+        self.logger = logging.getLogger(__name__)
+        
+    @classmethod
+    def configure(cls, config):
+        """Создать сравниватель по умолчанию из настроек."""
+        cls._default = cls(
+            config.visual_baselines_dir, config.visual_diffs_dir,
+            config.visual_tolerance, config.visual_threshold, config.visual_update
+        )
+        return cls._default
+        
+    @classmethod
+    def default(cls):
+        """Сравниватель по умолчанию (с настройками по умолчанию, если не настроен)."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+        
+    @staticmethod
+    def decode(png):
+        """PNG в массив (высота, ширина, 3) uint8."""
+        import numpy as np
+        from PIL import Image
+        return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+        
+    def baseline_path(self, name):
+        return os.path.join(self.baselines_dir, re.sub(r"[^\w.-]+", "_", name) + ".npz")
+        
+    def load_baseline(self, name):
+        """Эталон из кэша или с диска; None, если его ещё нет."""
+        path = self.baseline_path(name)
+        if not os.path.exists(path):
+            return None
+        key = (path, os.path.getmtime(path))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        import numpy as np
+        with np.load(path) as data:
+            image = data["image"]
+        self._cache[key] = image
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return image
+        
+    def save_baseline(self, name, image):
+        """Сохранить эталон сжатым массивом."""
+        import numpy as np
+        path = self.baseline_path(name)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, image=image)
+        
+    @staticmethod
+    def mask(shape, ignore=()):
+        """Маска учитываемых пикселей; ignore - области (x, y, ширина, высота)."""
+        import numpy as np
+        mask = np.ones(shape[:2], dtype=bool)
+        for x, y, width, height in ignore:
+            mask[max(y, 0):max(y + height, 0), max(x, 0):max(x + width, 0)] = False
+        return mask
+        
+    def compare(self, name, image, ignore=(), tolerance=None):
+        """Сравнить одно изображение с эталоном."""
+        return self.compare_batch([(name, image, ignore)], tolerance)[0]
+        
+    def compare_batch(self, items, tolerance=None):
+        """Сравнить несколько изображений; items - кортежи (имя, массив, ignore).
+        
+        Изображения одного размера сравниваются одной операцией над
+        четырёхмерным массивом.
+        """
+        import numpy as np
+        weights = np.array(self.CHANNEL_WEIGHTS)
+        tolerance = self.tolerance if tolerance is None else tolerance
+        results = [None] * len(items)
+        groups = {}
+        for index, (name, image, ignore) in enumerate(items):
+            baseline = None if self.update else self.load_baseline(name)
+            if baseline is None:
+                self.save_baseline(name, image)
+                self.logger.warning("Сохранён эталон: %s", name)
+                results[index] = VisualResult(name, 0.0, True, baseline_created=True)
+            elif baseline.shape != image.shape:
+                self.logger.error("Размер %s отличается от эталона: %s != %s", name, image.shape, baseline.shape)
+                results[index] = VisualResult(name, 1.0, False)
+            else:
+                groups.setdefault(image.shape, []).append(index)
+                
+        for shape, indexes in groups.items():
+            actual = np.stack([items[i][1] for i in indexes]).astype(np.float32)
+            expected = np.stack([self.load_baseline(items[i][0]) for i in indexes]).astype(np.float32)
+            masks = np.stack([self.mask(shape, items[i][2]) for i in indexes])
+            # Разница цвета, взвешенная по яркости каналов, в долях от 255
+            delta = np.sqrt(((actual - expected) ** 2) @ weights) / 255
+            different = (delta > self.threshold) & masks
+            mismatch = different.sum(axis=(1, 2)) / np.maximum(masks.sum(axis=(1, 2)), 1)
+            for position, index in enumerate(indexes):
+                name = items[index][0]
+                passed = bool(mismatch[position] <= tolerance)
+                diff_path = None
+                if not passed:
+                    diff_path = self.save_heatmap(name, items[index][1], delta[position], masks[position])
+                    self.logger.error("Визуальное отличие %s: %.3f%%", name, mismatch[position] * 100)
+                results[index] = VisualResult(name, float(mismatch[position]), passed, diff_path)
+        return results
+        
+    def save_heatmap(self, name, image, delta, mask):
+        """Тепловая карта: отличия красным поверх серого снимка, игнорируемое затемнено."""
+        import numpy as np
+        from PIL import Image
+        gray = image @ np.array(self.CHANNEL_WEIGHTS)
+        heat = np.stack([gray, gray, gray], axis=-1) * 0.5
+        heat[~mask] *= 0.3
+        intensity = np.clip(delta / max(self.threshold, 1e-6), 0, 1) * mask
+        heat[..., 0] = np.maximum(heat[..., 0], intensity * 255)
+        path = os.path.join(self.diffs_dir, re.sub(r"[^\w.-]+", "_", name) + ".png")
+        os.makedirs(self.diffs_dir, exist_ok=True)
+        Image.fromarray(heat.astype(np.uint8)).save(path)
+        return path
+
+# pages/login_page.py
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+
+class LoginPage(BasePage):
+    """Класс для работы со страницей логина."""
+    
+    # Локаторы
+    USERNAME_INPUT = (By.ID, "username")
+    PASSWORD_INPUT = (By.ID, "password")
+    LOGIN_BUTTON = (By.ID, "login-button")
+    ERROR_MESSAGE = (By.CLASS_NAME, "error-message")
+    # Кнопка выхода появляется только после успешного входа
+    LOGGED_IN_MARKER = (By.ID, "logout")
+    
+    def __init__(self, driver, cache_elements=False):
+        super().__init__(driver, cache_elements)
+        
+    def open_login_page(self, url):
+        """Открыть страницу логина."""
+        self.open(url)
+        
+    def login(self, username, password):
+        """Войти в систему с указанными учетными данными."""
+        self.fill_form({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
+        self.click(self.LOGIN_BUTTON)
+        
+    def get_error_message(self):
+        """Получить сообщение об ошибке."""
+        return self.get_text(self.ERROR_MESSAGE)
+        
+    def wait_for_login_result(self, timeout=10):
+        """Дождаться результата входа: 'success', 'error' или None по таймауту."""
+        return self.wait_for_any(
+            {"success": self.LOGGED_IN_MARKER, "error": self.ERROR_MESSAGE}, timeout
+        )
+        
+    def is_login_successful(self):
+        """Проверить, успешен ли логин; таймаут без исхода - не успех."""
+        return self.wait_for_login_result(timeout=2) == "success"
+
+# pages/home_page.py
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+from pages.login_page import LoginPage
+
+class HomePage(BasePage):
+    """Класс для работы с домашней страницей."""
+    
+    # Локаторы
+    WELCOME_MESSAGE = (By.ID, "welcome-message")
+    USER_PROFILE = (By.ID, "user-profile")
+    # Тот же элемент - признак успешного входа на странице логина
+    LOGOUT_BUTTON = LoginPage.LOGGED_IN_MARKER
+    
+    def __init__(self, driver, cache_elements=False):
+        super().__init__(driver, cache_elements)
+        
+    def get_welcome_message(self):
+        """Получить приветственное сообщение."""
+        return self.get_text(self.WELCOME_MESSAGE)
+        
+    def open_user_profile(self):
+        """Открыть профиль пользователя."""
+        self.click(self.USER_PROFILE)
+        
+    def logout(self):
+        """Выйти из системы."""
+        self.click(self.LOGOUT_BUTTON)
+        
+    def is_user_logged_in(self):
+        """Проверить, вошел ли пользователь в систему."""
+        # Ошибка входа завершает ожидание сразу, не дожидаясь таймаута
+        outcome = self.wait_for_any(
+            {"logged_in": self.LOGOUT_BUTTON, "login_error": LoginPage.ERROR_MESSAGE}
+        )
+        return outcome == "logged_in"
+
+# pages/async_login_page.py
+from base.async_base_page import AsyncBasePage
+from pages.login_page import LoginPage
+
+class AsyncLoginPage(AsyncBasePage):
+    """Асинхронный вариант LoginPage с теми же локаторами."""
+    
+    # Локаторы
+    USERNAME_INPUT = LoginPage.USERNAME_INPUT
+    PASSWORD_INPUT = LoginPage.PASSWORD_INPUT
+    LOGIN_BUTTON = LoginPage.LOGIN_BUTTON
+    ERROR_MESSAGE = LoginPage.ERROR_MESSAGE
+    LOGGED_IN_MARKER = LoginPage.LOGGED_IN_MARKER
+    
+    async def open_login_page(self, url):
+        """Открыть страницу логина."""
+        await self.open(url)
+        
+    async def login(self, username, password):
+        """Войти в систему с указанными учетными данными."""
+        await self.fill_form({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
+        await self.click(self.LOGIN_BUTTON)
+        
+    async def get_error_message(self):
+        """Получить сообщение об ошибке."""
+        return await self.get_text(self.ERROR_MESSAGE)
+        
+    async def wait_for_login_result(self, timeout=10):
+        """Дождаться результата входа: 'success', 'error' или None по таймауту."""
+        return await self.wait_for_any(
+            {"success": self.LOGGED_IN_MARKER, "error": self.ERROR_MESSAGE}, timeout
+        )
+        
+    async def is_login_successful(self):
+        """Проверить, успешен ли логин; таймаут без исхода - не успех."""
+        return await self.wait_for_login_result(timeout=2) == "success"
+
+# pages/async_home_page.py
+from base.async_base_page import AsyncBasePage
+from pages.home_page import HomePage
+from pages.login_page import LoginPage
+
+class AsyncHomePage(AsyncBasePage):
+    """Асинхронный вариант HomePage с теми же локаторами."""
+    
+    # Локаторы
+    WELCOME_MESSAGE = HomePage.WELCOME_MESSAGE
+    USER_PROFILE = HomePage.USER_PROFILE
+    LOGOUT_BUTTON = HomePage.LOGOUT_BUTTON
+    
+    async def get_welcome_message(self):
+        """Получить приветственное сообщение."""
+        return await self.get_text(self.WELCOME_MESSAGE)
+        
+    async def open_user_profile(self):
+        """Открыть профиль пользователя."""
+        await self.click(self.USER_PROFILE)
+        
+    async def logout(self):
+        """Выйти из системы."""
+        await self.click(self.LOGOUT_BUTTON)
+        
+    async def is_user_logged_in(self):
+        """Проверить, вошел ли пользователь в систему."""
+        outcome = await self.wait_for_any(
+            {"logged_in": self.LOGOUT_BUTTON, "login_error": LoginPage.ERROR_MESSAGE}
+        )
+        return outcome == "logged_in"
+
+# pages/registration_page.py
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+from base.wait_engine import FIND_ELEMENT_SCRIPT
+
+class RegistrationPage(BasePage):
+    """Класс для работы с формой регистрации."""
+    
+    # Локаторы полей по именам, используемым в таблицах случаев
+    FIELDS = {
+        "name": (By.ID, "name"),
+        "email": (By.ID, "email"),
+        "password": (By.ID, "password"),
+        "confirm_password": (By.ID, "confirm-password"),
+        "terms": (By.ID, "terms"),
+    }
+    # Сообщения об ошибках полей
+    ERRORS = {
+        "name": (By.ID, "name-error"),
+        "email": (By.ID, "email-error"),
+        "password": (By.ID, "password-error"),
+        "confirm_password": (By.ID, "confirm-password-error"),
+        "terms": (By.ID, "terms-error"),
+    }
+    SUBMIT_BUTTON = (By.ID, "submit-btn")
+    SUCCESS_MESSAGE = (By.CLASS_NAME, "success-message")
+    ERROR_MESSAGE = (By.CLASS_NAME, "error-message")
+    
+    # Сброс формы без перезагрузки: form.reset(), события для фреймворков,
+    # очистка сообщений об ошибках полей и скрытие итоговых сообщений
+    # (успех, общая ошибка) от предыдущего случая
+    RESET_FORM_SCRIPT = FIND_ELEMENT_SCRIPT + """
+        var submit = find(arguments[0][0], arguments[0][1]);
+        var form = submit && submit.form;
+        if (!form) return false;
+        form.reset();
+        Array.prototype.forEach.call(form.elements, function (el) {
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+        });
+        arguments[1].forEach(function (locator) {
+            var el = find(locator[0], locator[1]);
+            if (el) el.textContent = '';
+        });
+        arguments[2].forEach(function (locator) {
+            var el = find(locator[0], locator[1]);
+            if (el) {
+                el.textContent = '';
+                el.style.display = 'none';
+            }
+        });
+        return true;
+    """
+    
+    def __init__(self, driver, cache_elements=False):
+        super().__init__(driver, cache_elements)
+        self.url = None
+        self.page_loads = 0
+        
+    def open_registration_page(self, url):
+        """Открыть страницу регистрации."""
+        self.url = url
+        self.open(url)
+        self.page_loads += 1
+        
+    def reset_form(self):
+        """Вернуть форму в исходное состояние; перезагрузить страницу, только если формы нет."""
+        locators = [list(locator) for locator in self.ERRORS.values()]
+        messages = [list(self.SUCCESS_MESSAGE), list(self.ERROR_MESSAGE)]
+        if not self.driver.execute_script(self.RESET_FORM_SCRIPT, list(self.SUBMIT_BUTTON), locators, messages):
+            self.logger.info("Форма не найдена, страница регистрации открывается заново")
+            self.open_registration_page(self.url)
+            
+    def check_case(self, case, timeout=5):
+        """Заполнить форму значениями случая и отправить её.
+        
+        Вернуть пару: отправлена ли форма (появилось сообщение об успехе) и
+        тексты ошибок полей {поле: текст}.
+        """
+        self.reset_form()
+        # Страница могла снова показать успех предыдущего случая (например, по
+        # ответу сервера, пришедшему после сброса) - он не должен попасть в этот случай
+        if not self.waits.until_hidden(self.SUCCESS_MESSAGE, timeout):
+            self.logger.warning("Сообщение об успехе предыдущего случая не исчезло за %s секунд", timeout)
+        self.fill_form({self.FIELDS[name]: value for name, value in case.values.items()})
+        self.click(self.SUBMIT_BUTTON)
+        
+        if case.errors:
+            # Ждём первую из ожидаемых ошибок, остальные рисуются в том же цикле валидации
+            self.wait_for_any({name: self.ERRORS[name] for name in case.errors}, timeout)
+        else:
+            self.wait_for_any({"success": self.SUCCESS_MESSAGE, "error": self.ERROR_MESSAGE}, timeout)
+            
+        names = list(self.ERRORS)
+        locators = [list(self.ERRORS[name]) for name in names] + [list(self.SUCCESS_MESSAGE)]
+        texts = self.driver.execute_script(self.READ_MANY_SCRIPT, locators)
+        errors = {name: (text or "").strip() for name, text in zip(names, texts)}
+        return bool(texts[-1]), errors
+
+# tests/test_artifacts.py
+import io
+import json
+import os
+import pytest
+from utils.artifacts import ArtifactWriter
+
+KB = 1 / 1024
+
+def read_index(directory):
+    with open(os.path.join(directory, ArtifactWriter.INDEX_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def png(width, height, color=(200, 30, 30)):
+    """PNG с шумом, чтобы размер файла зависел от ширины."""
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    image.paste(color, (0, 0, width // 4, height // 4))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+def test_identical_artifacts_are_stored_once(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), workers=1)
+    first = writer.submit("test_a", b"same bytes", "bin").result()
+    second = writer.submit("test_b", b"same bytes", "bin").result()
+    writer.shutdown()
+    
+    assert first == second and os.path.exists(first)
+    assert (writer.saved, writer.duplicates, writer.bytes_written) == (1, 1, len(b"same bytes"))
+    assert [(r["name"], r["duplicate"]) for r in read_index(tmp_path)] == [("test_a", False), ("test_b", True)]
+
+def test_budget_drops_artifacts_that_do_not_fit(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), workers=1, budget_mb=KB)
+    assert writer.submit("fits", b"a" * 600, "bin").result()
+    assert writer.submit("too_big", b"b" * 600, "bin").result() is None
+    
+    # После переполнения скриншоты не снимаются и не ставятся в очередь
+    assert writer.exhausted
+    assert writer.submit("late", b"c", "bin") is None
+    writer.shutdown()
+    assert (writer.saved, writer.dropped, writer.bytes_written) == (1, 2, 600)
+    assert [r["name"] for r in read_index(tmp_path)] == ["fits"]
+
+def test_duplicates_do_not_consume_budget(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), workers=1, budget_mb=KB)
+    for name in ("a", "b", "c"):
+        assert writer.submit(name, b"x" * 900, "bin").result()
+    writer.shutdown()
+    assert (writer.saved, writer.duplicates, writer.dropped) == (1, 2, 0)
+
+def test_screenshots_are_resized_to_max_width(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    writer = ArtifactWriter(str(tmp_path), workers=1, max_width=100)
+    path = writer.submit("wide", png(400, 200)).result()
+    writer.shutdown()
+    
+    with Image.open(path) as image:
+        assert image.size == (100, 50)
+    assert read_index(tmp_path)[0]["degraded"] is False
+
+def test_screenshots_are_halved_near_budget(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    data = png(200, 100)
+    writer = ArtifactWriter(str(tmp_path), workers=1, budget_mb=len(data) * 10 / 1024 / 1024)
+    writer.bytes_written = int(writer.budget * ArtifactWriter.DEGRADE_AT)
+    path = writer.submit("late", data).result()
+    writer.shutdown()
+    
+    with Image.open(path) as image:
+        assert image.size == (100, 50)
+    assert read_index(tmp_path)[0]["degraded"] is True
+
+def test_non_png_artifacts_are_not_reencoded(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), workers=1, max_width=10)
+    path = writer.submit("page", b"<html></html>", "html").result()
+    writer.shutdown()
+    with open(path, 'rb') as f:
+        assert f.read() == b"<html></html>"
+
+# tests/test_async_webdriver.py
+import asyncio
+import itertools
+import pytest
+from aiohttp import web
+from selenium.common.exceptions import JavascriptException, NoSuchElementException, WebDriverException
+from config.config import Config
+from utils.async_webdriver import ELEMENT_KEY, AsyncDriverFactory, AsyncWebElement
+
+class FakeWebDriverServer:
+    """Сервер протокола W3C WebDriver без браузера."""
+    
+    def __init__(self, fail_every=0):
+        self.fail_every = fail_every
+        self.sessions = set()
+        self.closed = []
+        self.commands = []
+        self._ids = itertools.count(1)
+        self.app = web.Application()
+        self.app.router.add_post("/session", self.new_session)
+        self.app.router.add_delete("/session/{id}", self.delete_session)
+        self.app.router.add_route("*", "/session/{id}/{command:.*}", self.command)
+        
+    async def new_session(self, request):
+        number = next(self._ids)
+        payload = await request.json()
+        if self.fail_every and number % self.fail_every == 0:
+            return self.error(500, "session not created", "нет свободных браузеров")
+        session_id = f"s{number}"
+        self.sessions.add(session_id)
+        return web.json_response({"value": {"sessionId": session_id, "capabilities": payload["capabilities"]}})
+        
+    async def delete_session(self, request):
+        session_id = request.match_info["id"]
+        if session_id not in self.sessions:
+            return self.error(404, "invalid session id", session_id)
+        self.sessions.discard(session_id)
+        self.closed.append(session_id)
+        return web.json_response({"value": None})
+        
+    async def command(self, request):
+        if request.match_info["id"] not in self.sessions:
+            return self.error(404, "invalid session id", request.match_info["id"])
+        name = request.match_info["command"]
+        payload = await request.json() if request.can_read_body else None
+        self.commands.append((request.method, name, payload))
+        if name == "elements":
+            if payload["value"] == "#missing":
+                return web.json_response({"value": []})
+            return web.json_response({"value": [{ELEMENT_KEY: "e1"}, {ELEMENT_KEY: "e2"}]})
+        if name == "element/e404/click":
+            return self.error(404, "no such element", "элемент не найден")
+        if name == "execute/sync":
+            if payload["script"] == "throw":
+                return self.error(500, "javascript error", "boom")
+            return web.json_response({"value": {"args": payload["args"]}})
+        if name.endswith("/text"):
+            return web.json_response({"value": "text of " + name.split("/")[1]})
+        if name == "broken":
+            return web.Response(status=502, text="Bad Gateway")
+        if name == "unknown":
+            return self.error(500, "unsupported operation", "нет такой команды")
+        return web.json_response({"value": None})
+        
+    @staticmethod
+    def error(status, error, message):
+        return web.json_response({"value": {"error": error, "message": message}}, status=status)
+
+def run(scenario, server):
+    """Поднять сервер на свободном порту и выполнить сценарий с фабрикой сессий."""
+    async def main():
+        runner = web.AppRunner(server.app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        factory = AsyncDriverFactory(f"http://127.0.0.1:{port}/", {"browserName": "chrome"}, max_connections=4)
+        try:
+            return await scenario(factory)
+        finally:
+            await factory.close()
+            await runner.cleanup()
+    return asyncio.run(main())
+
+def test_session_lifecycle():
+    server = FakeWebDriverServer()
+    
+    async def scenario(factory):
+        driver = await factory.new_driver()
+        await driver.get("http://app/")
+        await driver.quit()
+        await driver.quit()
+        return driver
+        
+    driver = run(scenario, server)
+    assert driver.session_id is None
+    assert server.closed == ["s1"]
+    assert server.commands == [("POST", "url", {"url": "http://app/"})]
+
+def test_elements_are_unwrapped_and_wrapped():
+    server = FakeWebDriverServer()
+    
+    async def scenario(factory):
+        driver = await factory.new_driver()
+        elements = await driver.find_elements("css selector", "li")
+        texts = [await element.text() for element in elements]
+        echoed = await driver.execute_script("return arguments", elements[0], [elements[1]])
+        missing = await driver.find_elements("css selector", "#missing")
+        return elements, texts, echoed, missing
+        
+    elements, texts, echoed, missing = run(scenario, server)
+    assert [element.id for element in elements] == ["e1", "e2"]
+    assert texts == ["text of e1", "text of e2"]
+    # Ссылки на элементы уходят в протокол как JSON и возвращаются объектами
+    assert server.commands[-2][2]["args"] == [{ELEMENT_KEY: "e1"}, [{ELEMENT_KEY: "e2"}]]
+    first, (second,) = echoed["args"]
+    assert isinstance(first, AsyncWebElement) and (first.id, second.id) == ("e1", "e2")
+    assert missing == []
+
+@pytest.mark.parametrize("command, error, message", [
+    (lambda driver: AsyncWebElement(driver, "e404").click(), NoSuchElementException, "элемент не найден"),
+    (lambda driver: driver.execute_script("throw"), JavascriptException, "boom"),
+    (lambda driver: driver.command("POST", "/unknown"), WebDriverException, "нет такой команды"),
+    (lambda driver: driver.command("GET", "/broken"), WebDriverException, "Bad Gateway"),
+], ids=["no-such-element", "javascript-error", "unknown-error", "not-json"])
+def test_protocol_errors_map_to_selenium_exceptions(command, error, message):
+    server = FakeWebDriverServer()
+    
+    async def scenario(factory):
+        driver = await factory.new_driver()
+        with pytest.raises(error) as raised:
+            await command(driver)
+        return raised
+        
+    raised = run(scenario, server)
+    assert type(raised.value) is error and message in raised.value.msg
+
+def test_sessions_open_concurrently_and_close():
+    server = FakeWebDriverServer()
+    
+    async def scenario(factory):
+        async with factory.sessions(3) as drivers:
+            opened = set(server.sessions)
+            ids = {driver.session_id for driver in drivers}
+        return opened, ids
+        
+    opened, ids = run(scenario, server)
+    assert opened == ids == {"s1", "s2", "s3"}
+    assert server.sessions == set()
+
+def test_failed_session_closes_opened_ones():
+    server = FakeWebDriverServer(fail_every=2)
+    
+    async def scenario(factory):
+        with pytest.raises(WebDriverException, match="нет свободных браузеров"):
+            async with factory.sessions(3):
+                pass
+                
+    run(scenario, server)
+    assert sorted(server.closed) == ["s1", "s3"] and server.sessions == set()
+
+def test_quit_error_is_logged_and_session_forgotten(caplog):
+    server = FakeWebDriverServer()
+    
+    async def scenario(factory):
+        driver = await factory.new_driver()
+        server.sessions.clear()
+        await driver.quit()
+        return driver
+        
+    assert run(scenario, server).session_id is None
+    assert "Не удалось закрыть сессию s1" in caplog.text
+
+def test_capabilities_follow_fast_profile():
+    config = Config()
+    config.browser = "chrome-fast"
+    config.viewport_width, config.viewport_height = 800, 600
+    args = AsyncDriverFactory.capabilities_for(config)["goog:chromeOptions"]["args"]
+    assert "--headless=new" in args and "--window-size=800,600" in args
+    
+    config.browser = "firefox"
+    config.browser_profile = "default"
+    capabilities = AsyncDriverFactory.capabilities_for(config)
+    assert capabilities["browserName"] == "firefox" and "-headless" not in capabilities.get("moz:firefoxOptions", {}).get("args", [])
+
+# tests/test_auth.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from base.base_test import BaseTest
+from config.config import Config
+from utils.auth import AuthHelper
+
+class LoginHandler(BaseHTTPRequestHandler):
+    """Эндпоинт входа: cookie сессии и токен для верного пароля, 401 для неверного."""
+    
+    def do_POST(self):
+        self.server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if body == {"username": "testuser", "password": "password123"}:
+            payload = json.dumps({"token": "token-123", "expires_in": 600}).encode()
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=abc; Path=/; HttpOnly")
+        else:
+            payload = json.dumps({"error": "invalid credentials"}).encode()
+            self.send_response(401)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        
+    def log_message(self, format, *args):
+        pass
+
+class FakeChromeDriver:
+    """Драйвер Chromium: запоминает команды CDP и навигацию."""
+    
+    def __init__(self):
+        self.commands = []
+        self.visited = []
+        
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        return {"identifier": "1"} if cmd == "Page.addScriptToEvaluateOnNewDocument" else {}
+        
+    def get(self, url):
+        self.visited.append(url)
+
+class FakeFirefoxDriver:
+    """Драйвер без CDP: cookies ставятся на открытой странице."""
+    
+    def __init__(self):
+        self.visited = []
+        self.cookies = []
+        self.scripts = []
+        
+    def get(self, url):
+        self.visited.append(url)
+        
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+        
+    def execute_script(self, script):
+        self.scripts.append(script)
+
+@pytest.fixture
+def login_server(monkeypatch):
+    """Локальный сервер входа; кэш сессий очищается для каждого теста."""
+    monkeypatch.setattr(AuthHelper, "_sessions", {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LoginHandler)
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def config(login_server):
+    """Конфигурация, указывающая на локальный сервер входа."""
+    cfg = Config()
+    cfg.base_url = "http://127.0.0.1:{}".format(login_server.server_address[1])
+    return cfg
+
+@pytest.fixture
+def driver():
+    """Драйвер без браузера вместо фикстуры conftest."""
+    return FakeChromeDriver()
+
+def test_login_returns_cookie_and_token_and_caches_session(login_server, config):
+    auth = AuthHelper(config)
+    session = auth.login("testuser", "password123")
+    
+    assert session.token == "token-123"
+    assert [(c["name"], c["value"], c["httpOnly"]) for c in session.cookies] == [("session", "abc", True)]
+    assert not session.is_expired()
+    assert auth.login("testuser", "password123") is session
+    assert login_server.requests == 1
+
+def test_login_error_is_raised_and_not_cached(login_server, config):
+    auth = AuthHelper(config)
+    with pytest.raises(requests.HTTPError):
+        auth.login("testuser", "wrong")
+    with pytest.raises(requests.HTTPError):
+        auth.login("testuser", "wrong")
+    assert login_server.requests == 2
+
+def test_inject_sets_cookie_and_token_through_cdp(config, driver):
+    auth = AuthHelper(config)
+    injection = auth.inject(driver, auth.login("testuser", "password123"))
+    
+    commands = dict(driver.commands)
+    cookie = commands["Network.setCookies"]["cookies"][0]
+    assert (cookie["name"], cookie["value"], cookie["url"]) == ("session", "abc", config.base_url)
+    assert "token-123" in commands["Page.addScriptToEvaluateOnNewDocument"]["source"]
+    assert driver.visited == []
+    
+    AuthHelper.eject(driver, injection)
+    assert driver.commands[-1] == ("Page.removeScriptToEvaluateOnNewDocument", {"identifier": injection})
+
+def test_inject_without_cdp_opens_site_first(config):
+    driver = FakeFirefoxDriver()
+    auth = AuthHelper(config)
+    
+    assert auth.inject(driver, auth.login("testuser", "password123")) is None
+    assert driver.visited == [config.base_url]
+    assert driver.cookies[0]["name"] == "session"
+    assert "token-123" in driver.scripts[0]
+
+def test_logged_in_driver_skips_login_form(logged_in_driver, login_server, config):
+    assert login_server.requests == 1
+    assert logged_in_driver.visited == []
+    assert "Network.setCookies" in dict(logged_in_driver.commands)
+
+def test_login_via_api_in_base_test(login_server, config):
+    test = BaseTest()
+    test.config, test.driver = config, FakeChromeDriver()
+    
+    test.login_via_api()
+    
+    assert test.auth_injection == "1"
+    assert "Network.setCookies" in dict(test.driver.commands)
+
+# tests/test_backend_stub.py
+import json
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from selenium.common.exceptions import WebDriverException
+from utils.backend_stub import BackendStub, body_hash
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Бэкенд приложения: список товаров и эхо тела запроса."""
+    
+    def do_GET(self):
+        self._reply(200, {"items": ["apple", "pear"], "page": self.path})
+        
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        self._reply(201, {"echo": json.loads(body)})
+        
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        
+    def log_message(self, format, *args):
+        pass
+
+class FakeChromeDriver:
+    """Браузер без окна: запросы идут в настоящий сервер, события пишутся в журнал performance."""
+    
+    def __init__(self):
+        self.performance = []
+        self.bodies = {}
+        self.commands = []
+        self.scripts = {}
+        self._next_id = 0
+        
+    def request(self, method, url, body=None, resource_type="Fetch"):
+        """Выполнить запрос страницы и записать события Network.* как ChromeDriver."""
+        self._next_id += 1
+        request_id = str(self._next_id)
+        request = {"method": method, "url": url, "headers": {}}
+        if body is not None:
+            request["postData"] = body
+        self._event("Network.requestWillBeSent", requestId=request_id, type=resource_type,
+                    request=request, timestamp=time.monotonic(), wallTime=time.time())
+        data = body.encode() if body is not None else None
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, method=method)) as response:
+            text = response.read().decode()
+            headers = dict(response.headers.items())
+            self._event("Network.responseReceived", requestId=request_id, type=resource_type,
+                        response={"url": url, "status": response.status, "headers": headers})
+        self.bodies[request_id] = text
+        self._event("Network.loadingFinished", requestId=request_id, timestamp=time.monotonic())
+        return text
+        
+    def _event(self, method, **params):
+        message = {"message": {"method": method, "params": params}, "webview": "page"}
+        self.performance.append({"message": json.dumps(message), "level": "INFO", "timestamp": 0})
+        
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        entries, self.performance = self.performance, []
+        return entries
+        
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        if cmd == "Network.getResponseBody":
+            if params["requestId"] not in self.bodies:
+                raise WebDriverException("No resource with given identifier found")
+            return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            identifier = str(len(self.scripts) + 1)
+            self.scripts[identifier] = params["source"]
+            return {"identifier": identifier}
+        if cmd == "Page.removeScriptToEvaluateOnNewDocument":
+            del self.scripts[params["identifier"]]
+        return {}
+
+@pytest.fixture
+def api_server():
+    """Локальный бэкенд на свободном порту."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(autouse=True)
+def clean_index_cache(monkeypatch):
+    """Индексы HAR не переживают тест."""
+    monkeypatch.setattr(BackendStub, "_index_cache", type(BackendStub._index_cache)())
+
+def base_url(server):
+    return "http://127.0.0.1:{}".format(server.server_address[1])
+
+def record_session(har_dir, url):
+    """Записать два запроса приложения и загрузку документа, которая не записывается."""
+    driver = FakeChromeDriver()
+    driver.request("GET", url + "/", resource_type="Document")
+    stub = BackendStub(BackendStub.RECORD, str(har_dir), latency=0)
+    stub.start(driver, "tests/test_cart.py::test_add")
+    driver.request("GET", url + "/index.html", resource_type="Document")
+    items = driver.request("GET", url + "/api/items?page=1")
+    echo = driver.request("POST", url + "/api/cart", body='{"id": 7}', resource_type="XHR")
+    stub.stop(driver)
+    return stub, driver, items, echo
+
+def test_record_writes_har_from_driver_network_log(api_server, tmp_path):
+    url = base_url(api_server)
+    stub, driver, items, echo = record_session(tmp_path, url)
+    
+    with open(stub.har_path("tests/test_cart.py::test_add"), encoding="utf-8") as f:
+        entries = json.load(f)["log"]["entries"]
+    assert [(e["request"]["method"], e["request"]["url"]) for e in entries] == [
+        ("GET", url + "/api/items?page=1"), ("POST", url + "/api/cart")
+    ]
+    assert entries[0]["response"]["content"]["text"] == items
+    assert entries[1]["response"]["status"] == 201
+    assert entries[1]["request"]["postData"]["text"] == '{"id": 7}'
+    assert entries[1]["request"]["_bodyHash"] == body_hash('{"id": 7}')
+    # Страница не участвует в записи: скрипты не встраиваются
+    assert driver.scripts == {}
+    assert ("Network.enable", {"maxResourceBufferSize": BackendStub.RESOURCE_BUFFER_SIZE,
+                               "maxTotalBufferSize": BackendStub.TOTAL_BUFFER_SIZE}) in driver.commands
+
+def test_record_keeps_requests_collected_before_stop(api_server, tmp_path):
+    url = base_url(api_server)
+    driver = FakeChromeDriver()
+    stub = BackendStub(BackendStub.RECORD, str(tmp_path))
+    stub.start(driver, "test_tabs")
+    driver.request("GET", url + "/api/first")
+    stub.collect(driver)
+    # Тело первого ответа уже прочитано, браузер может его выгрузить
+    driver.bodies.clear()
+    driver.request("GET", url + "/api/second")
+    stub.stop(driver)
+    
+    index = BackendStub.load_index(stub.har_path("test_tabs"))
+    assert json.loads(index["GET " + url + "/api/first"][0]["text"])["page"] == "/api/first"
+    assert json.loads(index["GET " + url + "/api/second"][0]["text"])["page"] == "/api/second"
+
+def test_missing_response_body_is_reported(api_server, tmp_path, caplog):
+    url = base_url(api_server)
+    driver = FakeChromeDriver()
+    stub = BackendStub(BackendStub.RECORD, str(tmp_path))
+    stub.start(driver, "test_evicted")
+    driver.request("GET", url + "/api/items")
+    driver.bodies.clear()
+    stub.stop(driver)
+    
+    entry = BackendStub.load_index(stub.har_path("test_evicted"))["GET " + url + "/api/items"][0]
+    assert entry["status"] == 200 and entry["text"] is None
+    assert "не получено" in caplog.text
+
+def test_record_without_performance_log_is_skipped(tmp_path, caplog):
+    class NoLogDriver(FakeChromeDriver):
+        def get_log(self, log_type):
+            raise WebDriverException("log type 'performance' not found")
+            
+    stub = BackendStub(BackendStub.RECORD, str(tmp_path))
+    stub.start(NoLogDriver(), "test_nolog")
+    stub.stop(NoLogDriver())
+    
+    assert not (tmp_path / "test_nolog.har").exists()
+    assert "performance" in caplog.text
+
+def test_replay_installs_index_from_recorded_har(api_server, tmp_path):
+    url = base_url(api_server)
+    record_session(tmp_path, url)
+    driver = FakeChromeDriver()
+    stub = BackendStub(BackendStub.REPLAY, str(tmp_path), latency=0, strict=True)
+    stub.start(driver, "tests/test_cart.py::test_add")
+    
+    settings = json.loads(list(driver.scripts.values())[0].rsplit("})(", 1)[1].rsplit(");", 1)[0])
+    assert settings["strict"] is True
+    post = settings["entries"]["POST " + url + "/api/cart " + body_hash('{"id": 7}')]
+    assert json.loads(post[0]["text"]) == {"echo": {"id": 7}}
+    stub.stop(driver)
+    assert driver.scripts == {}
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="нужен node")
+def test_replay_serves_recorded_responses_without_server(api_server, tmp_path):
+    url = base_url(api_server)
+    _, _, items, echo = record_session(tmp_path, url)
+    api_server.shutdown()
+    api_server.server_close()
+    driver = FakeChromeDriver()
+    BackendStub(BackendStub.REPLAY, str(tmp_path), latency=0).start(driver, "tests/test_cart.py::test_add")
+    
+    page = """
+    globalThis.window = globalThis;
+    globalThis.document = {baseURI: %(url)s};
+    globalThis.XMLHttpRequest = function () {};
+    XMLHttpRequest.prototype = {open: function () {}, send: function () {}};
+    %(shim)s
+    (async function () {
+        var items = await fetch(%(url)s + '/api/items?page=1');
+        var cart = await fetch(%(url)s + '/api/cart', {method: 'POST', body: '{"id": 7}'});
+        console.log(JSON.stringify([items.status, await items.text(), cart.status, await cart.text()]));
+    })();
+    """ % {"url": json.dumps(url), "shim": list(driver.scripts.values())[0]}
+    result = subprocess.run(["node", "-e", page], capture_output=True, text=True, timeout=30)
+    
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == [200, items, 201, echo]
+
+# tests/test_base_page.py
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+from base.wait_engine import WaitEngine
+
+NAME = (By.ID, "name")
+EMAIL = (By.ID, "email")
+AVATAR = (By.ID, "avatar")
+TITLE = (By.ID, "title")
+
+class FakeElement:
+    def __init__(self, text=""):
+        self.text = text
+        self.typed = []
+        self.clicks = 0
+        self.stale = False
+        
+    def clear(self):
+        self.typed.clear()
+        
+    def send_keys(self, text):
+        self.typed.append(text)
+        
+    def click(self):
+        if self.stale:
+            raise StaleElementReferenceException("element is not attached to the page document")
+        self.clicks += 1
+
+class FakeDriver:
+    """Драйвер со страницей из элементов по локаторам; скрипты отвечают заданными результатами."""
+    
+    def __init__(self, elements, script_result=None):
+        self.elements = elements
+        self.script_result = script_result
+        self.scripts = []
+        self.lookups = 0
+        
+    def find_elements(self, by, value):
+        self.lookups += 1
+        element = self.elements.get((by, value))
+        return [element] if element else []
+        
+    def execute_script(self, script, *args):
+        self.scripts.append(args)
+        return self.script_result(*args) if self.script_result else None
+
+@pytest.fixture(autouse=True)
+def poll_waits(monkeypatch):
+    """Ожидания без браузера - опросом find_elements."""
+    monkeypatch.setattr(WaitEngine, "strategy", WaitEngine.POLL)
+
+def test_read_many_uses_one_script_and_waits_only_for_missing():
+    driver = FakeDriver({TITLE: FakeElement("Профиль")}, lambda locators: ["Иван", None])
+    
+    assert BasePage(driver).read_many([NAME, TITLE], timeout=0) == ["Иван", "Профиль"]
+    assert driver.scripts == [([list(NAME), list(TITLE)],)]
+
+def test_fill_form_types_native_and_missing_fields():
+    avatar, email = FakeElement(), FakeElement()
+    driver = FakeDriver({AVATAR: avatar, EMAIL: email}, lambda fields: ["ok", "missing"])
+    values = {NAME: "Иван", EMAIL: "ivan@example.com", AVATAR: "/tmp/a.png"}
+    
+    assert BasePage(driver).fill_form(values, timeout=0, native_fields=(AVATAR,))
+    assert driver.scripts == [([["id", "name", "Иван"], ["id", "email", "ivan@example.com"]],)]
+    assert email.typed == ["ivan@example.com"]
+    assert avatar.typed == ["/tmp/a.png"]
+
+def test_fill_form_reports_field_that_never_appears():
+    driver = FakeDriver({}, lambda fields: ["missing"])
+    assert not BasePage(driver).fill_form({NAME: "Иван"}, timeout=0)
+
+def test_actions_reuse_cached_element():
+    button = FakeElement()
+    driver = FakeDriver({TITLE: button})
+    page = BasePage(driver, cache_elements=True)
+    
+    page.click(TITLE)
+    page.click(TITLE)
+    
+    assert button.clicks == 2
+    assert driver.lookups == 1
+    assert page.element_cache_stats() == {"hits": 1, "misses": 1, "stale": 0}
+
+def test_find_element_is_never_served_from_cache():
+    driver = FakeDriver({TITLE: FakeElement()})
+    page = BasePage(driver, cache_elements=True)
+    page.click(TITLE)
+    
+    # Страница перестроилась: кэшированный элемент устарел
+    driver.elements[TITLE].stale = True
+    driver.elements[TITLE] = FakeElement()
+    
+    assert page.find_element(TITLE, timeout=0) is driver.elements[TITLE]
+
+def test_stale_cached_element_is_found_again():
+    old = FakeElement()
+    driver = FakeDriver({TITLE: old})
+    page = BasePage(driver, cache_elements=True)
+    page.click(TITLE)
+    
+    # Клик привёл к навигации, на новой странице тот же локатор
+    old.stale = True
+    driver.elements[TITLE] = FakeElement()
+    
+    assert page.click(TITLE)
+    assert driver.elements[TITLE].clicks == 1
+    assert page.element_cache_stats()["stale"] == 1
+
+# tests/test_bench_framework.py
+import json
+import pytest
+from benchmarks.bench_framework import CONFIGURATIONS, compare, main, percentiles
+
+def test_percentiles_nearest_rank():
+    values = [float(value) for value in range(20, 0, -1)]
+    assert percentiles(values) == {"p50": 10.0, "p95": 19.0, "count": 20}
+
+def test_percentiles_of_single_and_empty_series():
+    assert percentiles([0.3]) == {"p50": 0.3, "p95": 0.3, "count": 1}
+    assert percentiles([]) == {"p50": None, "p95": None, "count": 0}
+
+def test_every_configuration_differs_from_another_in_one_setting():
+    for name, settings in CONFIGURATIONS.items():
+        differences = [
+            sum(settings[key] != other[key] for key in settings)
+            for other_name, other in CONFIGURATIONS.items() if other_name != name
+        ]
+        assert 1 in differences, name
+
+def result(startup, scenario, action):
+    """Файл результатов с одной конфигурацией."""
+    return {"configs": {"explicit-pooled-batched": {
+        "startup": percentiles(startup),
+        "scenarios": {"task_manager": percentiles(scenario)},
+        "actions": {"task_manager.click": percentiles(action)},
+    }}}
+
+@pytest.fixture
+def result_files(tmp_path):
+    old, new = tmp_path / "old.json", tmp_path / "new.json"
+    old.write_text(json.dumps(result([0.2, 0.4], [1.0], [0.010])), encoding="utf-8")
+    new.write_text(json.dumps(result([0.1, 0.2], [1.5], [])), encoding="utf-8")
+    return str(old), str(new)
+
+def test_compare_prints_change_of_p50_and_p95(result_files, capsys):
+    compare(*result_files)
+    lines = capsys.readouterr().out.splitlines()
+    
+    assert lines[0] == "[explicit-pooled-batched]"
+    assert "200.0 ->    100.0 мс (-50.0%)" in lines[1]
+    assert "p95    400.0 ->    200.0 мс" in lines[1]
+    assert "(+50.0%)" in lines[2]
+    # Действие без замеров в новом прогоне не сравнивается
+    assert len(lines) == 3
+
+def test_main_compare_runs_without_browser(result_files, capsys):
+    assert main(["--compare", *result_files]) == 0
+    assert "task_manager" in capsys.readouterr().out
+
+# tests/test_browser_contexts.py
+import itertools
+import threading
+import time
+import pytest
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from utils.browser_contexts import BrowserContextManager
+from utils.driver_pool import DriverPool
+
+ADDRESS = "127.0.0.1:9222"
+
+class FakeBrowser:
+    """Процесс Chromium: вкладки, их контексты и cookies каждого контекста."""
+    
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.targets = {"main": None}
+        self.urls = {"main": "about:blank"}
+        self.cookies = {None: {}}
+        self.sessions = []
+
+class FakeSession:
+    """Сессия WebDriver, подключённая к браузеру: всё идёт через execute, как у RemoteWebDriver."""
+    
+    def __init__(self, browser, script_time=0.0):
+        self.browser = browser
+        self.script_time = script_time
+        self.current = "main"
+        self.intervals = []
+        self.closed = False
+        self.switch_to = SwitchTo(self)
+        browser.sessions.append(self)
+        
+    @property
+    def current_window_handle(self):
+        return self.current
+        
+    @property
+    def window_handles(self):
+        return self.execute(Command.W3C_GET_WINDOW_HANDLES)["value"]
+        
+    def get_window_size(self):
+        return {"width": 1280, "height": 800}
+        
+    def add_cookie(self, cookie):
+        self.execute(Command.ADD_COOKIE, {"cookie": cookie})
+        
+    def get_cookies(self):
+        return self.execute(Command.GET_ALL_COOKIES)["value"]
+        
+    def execute_async_script(self, script):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": []})["value"]
+        
+    def close(self):
+        self.execute(Command.CLOSE)
+        
+    def quit(self):
+        self.closed = True
+        
+    def execute_cdp_cmd(self, cmd, params):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+        
+    def execute(self, command, params=None):
+        if command == Command.W3C_EXECUTE_SCRIPT_ASYNC:
+            # Долгий скрипт не держит браузер: другие сессии работают в это время
+            start = time.perf_counter()
+            time.sleep(self.script_time)
+            self.intervals.append((start, time.perf_counter()))
+            return {"value": self.current}
+            
+        browser = self.browser
+        with browser.lock:
+            context = browser.targets[self.current]
+            value = None
+            if command == Command.SWITCH_TO_WINDOW:
+                assert params["handle"] in browser.targets
+                self.current = params["handle"]
+            elif command == Command.ADD_COOKIE:
+                browser.cookies[context][params["cookie"]["name"]] = params["cookie"]["value"]
+            elif command == Command.GET_ALL_COOKIES:
+                value = [{"name": name, "value": v} for name, v in browser.cookies[context].items()]
+            elif command == Command.CLOSE:
+                del browser.targets[self.current]
+            elif command == Command.W3C_GET_WINDOW_HANDLES:
+                value = list(browser.targets)
+            elif command == "executeCdpCommand":
+                value = self._cdp(params["cmd"], params["params"])
+            return {"value": value}
+            
+    def _cdp(self, cmd, params):
+        browser = self.browser
+        if cmd == "Target.createBrowserContext":
+            context_id = f"context-{next(browser.ids)}"
+            browser.cookies[context_id] = {}
+            return {"browserContextId": context_id}
+        if cmd == "Target.createTarget":
+            target_id = f"T{next(browser.ids)}"
+            # Старые chromedriver отдают дескриптор окна с префиксом CDwindow-
+            browser.targets[f"CDwindow-{target_id}"] = params.get("browserContextId")
+            return {"targetId": target_id}
+        if cmd == "Target.getTargets":
+            return {"targetInfos": [
+                {"targetId": handle.replace("CDwindow-", ""), "browserContextId": context}
+                for handle, context in browser.targets.items()
+            ]}
+        if cmd == "Target.disposeBrowserContext":
+            # Контекст закрывается из вкладки другого контекста
+            assert browser.targets[self.current] != params["browserContextId"]
+            for handle, context in list(browser.targets.items()):
+                if context == params["browserContextId"]:
+                    del browser.targets[handle]
+            del browser.cookies[params["browserContextId"]]
+        return {}
+
+class FakeHost:
+    """Драйвер, запустивший браузер."""
+    
+    def __init__(self, capabilities):
+        self.capabilities = capabilities
+        self.closed = False
+        
+    def quit(self):
+        self.closed = True
+
+def make_manager(script_time=0.0, host=None):
+    browser = FakeBrowser()
+    manager = BrowserContextManager(ADDRESS, lambda address: FakeSession(browser, script_time), host)
+    return browser, manager
+
+def test_every_context_has_own_session():
+    browser, manager = make_manager()
+    first, second = manager.new_context(), manager.new_context()
+    
+    assert first is not second
+    assert browser.sessions == [first, second]
+    assert browser.targets[first.current_window_handle] != browser.targets[second.current_window_handle]
+
+def test_contexts_do_not_share_cookies():
+    _, manager = make_manager()
+    first, second = manager.new_context(), manager.new_context()
+    
+    first.add_cookie({"name": "session", "value": "alice"})
+    second.add_cookie({"name": "session", "value": "bob"})
+    
+    assert first.get_cookies() == [{"name": "session", "value": "alice"}]
+    assert second.get_cookies() == [{"name": "session", "value": "bob"}]
+
+def test_commands_of_different_contexts_overlap():
+    _, manager = make_manager(script_time=0.3)
+    drivers = [manager.new_context() for _ in range(4)]
+    barrier = threading.Barrier(len(drivers))
+    
+    def run(driver):
+        barrier.wait()
+        driver.execute_async_script("setTimeout(arguments[0], 300)")
+        
+    threads = [threading.Thread(target=run, args=(driver,)) for driver in drivers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    # Последовательно четыре скрипта заняли бы 1.2 с
+    assert elapsed < 0.9
+    intervals = [driver.intervals[0] for driver in drivers]
+    assert max(begin for begin, _ in intervals) < min(end for _, end in intervals)
+
+def test_window_handles_are_filtered_by_context():
+    _, manager = make_manager()
+    first, second = manager.new_context(), manager.new_context()
+    
+    assert first.window_handles == [first.current_window_handle]
+    assert second.window_handles == [second.current_window_handle]
+    assert "main" not in first.window_handles
+
+def test_quit_disposes_only_own_context():
+    browser, manager = make_manager()
+    first, second = manager.new_context(), manager.new_context()
+    
+    first.quit()
+    second.add_cookie({"name": "theme", "value": "dark"})
+    
+    assert first.closed
+    assert not second.closed
+    assert len(browser.cookies) == 2
+    # Служебная вкладка сессии закрыта вместе с контекстом
+    assert sorted(set(browser.targets.values()), key=str) == [None, browser.targets[second.current_window_handle]]
+    assert len(browser.targets) == 3
+    assert second.get_cookies() == [{"name": "theme", "value": "dark"}]
+
+def test_renew_replaces_context_in_same_session():
+    browser, manager = make_manager()
+    driver = manager.new_context()
+    driver.add_cookie({"name": "session", "value": "alice"})
+    old_context = browser.targets[driver.current_window_handle]
+    
+    assert manager.renew(driver)
+    
+    assert browser.targets[driver.current_window_handle] != old_context
+    assert old_context not in browser.cookies
+    assert driver.get_cookies() == []
+    assert len(browser.sessions) == 1
+
+def test_pool_renews_context_instead_of_new_session():
+    browser, manager = make_manager()
+    pool = DriverPool(manager.new_context, max_uses=5, on_shutdown=manager.shutdown, renew=manager.renew)
+    
+    first = pool.acquire()
+    first.add_cookie({"name": "session", "value": "alice"})
+    pool.release(first)
+    second = pool.acquire()
+    
+    assert second is first
+    assert second.get_cookies() == []
+    pool.shutdown()
+    assert first.closed
+    assert list(browser.targets) == ["main"]
+
+def test_shutdown_closes_own_browser():
+    host = FakeHost({"goog:chromeOptions": {"debuggerAddress": ADDRESS}})
+    _, manager = make_manager(host=host)
+    driver = manager.new_context()
+    
+    manager.shutdown()
+    
+    assert driver.closed
+    assert host.closed
+
+@pytest.mark.parametrize("capabilities", [
+    {"goog:chromeOptions": {"debuggerAddress": ADDRESS}},
+    {"ms:edgeOptions": {"debuggerAddress": ADDRESS}},
+], ids=["chrome", "edge"])
+def test_debugger_address_of_chromium(capabilities):
+    assert BrowserContextManager.debugger_address(FakeHost(capabilities)) == ADDRESS
+
+def test_debugger_address_requires_local_chromium():
+    with pytest.raises(ValueError, match="Chromium"):
+        BrowserContextManager.debugger_address(FakeHost({"moz:firefoxOptions": {}}))
+
+# tests/test_driver_pool.py
+from urllib.parse import urlsplit
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+from utils.driver_pool import DriverPool
+
+def origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else None
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+        
+    @property
+    def alert(self):
+        raise NoAlertPresentException()
+        
+    def window(self, handle):
+        self.driver.current = handle
+        
+    def new_window(self, type_hint):
+        self.driver.opened += 1
+        handle = f"tab{self.driver.opened}"
+        self.driver.history[handle] = ["about:blank"]
+        self.driver.current = handle
+
+class FakeDriver:
+    """Браузер без CDP: вкладки с историей и sessionStorage, общие cookies и localStorage по origin."""
+    
+    def __init__(self, history=None, cookies=None, broken=False):
+        self.history = history or {"main": ["about:blank"]}
+        self.cookies = dict(cookies or {})
+        self.local_storage = {}
+        # sessionStorage принадлежит вкладке: {вкладка: {origin: данные}}
+        self.session_storage = {}
+        self.broken = broken
+        self.current = "main"
+        self.opened = 0
+        self.switch_to = FakeSwitchTo(self)
+        self.commands = []
+        self.visited = []
+        self.quits = 0
+        
+    @property
+    def window_handles(self):
+        if self.broken:
+            raise WebDriverException("session deleted")
+        return list(self.history)
+        
+    @property
+    def current_window_handle(self):
+        return self.current
+        
+    @property
+    def current_url(self):
+        return self.history[self.current][-1]
+        
+    def close(self):
+        del self.history[self.current]
+        self.session_storage.pop(self.current, None)
+        
+    def get(self, url):
+        self.visited.append(url)
+        self.history[self.current].append(url)
+        
+    def store(self, handle, url, data):
+        """Страница url во вкладке handle сохранила данные в оба хранилища и cookie."""
+        self.history[handle].append(url)
+        self.session_storage.setdefault(handle, {})[origin(url)] = data
+        self.local_storage[origin(url)] = data
+        self.cookies.setdefault(urlsplit(url).hostname, []).append(data)
+        
+    def delete_all_cookies(self):
+        self.cookies.pop(urlsplit(self.current_url).hostname, None)
+        
+    def execute_script(self, script):
+        assert script == DriverPool.CLEAR_STORAGE_SCRIPT
+        self.local_storage.pop(origin(self.current_url), None)
+        self.session_storage.get(self.current, {}).pop(origin(self.current_url), None)
+        
+    def quit(self):
+        self.quits += 1
+
+class FakeChromeDriver(FakeDriver):
+    """Драйвер Chromium: команды CDP записываются, clearDataForOrigin не трогает sessionStorage."""
+    
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        if cmd == "Page.getNavigationHistory":
+            return {"entries": [{"url": url} for url in self.history[self.current]]}
+        if cmd == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"url": self.current_url}, "childFrames": [
+                {"frame": {"url": "https://widgets.example.net/frame"}},
+            ]}}
+        if cmd == "Network.getAllCookies":
+            return {"cookies": [{"domain": domain} for domain in self.cookies]}
+        if cmd == "Storage.clearDataForOrigin":
+            self.local_storage.pop(params["origin"], None)
+        if cmd == "Network.clearBrowserCookies":
+            self.cookies.clear()
+        return {}
+        
+    def cleared_origins(self):
+        return {params["origin"] for cmd, params in self.commands if cmd == "Storage.clearDataForOrigin"}
+
+def test_reset_clears_every_visited_origin():
+    driver = FakeChromeDriver(
+        history={
+            "main": ["about:blank", "https://app.example.com/login", "https://sso.example.org/auth"],
+            "popup": ["https://pay.example.com/checkout"],
+        },
+        cookies={".tracker.example.io": ["id"]},
+    )
+    pool = DriverPool(lambda: driver)
+    
+    assert pool.reset(driver)
+    assert driver.window_handles == ["tab1"] and driver.current == "tab1"
+    assert driver.cleared_origins() == {
+        "https://app.example.com", "https://sso.example.org", "https://pay.example.com",
+        "https://widgets.example.net", "https://tracker.example.io", "http://tracker.example.io",
+    }
+    assert ("Network.clearBrowserCookies", {}) in driver.commands
+    assert driver.cookies == {}
+
+def test_reset_drops_session_storage_with_old_tab():
+    driver = FakeChromeDriver()
+    driver.store("main", "https://app.example.com/cart", "cart-1")
+    pool = DriverPool(lambda: driver)
+    
+    assert pool.reset(driver)
+    # Следующий тест на том же origin не видит ни sessionStorage, ни localStorage
+    assert driver.session_storage.get(driver.current, {}) == {}
+    assert driver.local_storage == {}
+
+def test_reset_without_cdp_clears_cookies_and_storage_per_origin():
+    driver = FakeDriver(history={"main": ["about:blank"], "popup": ["about:blank"]})
+    driver.store("main", "https://app.example.com/cart", "cart-1")
+    driver.store("popup", "https://pay.example.com/checkout", "order-1")
+    driver.local_storage["https://app.example.com"] = "from earlier page"
+    pool = DriverPool(lambda: driver, origins=["https://app.example.com/", "about:blank"])
+    
+    assert pool.reset(driver)
+    assert driver.window_handles == ["tab1"]
+    assert driver.visited == [
+        "https://app.example.com/robots.txt", "https://pay.example.com/robots.txt", "about:blank"
+    ]
+    assert driver.cookies == {} and driver.local_storage == {} and driver.session_storage == {}
+
+def test_new_tab_is_prepared_after_reset():
+    prepared = []
+    driver = FakeChromeDriver()
+    pool = DriverPool(lambda: driver, prepare_window=lambda d: prepared.append(d.current))
+    pool.reset(driver)
+    assert prepared == ["tab1"]
+
+def test_driver_is_reused_until_max_uses():
+    created = []
+    pool = DriverPool(lambda: created.append(FakeChromeDriver()) or created[-1], max_uses=2)
+    
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    
+    assert first.quits == 1
+    assert pool.acquire() is not first
+    assert len(created) == 2
+
+def test_browser_without_cdp_is_reused():
+    created = []
+    pool = DriverPool(lambda: created.append(FakeDriver()) or created[-1])
+    
+    first = pool.acquire()
+    pool.release(first)
+    
+    assert first.quits == 0
+    assert pool.acquire() is first
+
+def test_broken_session_is_discarded():
+    driver = FakeChromeDriver(broken=True)
+    pool = DriverPool(lambda: driver)
+    
+    pool.release(pool.acquire())
+    
+    assert driver.quits == 1
+    assert not pool._idle
+
+# tests/test_driver_startup.py
+import json
+import os
+import pytest
+from utils.driver_startup import DriverBinaryCache, ProfileTemplate
+
+class FakeManager:
+    """webdriver-manager без сети: «скачивает» драйвер в каталог теста."""
+    
+    directory = None
+    installs = 0
+    
+    def install(self):
+        FakeManager.installs += 1
+        path = os.path.join(self.directory, f"chromedriver-{FakeManager.installs}")
+        open(path, 'w').close()
+        return path
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(FakeManager, "directory", str(tmp_path))
+    monkeypatch.setattr(FakeManager, "installs", 0)
+    monkeypatch.setattr(DriverBinaryCache, "MANAGERS", {"chrome": FakeManager})
+    return FakeManager
+
+def test_driver_path_is_resolved_once_per_machine(tmp_path, manager):
+    cache_dir = str(tmp_path / "cache")
+    path = DriverBinaryCache(cache_dir).resolve("chrome")
+    
+    # Другой воркер читает путь из файла и в сеть не идёт
+    assert DriverBinaryCache(cache_dir).resolve("chrome") == path
+    assert manager.installs == 1
+    with open(os.path.join(cache_dir, "drivers.json"), encoding="utf-8") as f:
+        assert json.load(f)["chrome"]["path"] == path
+
+def test_missing_driver_file_is_resolved_again(tmp_path, manager):
+    cache = DriverBinaryCache(str(tmp_path / "cache"))
+    os.remove(cache.resolve("chrome"))
+    assert cache.resolve("chrome").endswith("chromedriver-2")
+
+def test_invalidate_forgets_driver(tmp_path, manager):
+    cache = DriverBinaryCache(str(tmp_path / "cache"))
+    cache.resolve("chrome")
+    cache.invalidate("chrome")
+    cache.invalidate("firefox")
+    assert cache.resolve("chrome").endswith("chromedriver-2")
+
+def test_broken_cache_file_is_ignored(tmp_path, manager):
+    cache = DriverBinaryCache(str(tmp_path / "cache"))
+    os.makedirs(tmp_path / "cache")
+    (tmp_path / "cache" / "drivers.json").write_text("{broken", encoding="utf-8")
+    assert cache.resolve("chrome").endswith("chromedriver-1")
+
+def test_unknown_browser_is_not_resolved(tmp_path, manager):
+    assert DriverBinaryCache(str(tmp_path)).resolve("safari") is None
+    assert manager.installs == 0
+
+def test_chromium_template_is_built_once(tmp_path):
+    warmed = []
+    template = ProfileTemplate("chrome", str(tmp_path), tmpfs_dir=None)
+    path = template.ensure(warmed.append)
+    
+    assert template.ensure(warmed.append) == path
+    assert len(warmed) == 1
+    assert os.path.exists(os.path.join(path, "First Run"))
+    with open(os.path.join(path, "Default", "Preferences"), encoding="utf-8") as f:
+        assert json.load(f)["translate"] == {"enabled": False}
+    # Во время сборки профиль лежит во временном каталоге рядом с шаблоном
+    assert os.path.dirname(warmed[0]) == os.path.dirname(path) and warmed[0] != path
+
+def test_template_is_rebuilt_when_preferences_change(tmp_path, monkeypatch):
+    template = ProfileTemplate("chrome", str(tmp_path), tmpfs_dir=None)
+    template.ensure()
+    warmed = []
+    monkeypatch.setattr(ProfileTemplate, "CHROMIUM_PREFERENCES", {"translate": {"enabled": True}})
+    path = template.ensure(warmed.append)
+    
+    assert len(warmed) == 1
+    with open(os.path.join(path, "Default", "Preferences"), encoding="utf-8") as f:
+        assert json.load(f) == {"translate": {"enabled": True}}
+    assert os.listdir(os.path.dirname(path)) == ["chrome"]
+
+def test_firefox_template_uses_user_js(tmp_path):
+    path = ProfileTemplate("firefox", str(tmp_path), tmpfs_dir=None).ensure()
+    with open(os.path.join(path, "user.js"), encoding="utf-8") as f:
+        assert 'user_pref("app.update.auto", false);' in f.read().splitlines()
+
+def test_copy_skips_locks_and_caches(tmp_path):
+    template = ProfileTemplate("chrome", str(tmp_path / "cache"), tmpfs_dir=str(tmp_path / "shm"))
+    source = template.ensure()
+    os.makedirs(os.path.join(source, "Default", "Cache"))
+    open(os.path.join(source, "SingletonLock"), 'w').close()
+    os.makedirs(tmp_path / "shm")
+    
+    copy = template.copy()
+    assert os.path.dirname(copy) == str(tmp_path / "shm")
+    assert os.path.exists(os.path.join(copy, "Default", "Preferences"))
+    assert not os.path.exists(os.path.join(copy, "SingletonLock"))
+    assert not os.path.exists(os.path.join(copy, "Default", "Cache"))
+    ProfileTemplate.remove(copy)
+    assert not os.path.exists(copy)
+
+def test_copy_falls_back_without_tmpfs(tmp_path):
+    template = ProfileTemplate("chrome", str(tmp_path), tmpfs_dir=str(tmp_path / "missing"))
+    template.ensure()
+    copy = template.copy()
+    try:
+        assert os.path.exists(os.path.join(copy, "First Run"))
+        assert not os.path.exists(tmp_path / "missing")
+    finally:
+        ProfileTemplate.remove(copy)
+
+# tests/test_form_matrix.py
+import os
+import pytest
+from utils.form_matrix import FormCase, load_cases
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_yaml_cases_extend_defaults(tmp_path):
+    path = write(tmp_path, "cases.yaml", """
+defaults:
+  email: user@example.com
+  password: Secret123
+  terms: true
+cases:
+  - id: short-password
+    values: {password: "1"}
+    errors: {password: короткий}
+  - id: valid
+  - values: {age: 18}
+    errors: {age: 18}
+""")
+    short, valid, third = load_cases(path)
+    
+    assert short.case_id == "short-password"
+    assert short.values == {"email": "user@example.com", "password": "1", "terms": True}
+    assert short.errors == {"password": "короткий"}
+    assert (valid.values["password"], valid.errors) == ("Secret123", {})
+    # Без id случай нумеруется, ожидаемый текст ошибки всегда строка
+    assert (third.case_id, third.values["age"], third.errors) == ("case_3", 18, {"age": "18"})
+
+def test_yaml_list_without_defaults(tmp_path):
+    path = write(tmp_path, "cases.yml", "- id: empty\n  errors: {email: обязательно}\n")
+    (case,) = load_cases(path)
+    assert (case.case_id, case.values, case.errors) == ("empty", {}, {"email": "обязательно"})
+
+def test_csv_cases_split_values_and_errors(tmp_path):
+    path = write(tmp_path, "cases.csv", (
+        "id,email,terms,error.email,error.terms\n"
+        "bad-email,nope,true,Неверный адрес,\n"
+        ",user@example.com,FALSE,,Примите условия\n"
+    ))
+    bad, unnamed = load_cases(path)
+    
+    assert bad.values == {"email": "nope", "terms": True}
+    assert bad.errors == {"email": "Неверный адрес"}
+    assert unnamed.case_id == "case_2"
+    assert unnamed.values == {"email": "user@example.com", "terms": False}
+    assert unnamed.errors == {"terms": "Примите условия"}
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Неподдерживаемый формат"):
+        load_cases(write(tmp_path, "cases.json", "[]"))
+
+def test_repository_cases_have_unique_ids():
+    cases = load_cases(os.path.join(DATA_DIR, "registration_cases.yaml"))
+    ids = [case.case_id for case in cases]
+    assert cases and len(ids) == len(set(ids))
+
+@pytest.mark.parametrize("errors, actual, submitted, expected", [
+    ({}, {}, True, []),
+    ({}, {}, False, ["форма не отправлена"]),
+    ({"email": "неверный"}, {"email": "Неверный адрес"}, False, []),
+    ({"email": "неверный"}, {"email": "Неверный адрес"}, True, ["форма отправлена, хотя ожидались ошибки"]),
+    ({"email": "неверный"}, {"email": ""}, False, ["email: ожидалась ошибка 'неверный', получено ''"]),
+    ({"email": "неверный"}, {"email": "Неверный адрес", "age": "Слишком мал"}, False,
+     ["age: неожиданная ошибка 'Слишком мал'"]),
+    ({}, {"age": ""}, True, []),
+], ids=["valid", "not-submitted", "expected-error", "submitted-with-errors", "missing-error",
+        "unexpected-error", "empty-error-ignored"])
+def test_mismatches(errors, actual, submitted, expected):
+    assert FormCase("case", {}, errors).mismatches(actual, submitted) == expected
+
+# tests/test_grid.py
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from selenium.common.exceptions import WebDriverException
+from utils import grid
+from utils.grid import GridClient, GridEndpoint
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Ответ /status узла: слоты Selenium Grid 4 или только готовность chromedriver."""
+    
+    def do_GET(self):
+        self.server.requests += 1
+        data = json.dumps({"value": self.server.status}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        
+    def log_message(self, format, *args):
+        pass
+
+class FakeRemote:
+    """webdriver.Remote без браузера; узлы из failing отказывают в создании сессии."""
+    
+    failing = set()
+    created = []
+    
+    def __init__(self, command_executor, options):
+        if command_executor in self.failing:
+            raise WebDriverException(f"session not created on {command_executor}")
+        self.command_executor = command_executor
+        self.created.append(command_executor)
+        
+    def quit(self):
+        pass
+
+@pytest.fixture
+def start_node():
+    """Запускать узлы со своим /status; все останавливаются после теста."""
+    servers = []
+    
+    def start(status):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+        server.status = status
+        server.requests = 0
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server, "http://127.0.0.1:{}".format(server.server_address[1])
+        
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def dead_url():
+    """Адрес, на котором никто не слушает."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+@pytest.fixture(autouse=True)
+def fake_remote(monkeypatch):
+    monkeypatch.setattr(grid.webdriver, "Remote", FakeRemote)
+    monkeypatch.setattr(FakeRemote, "failing", set())
+    monkeypatch.setattr(FakeRemote, "created", [])
+
+def grid_status(busy, total):
+    slots = [{"session": {"id": str(i)} if i < busy else None} for i in range(total)]
+    return {"ready": busy < total, "nodes": [{"availability": "UP", "slots": slots}]}
+
+def test_session_goes_to_least_loaded_endpoint(start_node):
+    _, busy_url = start_node(grid_status(3, 4))
+    _, idle_url = start_node(grid_status(1, 4))
+    client = GridClient([GridEndpoint(busy_url, 8), GridEndpoint(idle_url, 8)])
+    
+    endpoint = client.acquire()
+    assert endpoint.url == idle_url
+    # Число слотов берётся из /status узла
+    assert (endpoint.max_sessions, endpoint.reported_busy, endpoint.active) == (4, 1, 1)
+    client.release(endpoint)
+    assert endpoint.active == 0
+
+def test_unreachable_endpoint_is_skipped(start_node, dead_url):
+    _, url = start_node({"ready": True})
+    client = GridClient([GridEndpoint(dead_url, 4), GridEndpoint(url, 1)])
+    
+    assert client.acquire().url == url
+    assert client.endpoints[0].down and not client.endpoints[1].down
+
+def test_all_endpoints_down_fails_without_queueing(dead_url):
+    client = GridClient([GridEndpoint(dead_url, 4), GridEndpoint(dead_url + "/wd/hub", 4)], queue_timeout=300)
+    start = time.monotonic()
+    with pytest.raises(WebDriverException, match="Все узлы грида недоступны"):
+        client.acquire()
+    assert time.monotonic() - start < 5
+
+def test_full_endpoint_queues_until_slot_is_released(start_node):
+    _, url = start_node({"ready": True})
+    client = GridClient([GridEndpoint(url, 1)], queue_timeout=10)
+    first = client.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(client.acquire()))
+    waiter.start()
+    time.sleep(0.2)
+    assert acquired == []
+    
+    client.release(first)
+    waiter.join(5)
+    assert acquired == [first] and first.active == 1
+    assert client.stats()["queue"]["max"] >= 0.2
+
+def test_full_endpoint_times_out_in_queue(start_node):
+    _, url = start_node(grid_status(2, 2))
+    client = GridClient([GridEndpoint(url, 2)], queue_timeout=0.3)
+    with pytest.raises(WebDriverException, match="Нет свободных слотов"):
+        client.acquire()
+
+def test_status_is_cached_for_ttl(start_node):
+    server, url = start_node({"ready": True})
+    client = GridClient([GridEndpoint(url, 4)])
+    for _ in range(3):
+        client.release(client.acquire())
+    assert server.requests == 1
+
+def test_failed_session_is_retried_on_other_endpoint(start_node):
+    _, bad_url = start_node(grid_status(0, 4))
+    _, good_url = start_node(grid_status(1, 4))
+    FakeRemote.failing.add(bad_url)
+    client = GridClient([GridEndpoint(bad_url, 4), GridEndpoint(good_url, 4)], retry_delay=0)
+    
+    driver = client.create_session(options=None)
+    bad, good = client.endpoints
+    assert driver.grid_endpoint == good_url and FakeRemote.created == [good_url]
+    assert (bad.failures, bad.active, good.active) == (1, 0, 1)
+    driver.quit()
+    driver.quit()
+    assert good.active == 0 and good.sessions == 1
+
+def test_session_error_is_raised_after_retries(start_node):
+    _, url = start_node({"ready": True})
+    FakeRemote.failing.add(url)
+    client = GridClient([GridEndpoint(url, 2)], retries=2, retry_delay=0)
+    with pytest.raises(WebDriverException, match="session not created"):
+        client.create_session(options=None)
+    assert client.endpoints[0].failures == 2 and client.endpoints[0].active == 0
+
+def test_zero_retries_still_make_one_attempt(start_node):
+    _, url = start_node(grid_status(0, 2))
+    client = GridClient([GridEndpoint(url, 2)], retries=0, retry_delay=0)
+    
+    driver = client.create_session(options=None)
+    assert driver.grid_endpoint == url
+    driver.quit()
+    
+    FakeRemote.failing.add(url)
+    with pytest.raises(WebDriverException, match="session not created"):
+        client.create_session(options=None)
+    assert client.endpoints[0].failures == 1
+
+# tests/test_locator_analyzer.py
+import pytest
+from selenium.webdriver.common.by import By
+from utils.locator_analyzer import (
+    LocatorAnalyzer, collect_locators, compare_baseline, is_locator, main, scan_sources, static_issues, to_w3c
+)
+
+class FakeDriver:
+    """Драйвер, возвращающий готовые замеры скрипта."""
+    
+    def __init__(self, measured):
+        self.measured = measured
+        self.visited = []
+        self.arguments = None
+        
+    def get(self, url):
+        self.visited.append(url)
+        
+    def execute_script(self, script, *arguments):
+        self.arguments = arguments
+        return self.measured
+
+def test_is_locator():
+    assert is_locator((By.ID, "username"))
+    assert not is_locator(("id", 5))
+    assert not is_locator(("by id", "username"))
+    assert not is_locator([By.ID, "username"])
+
+@pytest.mark.parametrize("locator, expected", [
+    ((By.ID, "login"), ("css selector", '[id="login"]')),
+    ((By.CLASS_NAME, "error"), ("css selector", ".error")),
+    ((By.NAME, "email"), ("css selector", '[name="email"]')),
+    ((By.XPATH, "//a"), ("xpath", "//a")),
+], ids=["id", "class", "name", "xpath"])
+def test_to_w3c(locator, expected):
+    assert to_w3c(locator) == expected
+
+@pytest.mark.parametrize("locator, issues", [
+    ((By.XPATH, "//div[@class='x']"), ["unscoped: XPath просматривает весь документ"]),
+    ((By.XPATH, "//*[@id='form']//input"), []),
+    ((By.XPATH, "./span"), []),
+    ((By.CLASS_NAME, "error"), ["unscoped: поиск по class name во всём документе"]),
+    ((By.TAG_NAME, "input"), ["unscoped: поиск по tag name во всём документе"]),
+    ((By.ID, "login"), []),
+    ((By.CSS_SELECTOR, "#form input"), []),
+], ids=["xpath-document", "xpath-id", "xpath-relative", "class", "tag", "id", "css"])
+def test_static_issues(locator, issues):
+    assert static_issues(locator) == issues
+
+def analyze(measured, slow_ms=0.1):
+    locators = {locator: [f"Page.{locator[1]}"] for locator, _ in measured}
+    driver = FakeDriver([data for _, data in measured])
+    return LocatorAnalyzer(locators, slow_ms=slow_ms, rounds=3, repeat=10).analyze(driver, "http://app/"), driver
+
+def test_analyze_sends_w3c_locators_and_settings():
+    results, driver = analyze([((By.ID, "login"), {"count": 1, "ms": 0.001})])
+    assert driver.visited == ["http://app/"]
+    assert driver.arguments == ([["css selector", '[id="login"]']], 3, 10)
+    assert results[0]["names"] == ["Page.login"] and results[0]["issues"] == []
+
+def test_fast_unique_locator_has_no_issues_or_suggestion():
+    (result,), _ = analyze([((By.ID, "login"), {"count": 1, "ms": 0.01, "suggestion": "#login",
+                                                 "suggestion_count": 1, "suggestion_ms": 0.01})])
+    assert result["issues"] == [] and "suggestion" not in result
+
+def test_slow_and_ambiguous_locator_gets_unique_suggestion():
+    (result,), _ = analyze([((By.XPATH, "//button"), {"count": 3, "ms": 0.25, "suggestion": "#form button",
+                                                       "suggestion_count": 1, "suggestion_ms": 0.02})])
+    assert result["issues"] == [
+        "unscoped: XPath просматривает весь документ", "slow: 250.0 мкс на поиск", "ambiguous: совпадений 3"
+    ]
+    assert result["suggestion"] == "#form button"
+
+def test_suggestion_is_dropped_when_not_unique():
+    (result,), _ = analyze([((By.CLASS_NAME, "row"), {"count": 2, "ms": 0.01, "suggestion": "div.row",
+                                                       "suggestion_count": 2, "suggestion_ms": 0.01})])
+    assert result["issues"] == ["unscoped: поиск по class name во всём документе", "ambiguous: совпадений 2"]
+    assert "suggestion" not in result
+
+def test_missing_and_invalid_locators():
+    (missing, invalid), _ = analyze([
+        ((By.ID, "absent"), {"count": 0, "ms": 0.5}),
+        ((By.XPATH, "//["), {"error": "SyntaxError: bad xpath"}),
+    ])
+    # Отсутствующий элемент не медленный: поиск по пустому результату не показателен
+    assert missing["issues"] == []
+    assert invalid["issues"] == ["unscoped: XPath просматривает весь документ", "error: SyntaxError: bad xpath"]
+
+def test_compare_baseline_reports_only_real_slowdowns():
+    report = {"pages": {"login.html": [
+        {"by": "id", "value": "a", "names": ["A"], "count": 1, "ms": 0.10},
+        {"by": "id", "value": "b", "names": ["B"], "count": 1, "ms": 0.012},
+        {"by": "id", "value": "c", "names": ["C"], "count": 1, "ms": 0.05},
+        {"by": "id", "value": "d", "names": ["D"], "count": 0, "ms": 0.5},
+        {"by": "id", "value": "e", "names": ["E"], "count": 1, "ms": 0.5},
+    ]}}
+    baseline = {"pages": {"login.html": {"id=a": 0.02, "id=b": 0.004, "id=c": 0.04, "id=d": 0.01}}}
+    regressions = compare_baseline(report, baseline, max_slowdown=1.5, min_delta_ms=0.02)
+    # b замедлился в 3 раза, но меньше чем на min_delta_ms; c - меньше чем в 1.5 раза; e нет в эталоне
+    assert [(url, result["value"], before) for url, result, before in regressions] == [("login.html", "a", 0.02)]
+
+def test_scan_sources_finds_inline_locators(tmp_path):
+    source = tmp_path / "test_inline.py"
+    source.write_text(
+        "from selenium.webdriver.common.by import By\n"
+        "def test_x(driver):\n"
+        "    driver.find_element(By.ID, 'submit')\n"
+        "    locator = (By.XPATH, '//div')\n"
+        "    driver.find_element('id', 'ignored')\n"
+        "    other = (By.UNKNOWN, 'x')\n",
+        encoding="utf-8",
+    )
+    locators = scan_sources([str(source)], {(By.ID, "submit"): ["LoginPage.SUBMIT"]})
+    assert locators == {
+        (By.ID, "submit"): ["LoginPage.SUBMIT", "test_inline.py:3"],
+        (By.XPATH, "//div"): ["test_inline.py:4"],
+    }
+
+def test_collect_locators_from_pages():
+    locators = collect_locators()
+    assert "LoginPage.USERNAME_INPUT" in locators[(By.ID, "username")]
+    assert all(is_locator(locator) for locator in locators)
+
+def test_static_mode_prints_issues(capsys):
+    assert main(["--static"]) == 0
+    printed = capsys.readouterr().out
+    assert "LoginPage.ERROR_MESSAGE" in printed
+    assert "class name=error-message: unscoped" in printed
+
+# tests/test_login.py
+import unittest
+from base.base_test import BaseTest
+from pages.login_page import LoginPage
+from pages.home_page import HomePage
+from utils.logger import Logger
+import os
+
+class LoginTest(BaseTest):
+    """Тесты для проверки функциональности логина."""
+    
+    def setUp(self):
+        """Подготовка к тесту."""
+        super().setUp()
+        
+        # Настройка логирования
+        log_file = os.path.join(self.config.logs_dir, f"login_test_{self._testMethodName}.log")
+        self.logger = Logger.setup_logger(
+            self.config.log_level, log_file, json_format=self.config.log_format == "json"
+        )
+        
+        # Инициализация страниц
+        self.login_page = LoginPage(self.driver, self.config.element_cache)
+        self.home_page = HomePage(self.driver, self.config.element_cache)
+        
+    def test_successful_login(self):
+        """Тест успешного входа в систему."""
+        self.logger.info("Начало теста успешного входа")
+        
+        # Открыть страницу логина
+        self.login_page.open_login_page(f"{self.config.base_url}/login")
+        
+        # Войти в систему
+        self.login_page.login("testuser", "password123")
+        
+        # Проверить, что вход выполнен успешно
+        self.assertTrue(
+            self.home_page.is_user_logged_in(),
+            "Пользователь не вошел в систему после ввода корректных данных"
+        )
+        
+        # Проверить приветственное сообщение
+        welcome_message = self.home_page.get_welcome_message()
+        self.assertIn(
+            "testuser", 
+            welcome_message, 
+            f"Приветственное сообщение не содержит имя пользователя. Текст: {welcome_message}"
+        )
+        
+        self.logger.info("Тест успешного входа завершен")
+        
+    def test_failed_login(self):
+        """Тест неудачного входа в систему."""
+        self.logger.info("Начало теста неудачного входа")
+        
+        # Открыть страницу логина
+        self.login_page.open_login_page(f"{self.config.base_url}/login")
+        
+        # Войти с неверными учетными данными
+        self.login_page.login("wronguser", "wrongpassword")
+        
+        # Проверить, что вход не выполнен
+        self.assertFalse(
+            self.login_page.is_login_successful(),
+            "Система позволила войти с неверными данными"
+        )
+        
+        # Проверить сообщение об ошибке
+        error_message = self.login_page.get_error_message()
+        self.assertIn(
+            "неверный", 
+            error_message.lower(), 
+            f"Неожиданное сообщение об ошибке: {error_message}"
+        )
+        
+        self.logger.info("Тест неудачного входа завершен")
+
+# tests/test_login_async.py
+import asyncio
+from pages.async_login_page import AsyncLoginPage
+from pages.async_home_page import AsyncHomePage
+
+# Сколько сессий одновременно ведёт один поток в тесте параллельного входа
+CONCURRENT_SESSIONS = 10
+
+async def test_successful_login_async(async_driver, config):
+    """Тест успешного входа в систему через асинхронные страницы."""
+    login_page = AsyncLoginPage(async_driver)
+    home_page = AsyncHomePage(async_driver)
+    
+    await login_page.open_login_page(f"{config.base_url}/login")
+    await login_page.login("testuser", "password123")
+    
+    assert await home_page.is_user_logged_in(), "Пользователь не вошел в систему после ввода корректных данных"
+    welcome_message = await home_page.get_welcome_message()
+    assert "testuser" in welcome_message, f"Приветственное сообщение не содержит имя пользователя. Текст: {welcome_message}"
+
+async def test_concurrent_logins(async_driver_factory, config):
+    """Тест входа и неудачного входа во многих сессиях одновременно."""
+    async def login(driver, username, password):
+        login_page = AsyncLoginPage(driver)
+        await login_page.open_login_page(f"{config.base_url}/login")
+        await login_page.login(username, password)
+        return await login_page.wait_for_login_result()
+        
+    credentials = [
+        ("testuser", "password123") if i % 2 == 0 else ("wronguser", "wrongpassword")
+        for i in range(CONCURRENT_SESSIONS)
+    ]
+    async with async_driver_factory.sessions(CONCURRENT_SESSIONS) as drivers:
+        results = await asyncio.gather(*(
+            login(driver, username, password) for driver, (username, password) in zip(drivers, credentials)
+        ))
+        
+    expected = ["success" if i % 2 == 0 else "error" for i in range(CONCURRENT_SESSIONS)]
+    assert results == expected, f"Неожиданные результаты входа: {results}"
+
+# tests/test_login_page.py
+import pytest
+from base import wait_engine
+from base.base_page import BasePage
+from base.wait_engine import WaitEngine
 from pages.home_page import HomePage
+from pages.login_page import LoginPage
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+        
+    def is_displayed(self):
+        return self.displayed
+
+class FakeDriver:
+    """Драйвер, у которого элементы появляются после заданного числа опросов."""
+    
+    def __init__(self, appear_after=None):
+        self.appear_after = appear_after or {}
+        self.polls = {}
+        
+    def find_elements(self, by, value):
+        locator = (by, value)
+        self.polls[locator] = self.polls.get(locator, 0) + 1
+        element = self.appear_after.get(locator)
+        if element is None or self.polls[locator] < element[0]:
+            return []
+        return [element[1]]
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Виртуальное время: ожидание по таймауту не задерживает тест."""
+    state = {"now": 0.0}
+    
+    def sleep(seconds):
+        state["now"] += seconds
+        
+    monkeypatch.setattr(wait_engine.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(wait_engine.time, "sleep", sleep)
+    monkeypatch.setattr(WaitEngine, "strategy", WaitEngine.POLL)
+    return state
+
+def test_wait_for_any_returns_first_outcome():
+    driver = FakeDriver({
+        LoginPage.ERROR_MESSAGE: (2, FakeElement()),
+        LoginPage.LOGGED_IN_MARKER: (5, FakeElement()),
+    })
+    outcomes = {"success": LoginPage.LOGGED_IN_MARKER, "error": LoginPage.ERROR_MESSAGE}
+    
+    assert BasePage(driver).wait_for_any(outcomes, timeout=5) == "error"
+
+def test_wait_for_any_ignores_hidden_elements(clock):
+    driver = FakeDriver({LoginPage.ERROR_MESSAGE: (1, FakeElement(displayed=False))})
+    
+    assert BasePage(driver).wait_for_any({"error": LoginPage.ERROR_MESSAGE}, timeout=3) is None
+    assert BasePage(driver).wait_for_any({"error": LoginPage.ERROR_MESSAGE}, timeout=3, visible=False) == "error"
+
+def test_wait_for_any_times_out(clock):
+    assert BasePage(FakeDriver()).wait_for_any({"error": LoginPage.ERROR_MESSAGE}, timeout=3) is None
+    assert clock["now"] == pytest.approx(3)
+
+@pytest.mark.parametrize("locator, expected", [
+    (LoginPage.LOGGED_IN_MARKER, True),
+    (LoginPage.ERROR_MESSAGE, False),
+    (None, False),
+], ids=["success", "error", "timeout"])
+def test_login_result(locator, expected):
+    driver = FakeDriver({locator: (1, FakeElement())} if locator else {})
+    
+    assert LoginPage(driver).is_login_successful() is expected
+    assert HomePage(driver).is_user_logged_in() is expected
+
+def test_login_error_ends_wait_without_timeout(clock):
+    driver = FakeDriver({LoginPage.ERROR_MESSAGE: (1, FakeElement())})
+    
+    assert not HomePage(driver).is_user_logged_in()
+    assert clock["now"] < 1
+
+# tests/test_logger.py
+import json
+import logging
+import pytest
 from utils.logger import Logger
+
+@pytest.fixture
+def configured_logger():
+    """Свежая настройка логирования; после теста поток записи останавливается."""
+    Logger.shutdown()
+    Logger.setup_logger("INFO")
+    yield logging.getLogger("tests.logger")
+    Logger.shutdown()
+
+def read(path):
+    Logger.shutdown()
+    return path.read_text(encoding="utf-8")
+
+def test_arguments_are_formatted_before_they_change(configured_logger, tmp_path):
+    log_file = tmp_path / "test.log"
+    steps = ["open"]
+    with Logger.test_log(str(log_file)):
+        for _ in range(200):
+            configured_logger.info("Шаги: %s", steps)
+            steps.append("click")
+            
+    lines = read(log_file).splitlines()
+    assert len(lines) == 200
+    assert all(line.endswith(f"Шаги: {['open'] + ['click'] * i}") for i, line in enumerate(lines))
+
+def test_exception_text_reaches_test_log(configured_logger, tmp_path):
+    log_file = tmp_path / "test.log"
+    with Logger.test_log(str(log_file)):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            configured_logger.exception("Ошибка шага")
+            
+    content = read(log_file)
+    assert "Ошибка шага" in content
+    assert "ZeroDivisionError" in content
+
+def test_records_are_routed_to_own_test_log(configured_logger, tmp_path):
+    first, second = tmp_path / "first.log", tmp_path / "second.log"
+    with Logger.test_log(str(first)):
+        configured_logger.info("первый тест")
+    with Logger.test_log(str(second)):
+        configured_logger.info("второй тест")
+    configured_logger.info("вне теста")
+    
+    Logger.shutdown()
+    assert "первый тест" in first.read_text(encoding="utf-8")
+    assert "второй тест" not in first.read_text(encoding="utf-8")
+    assert "второй тест" in second.read_text(encoding="utf-8")
+
+def test_json_format_keeps_exception(tmp_path):
+    Logger.shutdown()
+    Logger.setup_logger("INFO", json_format=True)
+    log_file = tmp_path / "test.jsonl"
+    with Logger.test_log(str(log_file)):
+        try:
+            raise ValueError("плохое значение")
+        except ValueError:
+            logging.getLogger("tests.logger").exception("Ошибка")
+            
+    entry = json.loads(read(log_file))
+    assert entry["level"] == "ERROR"
+    assert "ValueError: плохое значение" in entry["message"]
+
+# tests/test_parallel_runner.py
+import os
+from types import SimpleNamespace
+import pytest
+from utils.parallel_runner import CollectionError, collect_node_ids, run_parallel, start_shared_browsers
+from utils.scheduler import DurationHistory, durations_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def suite_dir(tmp_path, monkeypatch):
+    """Каталог с отдельным набором тестов; плагин сбора импортируется из фреймворка."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    (tmp_path / "test_sample.py").write_text(
+        "import pytest\n"
+        "@pytest.mark.parametrize('name', ['empty name', 'ok'])\n"
+        "def test_form(name):\n"
+        "    pass\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+@pytest.mark.parametrize("verbosity", [[], ["-q"], ["-qq"], ["-v"]])
+def test_collect_node_ids_ignores_verbosity(suite_dir, verbosity):
+    assert collect_node_ids(["-p", "no:cacheprovider", *verbosity]) == [
+        "test_sample.py::test_form[empty name]",
+        "test_sample.py::test_form[ok]",
+    ]
+
+def test_collect_node_ids_fails_on_collection_error(suite_dir):
+    (suite_dir / "test_broken.py").write_text("import missing_module\n", encoding="utf-8")
+    with pytest.raises(CollectionError, match="missing_module"):
+        collect_node_ids(["-p", "no:cacheprovider"])
+
+class FakeHost:
+    """Браузер, запущенный для воркеров."""
+    
+    def __init__(self, port):
+        self.capabilities = {"goog:chromeOptions": {"debuggerAddress": f"127.0.0.1:{port}"}}
+
+class FakeFactory:
+    def __init__(self):
+        self.ports = iter(range(9222, 9300))
+        
+    def get_configured_driver(self, config):
+        return FakeHost(next(self.ports))
+
+@pytest.mark.parametrize("contexts, workers, expected", [
+    (1, 4, []),
+    (4, 4, ["127.0.0.1:9222"] * 4),
+    (2, 5, ["127.0.0.1:9222"] * 2 + ["127.0.0.1:9223"] * 2 + ["127.0.0.1:9224"]),
+])
+def test_workers_share_browsers(contexts, workers, expected):
+    config = SimpleNamespace(browser_contexts=contexts)
+    hosts, addresses = start_shared_browsers(config, workers, FakeFactory())
+    
+    assert addresses == expected
+    assert len(hosts) == len(set(expected))
+
+# Заглушка "python -m pytest": сбор отдаёт три теста, воркер пишет их замеры
+# в файл, который выбрал бы conftest для своего шарда и воркера
+STUB_PYTEST = """
+import os
+import sys
+from utils.parallel_runner import shard_option
+from utils.scheduler import DurationHistory, durations_path
+
+args = sys.argv[1:]
+if "--collect-only" in args:
+    with open(os.environ["PARALLEL_RUNNER_COLLECT_OUTPUT"], "w", encoding="utf-8") as f:
+        f.write("test_a.py::test_one\\ntest_a.py::test_two\\ntest_b.py::test_three")
+    sys.exit(0)
+shard = shard_option(args)
+with open(args[args.index("--worker-tests") + 1], encoding="utf-8") as f:
+    tests = f.read().splitlines()
+history = DurationHistory(durations_path(".test_durations.json", shard, os.environ["TEST_WORKER_ID"]))
+history.merge({node_id: 1.5 for node_id in tests})
+history.save()
+"""
+
+@pytest.fixture
+def stub_pytest(tmp_path, monkeypatch):
+    """Каталог, где "python -m pytest" запускает заглушку вместо pytest."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    monkeypatch.delenv("TEST_WORKER_ID", raising=False)
+    (tmp_path / "pytest.py").write_text(STUB_PYTEST, encoding="utf-8")
+    return tmp_path
+
+@pytest.mark.parametrize("shard_args, output", [
+    ([], ".test_durations.json"),
+    (["--shard", "2/3"], ".test_durations.json.shard2of3"),
+    (["--shard=2/3"], ".test_durations.json.shard2of3"),
+], ids=["no-shard", "shard", "shard-equals"])
+def test_run_parallel_merges_worker_durations(stub_pytest, shard_args, output):
+    assert run_parallel(2, shard_args) == 0
+    
+    assert DurationHistory.read(str(stub_pytest / output)) == {
+        "test_a.py::test_one": 1.5, "test_a.py::test_two": 1.5, "test_b.py::test_three": 1.5,
+    }
+    # Файлы воркеров объединены и удалены, общая история шардом не тронута
+    assert not list(stub_pytest.glob(".test_durations.json*.gw*"))
+    if shard_args:
+        assert not (stub_pytest / ".test_durations.json").exists()
+
+@pytest.mark.parametrize("shard, worker_id, expected", [
+    (None, None, ".test_durations.json"),
+    (None, "gw1", ".test_durations.json.gw1"),
+    ("1/3", None, ".test_durations.json.shard1of3"),
+    ("1/3", "gw1", ".test_durations.json.shard1of3.gw1"),
+])
+def test_durations_path(shard, worker_id, expected):
+    assert durations_path(".test_durations.json", shard, worker_id) == expected
+
+# tests/test_registration_matrix.py
+import os
+import pytest
+from pages.registration_page import RegistrationPage
+from utils.form_matrix import load_cases
+
+CASES = load_cases(os.path.join(os.path.dirname(__file__), "data", "registration_cases.yaml"))
+
+@pytest.fixture(scope="module")
+def registration_page(module_driver, config):
+    """Страница регистрации, открытая один раз на все случаи таблицы."""
+    page = RegistrationPage(module_driver, config.element_cache)
+    page.open_registration_page(f"{config.base_url}/register")
+    return page
+
+@pytest.mark.parametrize("case", CASES, ids=[case.case_id for case in CASES])
+def test_registration_validation(registration_page, case):
+    """Проверка валидации формы регистрации по таблице случаев."""
+    submitted, errors = registration_page.check_case(case)
+    problems = case.mismatches(errors, submitted)
+    assert not problems, f"Случай {case.case_id}: " + "; ".join(problems)
+
+# tests/test_registration_page.py
+import pytest
+from base.wait_engine import WaitEngine
+from pages.registration_page import RegistrationPage
+from utils.form_matrix import FormCase
+
+VALID = {
+    "name": "Иван Иванов", "email": "ivan@example.com",
+    "password": "Password123!", "confirm_password": "Password123!", "terms": True,
+}
+
+class FakeElement:
+    def __init__(self, form, locator):
+        self.form = form
+        self.locator = locator
+        
+    def is_displayed(self):
+        return self.locator in self.form.visible
+        
+    def click(self):
+        if self.locator == RegistrationPage.SUBMIT_BUTTON:
+            self.form.submit()
+
+class FakeForm:
+    """Драйвер со страницей регистрации: скрипты страницы разбираются по тексту.
+    
+    Сообщения страницы, как и в браузере, остаются на ней до следующей
+    отправки формы или до сброса.
+    """
+    
+    def __init__(self):
+        self.values = {}
+        self.texts = {}
+        self.visible = set()
+        
+    def submit(self):
+        if not self.values.get("email"):
+            self.show(RegistrationPage.ERRORS["email"], "Email - обязательное поле")
+        else:
+            self.show(RegistrationPage.SUCCESS_MESSAGE, "Регистрация прошла успешно")
+            
+    def show(self, locator, text):
+        self.texts[locator] = text
+        self.visible.add(locator)
+        
+    def find_elements(self, by, value):
+        return [FakeElement(self, (by, value))]
+        
+    def execute_script(self, script, *args):
+        if script == RegistrationPage.RESET_FORM_SCRIPT:
+            self.values = {}
+            for by, value in args[1]:
+                self.texts[(by, value)] = ""
+            for by, value in args[2]:
+                self.texts[(by, value)] = ""
+                self.visible.discard((by, value))
+            return True
+        if script == RegistrationPage.FILL_FORM_SCRIPT:
+            fields = {locator: name for name, locator in RegistrationPage.FIELDS.items()}
+            for by, value, text in args[0]:
+                self.values[fields[(by, value)]] = text
+            return ["ok"] * len(args[0])
+        if script == RegistrationPage.READ_MANY_SCRIPT:
+            # innerText скрытого элемента пуст
+            return [self.texts.get((by, value)) if (by, value) in self.visible else ""
+                    for by, value in args[0]]
+        raise AssertionError("Неожиданный скрипт")
+
+@pytest.fixture(autouse=True)
+def poll_waits(monkeypatch):
+    """Ожидания без браузера - опросом find_elements."""
+    monkeypatch.setattr(WaitEngine, "strategy", WaitEngine.POLL)
+
+def test_invalid_case_after_valid_is_not_submitted():
+    page = RegistrationPage(FakeForm())
+    valid = FormCase("valid", VALID, {})
+    invalid = FormCase("empty_email", dict(VALID, email=""), {"email": "обязательное поле"})
+    
+    submitted, _ = page.check_case(valid, timeout=0.2)
+    assert submitted
+    
+    submitted, errors = page.check_case(invalid, timeout=0.2)
+    assert not submitted
+    assert invalid.mismatches(errors, submitted) == []
+
+def test_reset_hides_result_messages():
+    form = FakeForm()
+    form.show(RegistrationPage.SUCCESS_MESSAGE, "Регистрация прошла успешно")
+    form.show(RegistrationPage.ERROR_MESSAGE, "Сервер недоступен")
+    
+    RegistrationPage(form).reset_form()
+    
+    assert not form.visible
+    assert form.texts[RegistrationPage.SUCCESS_MESSAGE] == ""
+    assert form.texts[RegistrationPage.ERROR_MESSAGE] == ""
+
+def test_hidden_condition_waits_for_message_to_disappear():
+    form = FakeForm()
+    form.show(RegistrationPage.SUCCESS_MESSAGE, "Регистрация прошла успешно")
+    engine = WaitEngine(form)
+    
+    assert not engine.until_hidden(RegistrationPage.SUCCESS_MESSAGE, timeout=0.1)
+    form.visible.clear()
+    assert engine.until_hidden(RegistrationPage.SUCCESS_MESSAGE, timeout=0.1)
+
+# tests/test_result_cache.py
+import hashlib
+import importlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from config.config import Config
+from utils.result_cache import ResultCache
+
+CONTEXT = {"build": "b1", "environment": "dev", "browser": "chrome"}
+
+class FakeItem:
+    """Тест pytest: функция модуля проекта, конфигурация с корнем и плагинами."""
+    
+    def __init__(self, module, name, root, plugins=(), params=None):
+        self.nodeid = f"{module.__name__}.py::{name}"
+        self.module = module
+        self.function = getattr(module, name)
+        self.cls = None
+        self.config = SimpleNamespace(rootpath=root, pluginmanager=SimpleNamespace(get_plugins=lambda: list(plugins)))
+        if params is not None:
+            self.callspec = SimpleNamespace(params=params)
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Каталог проекта со страницей и тестовым модулем, который её импортирует."""
+    (tmp_path / "rc_page.py").write_text("def open_page():\n    return 'login'\n", encoding="utf-8")
+    (tmp_path / "rc_tests.py").write_text(
+        "import rc_page\n\n"
+        "def test_login():\n    assert rc_page.open_page() == 'login'\n\n"
+        "def test_logout():\n    assert rc_page.open_page()\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path, importlib.import_module("rc_tests")
+    for name in ("rc_page", "rc_tests"):
+        sys.modules.pop(name, None)
+
+def test_key_is_stable(project, tmp_path):
+    root, module = project
+    item = FakeItem(module, "test_login", root)
+    first = ResultCache(str(tmp_path / "results.json")).key(item, CONTEXT)
+    assert ResultCache(str(tmp_path / "results.json")).key(item, dict(CONTEXT)) == first
+
+def test_key_depends_on_test_source_and_context(project, tmp_path):
+    root, module = project
+    cache = ResultCache(str(tmp_path / "results.json"))
+    login = cache.key(FakeItem(module, "test_login", root), CONTEXT)
+    
+    assert cache.key(FakeItem(module, "test_logout", root), CONTEXT) != login
+    assert cache.key(FakeItem(module, "test_login", root), {**CONTEXT, "build": "b2"}) != login
+    assert cache.key(FakeItem(module, "test_login", root), {**CONTEXT, "browser": "firefox"}) != login
+
+def test_key_changes_with_imported_project_module(project, tmp_path):
+    root, module = project
+    item = FakeItem(module, "test_login", root)
+    before = ResultCache(str(tmp_path / "results.json")).key(item, CONTEXT)
+    (root / "rc_page.py").write_text("def open_page():\n    return 'login page'\n", encoding="utf-8")
+    assert ResultCache(str(tmp_path / "results.json")).key(item, CONTEXT) != before
+
+def test_key_changes_with_case_parameters(project, tmp_path):
+    root, module = project
+    cache = ResultCache(str(tmp_path / "results.json"))
+    first = cache.key(FakeItem(module, "test_login", root, params={"case": {"email": "a@b.c"}}), CONTEXT)
+    second = cache.key(FakeItem(module, "test_login", root, params={"case": {"email": "x@y.z"}}), CONTEXT)
+    assert first != second
+
+def test_passed_result_is_reused_and_failure_invalidates(tmp_path):
+    path = str(tmp_path / "results.json")
+    cache = ResultCache(path)
+    cache.record("t::a", "k1", "passed")
+    cache.record("t::b", "k1", "passed")
+    cache.save()
+    
+    cache = ResultCache(path)
+    assert cache.is_passed("t::a", "k1")
+    assert not cache.is_passed("t::a", "k2")
+    cache.record("t::b", "k1", "failed")
+    cache.save()
+    assert not ResultCache(path).is_passed("t::b", "k1")
+    assert list(ResultCache.read(path)) == ["t::a"]
+
+def test_worker_changes_are_merged(tmp_path):
+    path = str(tmp_path / "results.json")
+    ResultCache(path).save()
+    worker = ResultCache(path)
+    worker.record("t::a", "k1", "passed")
+    worker.save_changes(path + ".gw0")
+    
+    main = ResultCache(path)
+    main.merge(ResultCache.read(path + ".gw0"))
+    assert main.is_passed("t::a", "k1")
+
+def test_evict_removes_old_entries(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.json"))
+    cache.merge({
+        "t::old": {"key": "k", "outcome": "passed", "time": time.time() - 10 * 86400},
+        "t::new": {"key": "k", "outcome": "passed", "time": time.time()},
+    })
+    assert cache.evict(7) == 1
+    assert list(cache.entries) == ["t::new"]
+
+def test_broken_cache_file_is_empty(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert ResultCache(str(path)).entries == {}
+
+class VersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"version": "1.2.3"}).encode()
+        self.send_response(200)
+        if self.server.build_header:
+            self.send_header("X-App-Build", "build-42")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+@pytest.mark.parametrize("build_header", [True, False], ids=["header", "body-hash"])
+def test_detect_build(build_header):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VersionHandler)
+    server.build_header = build_header
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    config = Config()
+    config.base_url = "http://127.0.0.1:{}".format(server.server_address[1])
+    try:
+        build = ResultCache.detect_build(config)
+    finally:
+        server.shutdown()
+        server.server_close()
+    body = json.dumps({"version": "1.2.3"}).encode()
+    assert build == ("build-42" if build_header else hashlib.sha1(body).hexdigest()[:16])
+
+def test_detect_build_without_application():
+    config = Config()
+    config.base_url = "http://127.0.0.1:9"
+    assert ResultCache.detect_build(config) is None
+
+def test_result_cache_is_opt_in():
+    assert Config().result_cache is False
+
+# tests/test_scheduler.py
+from types import SimpleNamespace
+import pytest
+from conftest import select_worker_items
+from utils.scheduler import DurationHistory, parse_shard, split_by_hash, split_longest_first
+
+NODE_IDS = [f"tests/test_module_{i % 7}.py::test_case[{i}]" for i in range(40)] + [
+    "tests/test_registration_matrix.py::test_registration_validation[empty name]",
+    "tests/test_registration_matrix.py::test_registration_validation[email without domain]",
+]
+
+class FakeConfig:
+    """Конфигурация pytest с опциями шарда или списка тестов воркера."""
+    
+    def __init__(self, shard=None, worker_tests=None, shard_history=None):
+        self.options = {"--shard": shard, "--worker-tests": worker_tests}
+        self.shard_history = shard_history
+        self.hook = SimpleNamespace(pytest_deselected=lambda items: None)
+        
+    def getoption(self, name):
+        return self.options[name]
+
+def select(config):
+    items = [SimpleNamespace(nodeid=node_id) for node_id in NODE_IDS]
+    select_worker_items(config, items)
+    return [item.nodeid for item in items]
+
+def assert_partition(groups):
+    selected = [node_id for group in groups for node_id in group]
+    assert len(selected) == len(set(selected)), "Тест попал в несколько шардов"
+    assert set(selected) == set(NODE_IDS), "Тест не попал ни в один шард"
+
+def test_parse_shard():
+    assert parse_shard("2/3") == (2, 3)
+    for value in ("0/3", "4/3", "1-3", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+def test_hash_shards_are_disjoint_and_cover_all_tests():
+    for total in (1, 2, 3, 5):
+        assert_partition(split_by_hash(NODE_IDS, total))
+
+def test_hash_shards_are_balanced_by_count():
+    for total in (2, 3, 5):
+        sizes = [len(group) for group in split_by_hash(NODE_IDS, total)]
+        assert max(sizes) - min(sizes) <= 1
+
+def test_sequential_shard_runs_partition_suite(tmp_path):
+    # Между шардами на той же машине меняется локальная история - раскладка не должна меняться
+    history = DurationHistory(str(tmp_path / "durations.json"))
+    groups = []
+    for index in (1, 2, 3):
+        groups.append(select(FakeConfig(shard=f"{index}/3")))
+        history.merge({node_id: 10.0 * index for node_id in groups[-1]})
+        history.save()
+    assert_partition(groups)
+
+def test_duration_balanced_shards_with_shared_history(tmp_path):
+    shared = DurationHistory(str(tmp_path / "shared.json"))
+    shared.merge({node_id: float(i % 5 + 1) for i, node_id in enumerate(NODE_IDS)})
+    groups = [select(FakeConfig(shard=f"{index}/2", shard_history=shared)) for index in (1, 2)]
+    assert_partition(groups)
+    
+    _, loads = split_longest_first(NODE_IDS, shared, 2)
+    assert abs(loads[0] - loads[1]) <= 5.0
+
+def test_worker_tests_file_keeps_ids_with_spaces(tmp_path):
+    worker_file = tmp_path / "gw0.txt"
+    worker_file.write_text("\n".join(NODE_IDS[-2:]), encoding="utf-8")
+    assert select(FakeConfig(worker_tests=str(worker_file))) == NODE_IDS[-2:]
+
+# tests/test_stream_reporter.py
+import json
 import os
+import xml.etree.ElementTree as ElementTree
+from utils.stream_reporter import StreamReporter, build_html, main, merge_summaries, read_stream
 
-class LoginTest(BaseTest):
-    """Тесты для проверки функциональности логина."""
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def record_run(directory, summary_interval=3600, run_id="run-1"):
+    reporter = StreamReporter(str(directory), summary_interval=summary_interval, run_id=run_id)
+    reporter.record("tests/test_login.py::LoginTest::test_ok", "passed", 1.23456)
+    reporter.record("tests/test_login.py::LoginTest::test_bad", "failed", 2.0,
+                    message="Traceback\nAssertionError: <нет> & ошибка", log_path="logs/bad.log",
+                    artifacts=["screenshots/a.png"])
+    reporter.record("tests/test_cart.py::test_skip", "skipped", 0.0, message="нет браузера")
+    return reporter
+
+def test_results_are_visible_before_close(tmp_path):
+    reporter = record_run(tmp_path)
+    reporter.record_artifact("tests/test_login.py::LoginTest::test_bad", "screenshots/late.png")
+    reporter.record_artifact("tests/test_login.py::LoginTest::test_bad", None)
     
-    def setUp(self):
-        """Подготовка к тесту."""
-        super().setUp()
+    events = lines(tmp_path / StreamReporter.RESULTS_FILE)
+    assert [(e["event"], e.get("outcome")) for e in events] == [
+        ("result", "passed"), ("result", "failed"), ("result", "skipped"), ("artifact", None)
+    ]
+    assert events[0]["duration"] == 1.235
+    assert events[1]["log"] == "logs/bad.log" and events[1]["artifacts"] == ["screenshots/a.png"]
+    reporter.close()
+
+def test_junit_is_valid_after_close(tmp_path):
+    reporter = record_run(tmp_path)
+    reporter.close()
+    reporter.close()
+    
+    suite = ElementTree.parse(tmp_path / StreamReporter.JUNIT_FILE).getroot()
+    cases = suite.findall("testcase")
+    assert [(c.get("classname"), c.get("name")) for c in cases] == [
+        ("tests.test_login.LoginTest", "test_ok"),
+        ("tests.test_login.LoginTest", "test_bad"),
+        ("tests.test_cart", "test_skip"),
+    ]
+    failure = cases[1].find("failure")
+    assert failure.get("message") == "AssertionError: <нет> & ошибка"
+    assert failure.text.startswith("Traceback")
+    assert cases[2].find("skipped").text == "нет браузера"
+    assert cases[0].get("time") == "1.235"
+
+def test_summary_is_updated_during_run_and_finished_on_close(tmp_path):
+    reporter = record_run(tmp_path, summary_interval=0)
+    with open(tmp_path / StreamReporter.SUMMARY_FILE, encoding="utf-8") as f:
+        running = json.load(f)
+    assert (running["finished"], running["total"]) == (False, 3)
+    assert running["recent_failures"] == [{"test": "tests/test_login.py::LoginTest::test_bad",
+                                           "log": "logs/bad.log", "artifacts": ["screenshots/a.png"]}]
+    
+    reporter.close()
+    with open(tmp_path / StreamReporter.SUMMARY_FILE, encoding="utf-8") as f:
+        finished = json.load(f)
+    assert finished["finished"] and finished["counts"] == {"passed": 1, "failed": 1, "skipped": 1}
+    assert not os.path.exists(str(tmp_path / StreamReporter.SUMMARY_FILE) + ".tmp")
+
+def test_long_messages_keep_the_tail(tmp_path):
+    reporter = StreamReporter(str(tmp_path))
+    reporter.record("t::long", "failed", 0.1, message="x" * 10000 + "конец")
+    reporter.close()
+    message = lines(tmp_path / StreamReporter.RESULTS_FILE)[0]["message"]
+    assert len(message) == StreamReporter.MAX_MESSAGE and message.endswith("конец")
+
+def test_partial_last_line_is_skipped(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"event": "result"}\n{"event": "resu', encoding="utf-8")
+    assert list(read_stream([str(path)])) == [{"event": "result"}]
+
+def test_html_report_from_several_workers(tmp_path):
+    for worker in ("gw0", "gw1"):
+        record_run(tmp_path / worker).close()
+    output = tmp_path / "out" / "report.html"
+    counts = build_html([str(tmp_path / w / StreamReporter.RESULTS_FILE) for w in ("gw0", "gw1")], str(output))
+    
+    assert counts == {"passed": 2, "failed": 2, "skipped": 2}
+    page = output.read_text(encoding="utf-8")
+    assert "failed: 2, passed: 2, skipped: 2" in page
+    assert "&lt;нет&gt; &amp; ошибка" in page and "<нет>" not in page
+    assert page.count('<tr class="failed">') == 2
+
+def test_merge_summaries_of_running_and_finished_workers(tmp_path):
+    record_run(tmp_path / "gw0").close()
+    running = record_run(tmp_path / "gw1", summary_interval=0)
+    merged = merge_summaries([str(tmp_path / w / StreamReporter.SUMMARY_FILE) for w in ("gw0", "gw1")])
+    running.close()
+    
+    assert merged["finished"] is False and merged["total"] == 6
+    assert merged["counts"] == {"passed": 2, "failed": 2, "skipped": 2}
+    assert len(merged["recent_failures"]) == 2
+
+def test_cli_finds_worker_reports(tmp_path, capsys):
+    for worker in ("gw0", "gw1"):
+        record_run(tmp_path / worker / "stream").close()
+    output = str(tmp_path / "report.html")
+    
+    assert main(["summary", str(tmp_path)]) == 0
+    assert main(["html", str(tmp_path), "-o", output]) == 0
+    printed = capsys.readouterr().out
+    assert "Прогон завершён, тестов: 6; failed: 2, passed: 2, skipped: 2" in printed
+    assert printed.count("FAILED tests/test_login.py::LoginTest::test_bad") == 2
+    assert f"HTML-отчёт: {output}, тестов: 6" in printed
+
+def test_summary_is_empty_until_first_result(tmp_path):
+    (tmp_path / StreamReporter.SUMMARY_FILE).write_text(json.dumps({"total": 500}), encoding="utf-8")
+    reporter = StreamReporter(str(tmp_path), summary_interval=3600)
+    
+    with open(tmp_path / StreamReporter.SUMMARY_FILE, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert (summary["finished"], summary["total"], summary["counts"]) == (False, 0, {"passed": 0, "failed": 0, "skipped": 0})
+    reporter.close()
+
+def test_cli_ignores_reports_of_previous_run(tmp_path, capsys):
+    # Последовательный прогон, затем параллельный: reports/stream остался от первого
+    record_run(tmp_path / "stream", run_id="old").close()
+    for worker in ("gw0", "gw1"):
+        record_run(tmp_path / worker / "stream", run_id="new").close()
+    output = str(tmp_path / "report.html")
+    
+    assert main(["summary", str(tmp_path)]) == 0
+    assert main(["html", str(tmp_path), "-o", output]) == 0
+    printed = capsys.readouterr().out
+    assert "тестов: 6;" in printed
+    assert f"HTML-отчёт: {output}, тестов: 6" in printed
+
+def test_cli_without_reports(tmp_path, capsys):
+    assert main(["summary", str(tmp_path)]) == 1
+    assert main(["html", str(tmp_path)]) == 1
+    assert "Сводки не найдены" in capsys.readouterr().out
+
+# tests/test_tracer.py
+import json
+import zipfile
+import pytest
+from config.config import Config
+from utils.driver_factory import DriverFactory
+from utils.tracer import Tracer
+
+class FakeDriver:
+    """Драйвер, считающий обращения к браузеру."""
+    
+    def __init__(self):
+        self.calls = []
         
-        # Настройка логирования
-        log_file = os.path.join("logs", f"login_test_{self._testMethodName}.log")
-        self.logger = Logger.setup_logger(self.config.log_level, log_file)
+    def execute_script(self, script):
+        self.calls.append("execute_script")
+        return {"url": "http://app/cart", "title": "Корзина", "html": "<html><body>cart</body></html>"}
         
-        # Инициализация страниц
-        self.login_page = LoginPage(self.driver)
-        self.home_page = HomePage(self.driver)
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append(cmd)
+        return {"data": "anBn"}
         
-    def test_successful_login(self):
-        """Тест успешного входа в систему."""
-        self.logger.info("Начало теста успешного входа")
+    def get_log(self, log_type):
+        self.calls.append("get_log")
+        return [{"level": "SEVERE", "message": "boom", "timestamp": 0},
+                {"level": "INFO", "message": "after", "timestamp": 10 ** 13}]
+
+def run_steps(tracer, driver, count):
+    tracer.start_test("tests/test_cart.py::test_add")
+    for index in range(count):
+        with tracer.step("click", "CartPage", ("id", f"item-{index}"), driver):
+            pass
+
+def test_steps_do_not_touch_browser():
+    driver = FakeDriver()
+    tracer = Tracer(size=3)
+    run_steps(tracer, driver, 5)
+    
+    assert driver.calls == []
+    assert [step["locator"] for step in tracer.steps] == [["id", "item-2"], ["id", "item-3"], ["id", "item-4"]]
+
+def test_nested_steps_are_recorded_once_with_error():
+    tracer = Tracer()
+    tracer.start_test("test_nested")
+    with pytest.raises(ValueError):
+        with tracer.step("fill_form", "Form", None, FakeDriver()):
+            with tracer.step("input_text", "Form", ("id", "name"), FakeDriver()):
+                raise ValueError("нет поля")
+                
+    assert [(step["action"], step["error"]) for step in tracer.steps] == [("fill_form", "ValueError: нет поля")]
+
+def test_flush_captures_page_state_once(tmp_path):
+    driver = FakeDriver()
+    tracer = Tracer(size=5)
+    run_steps(tracer, driver, 2)
+    path = tracer.flush(str(tmp_path), "call")
+    
+    assert driver.calls == ["execute_script", "get_log"]
+    with zipfile.ZipFile(path) as archive:
+        trace = json.loads(archive.read("trace.json"))
+        assert archive.read("dom.html") == b"<html><body>cart</body></html>"
+    assert trace["state"] == {"url": "http://app/cart", "title": "Корзина", "dom_size": 30, "dom": "dom.html"}
+    assert [entry["message"] for entry in trace["console"]] == ["after"]
+    assert len(trace["steps"]) == 2 and not tracer.steps
+
+def test_flush_survives_closed_browser(tmp_path):
+    class ClosedDriver(FakeDriver):
+        def execute_script(self, script):
+            raise RuntimeError("no such window")
+            
+    tracer = Tracer()
+    run_steps(tracer, ClosedDriver(), 1)
+    with zipfile.ZipFile(tracer.flush(str(tmp_path), "teardown")) as archive:
+        trace = json.loads(archive.read("trace.json"))
         
-        # Открыть страницу логина
-        self.login_page.open_login_page(f"{self.config.base_url}/login")
+    assert trace["state"] == {"capture_error": "no such window"}
+    assert "dom.html" not in archive.namelist()
+
+def test_screenshots_are_stored_per_step(tmp_path):
+    driver = FakeDriver()
+    tracer = Tracer(screenshots=True)
+    run_steps(tracer, driver, 2)
+    with zipfile.ZipFile(tracer.flush(str(tmp_path), "call")) as archive:
+        trace = json.loads(archive.read("trace.json"))
+        assert archive.read("screenshots/step_001.jpg") == b"jpg"
         
-        # Войти в систему
-        self.login_page.login("testuser", "password123")
+    assert [step["screenshot"] for step in trace["steps"]] == ["screenshots/step_000.jpg", "screenshots/step_001.jpg"]
+
+def test_flush_without_steps_writes_nothing(tmp_path):
+    tracer = Tracer()
+    tracer.start_test("test_empty")
+    assert tracer.flush(str(tmp_path), "call") is None
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.parametrize("trace_steps, backend_mode, expected", [
+    (0, "live", {}),
+    (20, "live", {"browser": "ALL"}),
+    (0, "record", {"performance": "ALL"}),
+    (20, "record", {"browser": "ALL", "performance": "ALL"}),
+])
+def test_logging_prefs_follow_config(trace_steps, backend_mode, expected):
+    config = Config()
+    config.trace_steps = trace_steps
+    config.backend_mode = backend_mode
+    assert DriverFactory()._logging_prefs(config) == expected
+
+# tests/test_visual.py
+import os
+import subprocess
+import sys
+import pytest
+from utils.visual import VisualComparator
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    """Эталоны из кэша не переходят между тестами."""
+    monkeypatch.setattr(VisualComparator, "_cache", type(VisualComparator._cache)())
+
+@pytest.fixture
+def comparator(tmp_path):
+    return VisualComparator(str(tmp_path / "baselines"), str(tmp_path / "diffs"), tolerance=0.0, threshold=0.1)
+
+def image(value=100, size=(10, 20)):
+    return np.full(size + (3,), value, dtype=np.uint8)
+
+def test_first_run_saves_baseline(comparator):
+    result = comparator.compare("button", image())
+    assert result.passed and result.baseline_created
+    assert np.array_equal(comparator.load_baseline("button"), image())
+
+def test_color_difference_below_threshold_passes(comparator):
+    comparator.compare("button", image(100))
+    # 20/255 ≈ 0.078 меньше порога 0.1 при любом весе каналов
+    result = comparator.compare("button", image(120))
+    assert result.passed and result.mismatch == 0.0
+
+def test_color_difference_above_threshold_fails_with_heatmap(comparator):
+    comparator.compare("button", image(100))
+    result = comparator.compare("button", image(140))
+    assert not result.passed and result.mismatch == 1.0
+    assert os.path.exists(result.diff_path)
+
+def test_tolerance_allows_share_of_changed_pixels(comparator):
+    comparator.compare("banner", image())
+    changed = image()
+    changed[0, :5] = 255
+    assert comparator.compare("banner", changed, tolerance=0.05).passed
+    result = comparator.compare("banner", changed, tolerance=0.01)
+    assert not result.passed and result.mismatch == pytest.approx(5 / 200)
+
+def test_ignored_region_is_excluded_from_mismatch(comparator):
+    comparator.compare("page", image())
+    changed = image()
+    changed[2:4, 5:15] = 0
+    # Область (x, y, ширина, высота) закрывает все изменённые пиксели
+    assert comparator.compare("page", changed, ignore=[(5, 2, 10, 2)]).passed
+    result = comparator.compare("page", changed, ignore=[(5, 2, 5, 2)])
+    assert result.mismatch == pytest.approx(10 / (200 - 10))
+
+def test_mask_clips_regions_outside_image():
+    mask = VisualComparator.mask((4, 4, 3), [(-2, -2, 3, 3), (3, 3, 10, 10)])
+    assert mask.tolist() == [
+        [False, True, True, True],
+        [True, True, True, True],
+        [True, True, True, True],
+        [True, True, True, False],
+    ]
+
+def test_size_change_fails_without_comparison(comparator):
+    comparator.compare("card", image(size=(10, 20)))
+    result = comparator.compare("card", image(size=(12, 20)))
+    assert not result.passed and result.diff_path is None
+
+def test_batch_keeps_order_across_shapes(comparator):
+    comparator.compare_batch([("a", image(size=(4, 4)), ()), ("b", image(size=(6, 6)), ()), ("c", image(size=(4, 4)), ())])
+    results = comparator.compare_batch([
+        ("a", image(size=(4, 4)), ()), ("b", image(255, size=(6, 6)), ()), ("c", image(size=(4, 4)), ())
+    ])
+    assert [(r.name, r.passed) for r in results] == [("a", True), ("b", False), ("c", True)]
+
+def test_visual_module_imports_without_numpy_and_pillow():
+    code = ("import sys; sys.modules['numpy'] = None; sys.modules['PIL'] = None; "
+            "import base.base_page, utils.visual, utils.artifacts")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+# tests/test_wait_engine.py
+import pytest
+from selenium.common.exceptions import JavascriptException, WebDriverException
+from selenium.webdriver.common.by import By
+from base import wait_engine
+from base.wait_engine import WaitEngine
+
+BUTTON = (By.ID, "submit")
+ERROR = (By.CLASS_NAME, "error")
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
         
-        # Проверить, что вход выполнен успешно
-        self.assertTrue(
-            self.home_page.is_user_logged_in(),
-            "Пользователь не вошел в систему после ввода корректных данных"
-        )
+    def is_displayed(self):
+        return self.displayed
+
+class FakeDriver:
+    """Драйвер, у которого элементы появляются после заданного числа опросов."""
+    
+    def __init__(self, appear_after=None, async_error=None):
+        self.appear_after = appear_after or {}
+        self.async_error = async_error
+        self.polls = {}
+        self.async_calls = 0
         
-        # Проверить приветственное сообщение
-        welcome_message = self.home_page.get_welcome_message()
-        self.assertIn(
-            "testuser", 
-            welcome_message, 
-            f"Приветственное сообщение не содержит имя пользователя. Текст: {welcome_message}"
-        )
+    def find_elements(self, by, value):
+        locator = (by, value)
+        self.polls[locator] = self.polls.get(locator, 0) + 1
+        element = self.appear_after.get(locator)
+        if element is None or self.polls[locator] < element[0]:
+            return []
+        return [element[1]]
         
-        self.logger.info("Тест успешного входа завершен")
+    def execute_script(self, script):
+        return "complete"
         
-    def test_failed_login(self):
-        """Тест неудачного входа в систему."""
-        self.logger.info("Начало теста неудачного входа")
+    def execute_async_script(self, script, *args):
+        self.async_calls += 1
+        raise self.async_error
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Виртуальное время: sleep сдвигает часы и запоминает интервалы опроса."""
+    state = {"now": 0.0, "sleeps": []}
+    
+    def sleep(seconds):
+        state["sleeps"].append(seconds)
+        state["now"] += seconds
         
-        # Открыть страницу логина
-        self.login_page.open_login_page(f"{self.config.base_url}/login")
+    monkeypatch.setattr(wait_engine.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(wait_engine.time, "sleep", sleep)
+    monkeypatch.setattr(WaitEngine, "strategy", WaitEngine.POLL)
+    monkeypatch.setattr(WaitEngine, "poll_interval", 0.05)
+    monkeypatch.setattr(WaitEngine, "max_poll_interval", 0.5)
+    return state
+
+def test_poll_returns_element_once_present(clock):
+    element = FakeElement()
+    driver = FakeDriver({BUTTON: (3, element)})
+    
+    assert WaitEngine(driver).until_present(BUTTON, timeout=5) is element
+    assert driver.polls[BUTTON] == 3
+
+def test_poll_interval_grows_up_to_maximum(clock):
+    WaitEngine(FakeDriver()).until_present(BUTTON, timeout=5)
+    
+    # Последняя пауза обрезается по оставшемуся времени
+    sleeps = clock["sleeps"][:-1]
+    assert sleeps[0] == pytest.approx(0.05)
+    assert all(later >= earlier for earlier, later in zip(sleeps, sleeps[1:]))
+    assert max(sleeps) == pytest.approx(0.5)
+
+def test_poll_timeout_returns_nothing(clock):
+    assert WaitEngine(FakeDriver()).wait_for([(WaitEngine.PRESENT, BUTTON)], timeout=2) == (None, None)
+    assert clock["now"] == pytest.approx(2)
+
+def test_first_satisfied_condition_wins(clock):
+    error = FakeElement()
+    driver = FakeDriver({ERROR: (2, error), BUTTON: (10, FakeElement())})
+    
+    result = WaitEngine(driver).wait_for([(WaitEngine.PRESENT, BUTTON), (WaitEngine.PRESENT, ERROR)], 5)
+    
+    assert result == (1, error)
+
+def test_visible_condition_skips_hidden_element(clock):
+    driver = FakeDriver({BUTTON: (1, FakeElement(displayed=False))})
+    assert WaitEngine(driver).until_visible(BUTTON, timeout=1) is None
+
+def test_page_loaded_in_poll_mode(clock):
+    assert WaitEngine(FakeDriver()).until_page_loaded(timeout=1)
+
+def test_event_strategy_falls_back_to_poll_without_async_scripts(clock):
+    element = FakeElement()
+    driver = FakeDriver({BUTTON: (1, element)}, async_error=WebDriverException("unsupported"))
+    engine = WaitEngine(driver)
+    engine.strategy = WaitEngine.EVENT
+    
+    assert engine.until_present(BUTTON, timeout=5) is element
+    assert engine.strategy == WaitEngine.POLL
+    engine.until_present(BUTTON, timeout=5)
+    assert driver.async_calls == 1
+
+def test_event_strategy_polls_after_repeated_script_errors(clock):
+    element = FakeElement()
+    driver = FakeDriver({BUTTON: (1, element)}, async_error=JavascriptException("reloaded"))
+    engine = WaitEngine(driver)
+    engine.strategy = WaitEngine.EVENT
+    
+    assert engine.until_present(BUTTON, timeout=5) is element
+    assert driver.async_calls == WaitEngine.MAX_SCRIPT_ERRORS
+
+# tests/data/registration_cases.yaml
+# Таблица проверок формы регистрации: значения случая дополняют defaults,
+# errors - ожидаемые фрагменты сообщений об ошибках полей
+defaults:
+  name: Иван Иванов
+  email: ivan@example.com
+  password: Password123!
+  confirm_password: Password123!
+  terms: true
+cases:
+  - id: valid_registration
+    values: {}
+  - id: empty_name
+    values: {name: ""}
+    errors: {name: обязательное поле}
+  - id: empty_email
+    values: {email: ""}
+    errors: {email: обязательное поле}
+  - id: email_without_at
+    values: {email: invalid-email}
+    errors: {email: валидный email}
+  - id: email_without_domain
+    values: {email: "ivan@"}
+    errors: {email: валидный email}
+  - id: short_password
+    values: {password: "123", confirm_password: "123"}
+    errors: {password: не менее 8 символов}
+  - id: password_mismatch
+    values: {confirm_password: Password321!}
+    errors: {confirm_password: пароли не совпадают}
+  - id: terms_not_accepted
+    values: {terms: false}
+    errors: {terms: условия использования}
+  - id: all_empty
+    values: {name: "", email: "", password: "", confirm_password: "", terms: false}
+    errors:
+      name: обязательное поле
+      email: обязательное поле
+      password: обязательное поле
+      terms: условия использования
+
+# benchmarks/static_server.py
+import functools
+import logging
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Обработчик статики без вывода каждого запроса в консоль."""
+    
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format, *args)
+
+class StaticServer:
+    """Локальный HTTP-сервер для статических страниц в отдельном потоке."""
+    
+    def __init__(self, root, host="127.0.0.1", port=0):
+        handler = functools.partial(QuietHandler, directory=root)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
         
-        # Войти с неверными учетными данными
-        self.login_page.login("wronguser", "wrongpassword")
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
         
-        # Проверить, что вход не выполнен
-        self.assertFalse(
-            self.login_page.is_login_successful(),
-            "Система позволила войти с неверными данными"
-        )
+    def __enter__(self):
+        self.thread.start()
+        return self
         
-        # Проверить сообщение об ошибке
-        error_message = self.login_page.get_error_message()
-        self.assertIn(
-            "неверный", 
-            error_message.lower(), 
-            f"Неожиданное сообщение об ошибке: {error_message}"
-        )
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+# benchmarks/bench_framework.py
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from datetime import datetime
+import psutil
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+from benchmarks.static_server import StaticServer
+from config.config import Config
+from utils.driver_factory import DriverFactory
+from utils.driver_pool import DriverPool
+from utils.logger import Logger
+from utils.profiler import Profiler
+
+# Сравниваемые конфигурации фреймворка: каждая отличается от соседней одной
+# настройкой. Неявное ожидание действует только на опрос find_elements, поэтому
+# сравнивается с опросом без него, а опрос - с ожиданием событий
+CONFIGURATIONS = {
+    "explicit-pooled-batched": {"implicit_wait": 0, "wait_strategy": "event", "pooled": True, "batched": True},
+    "explicit-poll-pooled-batched": {"implicit_wait": 0, "wait_strategy": "poll", "pooled": True, "batched": True},
+    "implicit-pooled-batched": {"implicit_wait": 5, "wait_strategy": "poll", "pooled": True, "batched": True},
+    "explicit-fresh-batched": {"implicit_wait": 0, "wait_strategy": "event", "pooled": False, "batched": True},
+    "explicit-pooled-per-field": {"implicit_wait": 0, "wait_strategy": "event", "pooled": True, "batched": False},
+}
+
+def fill(page, values, batched):
+    """Заполнить поля одним запросом или по одному полю."""
+    if batched:
+        page.fill_form(values)
+    else:
+        for locator, value in values.items():
+            page.input_text(locator, value)
+
+def read(page, locators, batched):
+    """Прочитать тексты одним запросом или по одному элементу."""
+    if batched:
+        return page.read_many(locators)
+    return [page.get_text(locator) for locator in locators]
+
+def task_manager_scenario(page, base_url, batched):
+    """Создание задачи в T1/task_manager_app.html."""
+    page.open(f"{base_url}/T1/task_manager_app.html")
+    page.wait_for_page_load()
+    fill(page, {
+        (By.ID, "taskTitle"): "Бенчмарк",
+        (By.ID, "taskDescription"): "Замер накладных расходов фреймворка",
+    }, batched)
+    page.click((By.CSS_SELECTOR, "#taskForm button[type='submit']"))
+    read(page, [(By.ID, "totalTasks"), (By.ID, "completedTasks"), (By.ID, "pendingTasks")], batched)
+
+def task_tracker_scenario(page, base_url, batched):
+    """Создание задачи в T1/buggy_task_tracker.html."""
+    page.open(f"{base_url}/T1/buggy_task_tracker.html")
+    page.wait_for_page_load()
+    fill(page, {
+        (By.ID, "title"): "Бенчмарк",
+        (By.ID, "description"): "Замер накладных расходов фреймворка",
+    }, batched)
+    page.click((By.ID, "submitBtn"))
+    page.is_element_visible((By.CSS_SELECTOR, "#tasksList .task-item"))
+    read(page, [(By.ID, "mainTitle"), (By.ID, "tasksTitle")], batched)
+
+def projectile_form_scenario(page, base_url, batched):
+    """Ввод параметров в infotecs/ZD.html (кнопки «Старт» не нажимаются - они вешают страницу)."""
+    page.open(f"{base_url}/infotecs/ZD.html")
+    page.wait_for_page_load()
+    fill(page, {(By.ID, "V"): "10", (By.ID, "alpha"): "45"}, batched)
+    page.click((By.CSS_SELECTOR, "button.arrow-button.up"))
+    page.find_element((By.ID, "V"))
+
+SCENARIOS = {
+    "task_manager": task_manager_scenario,
+    "task_tracker": task_tracker_scenario,
+    "projectile_form": projectile_form_scenario,
+}
+
+def percentiles(values):
+    """p50 и p95 по методу ближайшего ранга."""
+    if not values:
+        return {"p50": None, "p95": None, "count": 0}
+    ordered = sorted(values)
+    
+    def rank(q):
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
         
-        self.logger.info("Тест неудачного входа завершен")
+    return {"p50": rank(0.5), "p95": rank(0.95), "count": len(ordered)}
+
+def session_memory_mb(driver):
+    """Память драйвера и всех процессов браузера, МБ."""
+    service = getattr(driver, "service", None)
+    if service is None or service.process is None:
+        return None
+    root = psutil.Process(service.process.pid)
+    processes = [root] + root.children(recursive=True)
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+def run_configuration(name, settings, base_url, browser, iterations):
+    """Прогнать все сценарии в одной конфигурации."""
+    config = Config()
+    config.browser = browser
+    config.implicit_wait = settings["implicit_wait"]
+    config.wait_strategy = settings["wait_strategy"]
+    factory = DriverFactory()
+    pool = DriverPool.from_config(config, factory) if settings["pooled"] else None
+    
+    profiler = Profiler()
+    profiler.activate()
+    startups, memory, scenario_times = [], [], {}
+    try:
+        for iteration in range(iterations):
+            for scenario_name, scenario in SCENARIOS.items():
+                start = time.perf_counter()
+                driver = pool.acquire() if pool else factory.get_configured_driver(config)
+                startups.append(time.perf_counter() - start)
+                
+                profiler.start_test(f"{scenario_name}#{iteration}")
+                start = time.perf_counter()
+                scenario(BasePage(driver), base_url, settings["batched"])
+                elapsed = time.perf_counter() - start
+                profiler.finish_test(elapsed, "passed")
+                scenario_times.setdefault(scenario_name, []).append(elapsed)
+                
+                mb = session_memory_mb(driver)
+                if mb is not None:
+                    memory.append(mb)
+                if pool:
+                    pool.release(driver)
+                else:
+                    driver.quit()
+    finally:
+        profiler.deactivate()
+        if pool:
+            pool.shutdown()
+            
+    actions = {}
+    for test in profiler.tests:
+        scenario_name = test["test"].split("#")[0]
+        for step in test["steps"]:
+            actions.setdefault(f"{scenario_name}.{step['action']}", []).append(step["wall"])
+            
+    logging.getLogger(__name__).info("Конфигурация %s завершена", name)
+    return {
+        "settings": settings,
+        "startup": percentiles(startups),
+        "memory_mb": percentiles(memory),
+        "scenarios": {key: percentiles(values) for key, values in scenario_times.items()},
+        "actions": {key: percentiles(values) for key, values in sorted(actions.items())},
+        "round_trips": profiler.round_trips,
+    }
+
+def compare(old_path, new_path):
+    """Вывести изменение p50/p95 между двумя прогонами."""
+    with open(old_path, 'r', encoding="utf-8") as f:
+        old = json.load(f)["configs"]
+    with open(new_path, 'r', encoding="utf-8") as f:
+        new = json.load(f)["configs"]
+        
+    for name in sorted(set(old) & set(new)):
+        print(f"[{name}]")
+        rows = [("startup", old[name]["startup"], new[name]["startup"])]
+        rows += [(key, old[name]["scenarios"][key], value)
+                 for key, value in new[name]["scenarios"].items() if key in old[name]["scenarios"]]
+        rows += [(key, old[name]["actions"][key], value)
+                 for key, value in new[name]["actions"].items() if key in old[name]["actions"]]
+        for key, before, after in rows:
+            if before["p50"] is None or after["p50"] is None:
+                continue
+            change = (after["p50"] - before["p50"]) / before["p50"] * 100 if before["p50"] else 0.0
+            print(f"  {key:45s} p50 {before['p50'] * 1000:8.1f} -> {after['p50'] * 1000:8.1f} мс ({change:+.1f}%)"
+                  f"  p95 {before['p95'] * 1000:8.1f} -> {after['p95'] * 1000:8.1f} мс")
+
+def main(argv=None):
+    """Точка входа: python -m benchmarks.bench_framework [--iterations N] [--compare old.json new.json]."""
+    parser = argparse.ArgumentParser(description="Замер накладных расходов фреймворка на локальных страницах")
+    parser.add_argument("--iterations", type=int, default=10, help="Число повторов каждого сценария")
+    parser.add_argument("--browser", default="chrome", help="Браузер, например chrome-fast")
+    parser.add_argument("--configs", default=",".join(CONFIGURATIONS), help="Конфигурации через запятую")
+    parser.add_argument("--root", default="..", help="Каталог со страницами T1/ и infotecs/")
+    parser.add_argument("--output", default=None, help="Файл результатов JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Сравнить два файла результатов")
+    args = parser.parse_args(argv)
+    
+    if args.compare:
+        compare(*args.compare)
+        return 0
+        
+    Logger.setup_logger()
+    results = {
+        "meta": {"started": datetime.now().isoformat(), "browser": args.browser, "iterations": args.iterations},
+        "configs": {},
+    }
+    with StaticServer(os.path.abspath(args.root)) as server:
+        for name in args.configs.split(","):
+            results["configs"][name] = run_configuration(
+                name, CONFIGURATIONS[name], server.base_url, args.browser, args.iterations
+            )
+            
+    output = args.output or os.path.join(
+        Config().reports_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    directory = os.path.dirname(output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(output, 'w', encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+    print(f"Результаты сохранены: {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
 
 # conftest.py
 import pytest
+import asyncio
+import inspect
+import logging
 import os
-import time
 from datetime import datetime
-from selenium import webdriver
 from utils.driver_factory import DriverFactory
+from utils.driver_pool import DriverPool
+from utils.grid import GridClient
 from config.config import Config
-from utils.logger import Logger
+from utils.artifacts import ArtifactWriter
+from utils.async_webdriver import AsyncDriverFactory
+from utils.auth import AuthHelper
+from utils.backend_stub import BackendStub
+from utils.logger import Logger, current_test_log
+from utils.profiler import Profiler
+from utils.result_cache import ResultCache
+from utils.scheduler import DurationHistory, durations_path, parse_shard, split_by_hash, split_longest_first
+from utils.stream_reporter import RUN_ID_ENV, StreamReporter
+from utils.tracer import Tracer
+from utils.visual import VisualComparator
 
 def pytest_addoption(parser):
     """Добавить опции командной строки."""
     parser.addoption("--browser", action="store", default="chrome", help="Выберите браузер")
     parser.addoption("--env", action="store", default="dev", help="Выберите среду (dev/stage/prod)")
+    parser.addoption("--shard", action="store", default=None, help="Запустить только шард i/n (для нескольких машин CI)")
+    parser.addoption("--worker-tests", action="store", default=None, help="Файл со списком тестов воркера (используется parallel_runner)")
+    parser.addoption("--backend", action="store", default=None, choices=["live", "record", "replay"],
+                     help="Работа с бэкендом: live, запись трафика (record) или ответы из HAR (replay)")
+    parser.addoption("--perf-profile", action="store_true", default=False, help="Замерять время действий и команд драйвера")
+    parser.addoption("--result-cache", action="store_true", default=False,
+                     help="Пропускать тесты, прошедшие на той же сборке с тем же кодом")
+    parser.addoption("--force-full-run", action="store_true", default=False,
+                     help="Запустить все тесты, не пропуская прошедшие по кэшу результатов")
+    parser.addoption("--evict-results", action="store", type=float, default=None, metavar="DAYS",
+                     help="Удалить из кэша результатов записи старше DAYS дней")
+    parser.addoption("--update-visual", action="store_true", default=False, help="Перезаписать эталоны визуальных проверок")
+    parser.addoption("--trace-steps", action="store", type=int, default=None,
+                     help="Хранить трассу N последних шагов и сохранять её при падении теста")
+    parser.addoption("--trace-screenshots", action="store_true", default=False,
+                     help="Добавлять в трассу скриншот после каждого шага")
+
+def pytest_configure(config):
+    """Подготовить сбор длительности тестов."""
+    qa_config = Config()
+    config.duration_history = DurationHistory(qa_config.durations_file)
+    shard = config.getoption("--shard")
+    config.durations_output = durations_path(qa_config.durations_file, shard, qa_config.worker_id)
+    config.shard_history = None
+    if shard:
+        if qa_config.shard_durations_file:
+            config.shard_history = DurationHistory(qa_config.shard_durations_file)
+    config.measured_durations = {}
+    
+    # Кэш результатов прошедших тестов; без идентификатора сборки не используется.
+    # Сборка запрашивается у приложения, только если кэш включён и тесты будут выполняться
+    config.result_cache = None
+    config.result_cache_skipped = 0
+    if (config.getoption("--result-cache") or qa_config.result_cache) and not config.option.collectonly:
+        build = ResultCache.detect_build(qa_config)
+        if build is None:
+            logging.getLogger(__name__).warning("Сборка приложения не определена, кэш результатов не используется")
+        else:
+            config.result_cache = ResultCache(qa_config.result_cache_file)
+            config.result_cache_output = qa_config.result_cache_file
+            if qa_config.worker_id:
+                config.result_cache_output = f"{qa_config.result_cache_file}.{qa_config.worker_id}"
+            # Среда берётся из опций командной строки, как в фикстуре config
+            config.result_cache_context = {
+                "build": build,
+                "environment": config.getoption("--env"),
+                "browser": config.getoption("--browser"),
+                "base_url": qa_config.base_url,
+                "browser_profile": qa_config.browser_profile,
+                "backend_mode": config.getoption("--backend") or qa_config.backend_mode,
+            }
+    
+    # Эталоны визуальных проверок
+    if config.getoption("--update-visual"):
+        qa_config.visual_update = True
+    VisualComparator.configure(qa_config)
+    
+    # Скриншоты падений пишутся в фоне, повторяющиеся сохраняются один раз
+    config.artifact_writer = ArtifactWriter(
+        qa_config.screenshots_dir,
+        workers=qa_config.artifact_workers,
+        max_width=qa_config.screenshot_max_width,
+        budget_mb=qa_config.artifacts_budget_mb,
+    )
+    
+    # Результаты пишутся в поток сразу после каждого теста, сводку можно читать во время прогона.
+    # Сбор тестов без запуска не перезаписывает отчёт предыдущего прогона
+    config.stream_reporter = None
+    if qa_config.stream_report and not config.option.collectonly:
+        config.stream_reporter = StreamReporter(
+            os.path.join(qa_config.reports_dir, "stream"), run_id=os.environ.get(RUN_ID_ENV)
+        )
+    
+    # Профилирование действий страниц и команд драйвера
+    config.profiler = None
+    if config.getoption("--perf-profile") or qa_config.perf_profile:
+        config.profiler = Profiler(top_n=qa_config.perf_top_n)
+        config.profiler.activate()
+        config.profile_path = os.path.join(
+            qa_config.reports_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+        )
+        
+    # Трасса последних шагов для разбора падений
+    config.tracer = None
+    config.traces_dir = qa_config.traces_dir
+    trace_steps = config.getoption("--trace-steps")
+    if trace_steps is None:
+        trace_steps = qa_config.trace_steps
+    trace_screenshots = config.getoption("--trace-screenshots") or qa_config.trace_screenshots
+    if trace_steps:
+        config.tracer = Tracer(size=trace_steps, screenshots=trace_screenshots)
+        config.tracer.activate()
+
+def pytest_collection_modifyitems(config, items):
+    """Оставить тесты текущего воркера или шарда и пропустить прошедшие по кэшу."""
+    select_worker_items(config, items)
+    skip_cached_passes(config, items)
+
+def select_worker_items(config, items):
+    """Оставить только тесты текущего воркера или шарда."""
+    worker_tests = config.getoption("--worker-tests")
+    shard = config.getoption("--shard")
+    if worker_tests:
+        # Один идентификатор на строку: в идентификаторах бывают пробелы
+        with open(worker_tests, 'r', encoding="utf-8") as f:
+            selected = set(f.read().splitlines())
+    elif shard:
+        index, total = parse_shard(shard)
+        node_ids = [item.nodeid for item in items]
+        if config.shard_history is not None:
+            groups, _ = split_longest_first(node_ids, config.shard_history, total)
+        else:
+            groups = split_by_hash(node_ids, total)
+        selected = set(groups[index - 1])
+    else:
+        return
+        
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+
+def skip_cached_passes(config, items):
+    """Пропустить тесты, прошедшие с тем же кодом на той же сборке."""
+    cache = config.result_cache
+    if cache is None:
+        return
+    force = config.getoption("--force-full-run")
+    cached = 0
+    for item in items:
+        item.result_key = cache.key(item, config.result_cache_context)
+        if not force and cache.is_passed(item.nodeid, item.result_key):
+            item.add_marker(pytest.mark.skip(reason="Результат из кэша: тест уже прошёл на этой сборке"))
+            item.result_cached = True
+            cached += 1
+    config.result_cache_skipped = cached
+    if cached:
+        logging.getLogger(__name__).info("Пропущено по кэшу результатов: %s", cached)
+
+def pytest_sessionfinish(session):
+    """Дописать артефакты и потоковый отчёт, сохранить кэш результатов и замеры длительности тестов."""
+    config = session.config
+    config.artifact_writer.shutdown()
+    if config.stream_reporter:
+        config.stream_reporter.close()
+    cache = config.result_cache
+    if cache is not None:
+        if config.result_cache_output != cache.path:
+            cache.save_changes(config.result_cache_output)
+        else:
+            days = config.getoption("--evict-results")
+            if days is not None:
+                cache.evict(days)
+            cache.save()
+    if config.profiler:
+        config.profiler.save(config.profile_path)
+    if not config.measured_durations:
+        return
+    if config.durations_output == config.duration_history.path:
+        history = config.duration_history
+    else:
+        history = DurationHistory(config.durations_output)
+    history.merge(config.measured_durations)
+    history.save(config.durations_output)
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Вывести пропуски по кэшу, загрузку грида и самые медленные локаторы, страницы и тесты."""
+    if config.result_cache_skipped:
+        terminalreporter.write_line(
+            f"Пропущено по кэшу результатов: {config.result_cache_skipped} (полный прогон: --force-full-run)",
+            yellow=True,
+        )
+    for client in GridClient.clients():
+        stats = client.stats()
+        terminalreporter.section("Грид")
+        for endpoint in stats["endpoints"]:
+            start = endpoint["session_start"]
+            state = " (недоступен)" if endpoint["down"] else ""
+            terminalreporter.write_line(
+                f"  {endpoint['url']}{state}: сессий {endpoint['sessions']}, ошибок {endpoint['failures']}, "
+                f"создание сессии {start['mean']:.2f} с (макс. {start['max']:.2f} с)"
+            )
+        queue = stats["queue"]
+        terminalreporter.write_line(f"  Ожидание в очереди: {queue['mean']:.2f} с (макс. {queue['max']:.2f} с)")
+    if not config.profiler:
+        return
+    summary = config.profiler.summary()
+    terminalreporter.section("Профиль прогона")
+    for title, key in (("Локаторы", "slowest_locators"), ("Страницы", "slowest_pages"), ("Тесты", "slowest_tests")):
+        terminalreporter.write_line(f"{title}:")
+        for row in summary[key]:
+            terminalreporter.write_line(f"  {row['time']:8.3f} с  {row['name']}")
+    if os.path.exists(config.profile_path):
+        terminalreporter.write_line(f"Профиль сохранён: {config.profile_path}")
+
+def pytest_unconfigure(config):
+    """Закрыть цикл событий асинхронных тестов."""
+    loop = getattr(config, "event_loop", None)
+    if loop is not None:
+        loop.close()
+
+def get_event_loop(config):
+    """Общий цикл событий асинхронных тестов и фикстур сессии."""
+    if getattr(config, "event_loop", None) is None:
+        config.event_loop = asyncio.new_event_loop()
+    return config.event_loop
+
+def pytest_pyfunc_call(pyfuncitem):
+    """Выполнить тест, объявленный через async def, в общем цикле событий."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    get_event_loop(pyfuncitem.config).run_until_complete(pyfuncitem.obj(**arguments))
+    return True
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Начать замеры и трассу теста до подготовки фикстур."""
+    if item.config.profiler:
+        item.config.profiler.start_test(item.nodeid)
+    if item.config.tracer:
+        item.config.tracer.start_test(item.nodeid)
 
 @pytest.fixture(scope="session")
 def config(request):
@@ -441,30 +8269,101 @@ def config(request):
     # Переопределить настройки
     cfg.browser = browser
     cfg.environment = env
+    backend = request.config.getoption("--backend")
+    if backend:
+        cfg.backend_mode = backend
+    # Трасса из командной строки: фабрика включает по ней журнал консоли браузера
+    trace_steps = request.config.getoption("--trace-steps")
+    if trace_steps is not None:
+        cfg.trace_steps = trace_steps
+    if request.config.getoption("--trace-screenshots"):
+        cfg.trace_screenshots = True
     
     return cfg
 
+@pytest.fixture(scope="session")
+def driver_pool(config):
+    """Фикстура для пула драйверов на всю сессию."""
+    pool = DriverPool.from_config(config, DriverFactory())
+    yield pool
+    pool.shutdown()
+
 @pytest.fixture(scope="function")
-def driver(config):
+def driver(request, config):
     """Фикстура для драйвера."""
     # Инициализировать логгер
-    log_dir = "logs"
+    log_dir = config.logs_dir
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    log_file = os.path.join(log_dir, f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-    logger = Logger.setup_logger(config.log_level, log_file)
+    log_file = os.path.join(log_dir, f"test_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.log")
+    Logger.setup_logger(config.log_level, json_format=config.log_format == "json")
+    log_token = Logger.set_test_log(log_file)
     
     # Получить драйвер
-    driver_factory = DriverFactory()
-    driver = driver_factory.get_driver(config.browser)
-    driver.maximize_window()
-    driver.implicitly_wait(config.implicit_wait)
+    if config.use_driver_pool:
+        pool = request.getfixturevalue("driver_pool")
+        driver = pool.acquire()
+    else:
+        driver = DriverFactory().get_configured_driver(config)
+        
+    # Записать или подменить ответы бэкенда до первой навигации теста
+    backend = BackendStub.from_config(config)
+    if backend:
+        backend.start(driver, request.node.nodeid)
     
     # Вернуть драйвер для использования в тесте
     yield driver
     
-    # Закрыть драйвер после теста
-    driver.quit()
+    if backend:
+        backend.stop(driver)
+    
+    # Вернуть драйвер в пул или закрыть его после теста
+    if config.use_driver_pool:
+        pool.release(driver)
+    else:
+        driver.quit()
+    current_test_log.reset(log_token)
+
+@pytest.fixture(scope="module")
+def module_driver(request, config):
+    """Фикстура драйвера на весь модуль: тесты по таблицам случаев работают на одной загрузке страницы."""
+    Logger.setup_logger(config.log_level, json_format=config.log_format == "json")
+    if config.use_driver_pool:
+        pool = request.getfixturevalue("driver_pool")
+        driver = pool.acquire()
+    else:
+        driver = DriverFactory().get_configured_driver(config)
+        
+    yield driver
+    
+    if config.use_driver_pool:
+        pool.release(driver)
+    else:
+        driver.quit()
+
+@pytest.fixture(scope="session")
+def async_driver_factory(request, config):
+    """Фикстура фабрики асинхронных сессий с общим пулом соединений."""
+    factory = AsyncDriverFactory.from_config(config)
+    yield factory
+    get_event_loop(request.config).run_until_complete(factory.close())
+
+@pytest.fixture(scope="function")
+def async_driver(request, async_driver_factory):
+    """Фикстура асинхронного драйвера для тестов async def."""
+    loop = get_event_loop(request.config)
+    driver = loop.run_until_complete(async_driver_factory.new_driver())
+    yield driver
+    loop.run_until_complete(driver.quit())
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, config):
+    """Фикстура для драйвера с выполненным через API входом (без формы логина)."""
+    auth = AuthHelper(config)
+    session = auth.login(config.auth_username, config.auth_password)
+    injection = auth.inject(driver, session)
+    yield driver
+    AuthHelper.eject(driver, injection)
 
 @pytest.fixture(scope="function")
 def screenshot_on_failure(request, driver, config):
@@ -472,18 +8371,19 @@ def screenshot_on_failure(request, driver, config):
     yield
     
     # Проверить, завершился ли тест с ошибкой
-    if request.node.rep_call.failed and config.take_screenshot_on_failure:
-        # Создать каталог для скриншотов, если он не существует
-        if not os.path.exists(config.screenshots_dir):
-            os.makedirs(config.screenshots_dir)
-            
-        # Создать имя файла
-        file_name = f"{request.node.name}_{time.time()}.png"
-        screenshot_path = os.path.join(config.screenshots_dir, file_name)
-        
-        # Сохранить скриншот
-        driver.save_screenshot(screenshot_path)
-        print(f"Скриншот сохранён: {screenshot_path}")
+    writer = request.config.artifact_writer
+    if request.node.rep_call.failed and config.take_screenshot_on_failure and not writer.exhausted:
+        # Снять скриншот в память; сжатие и запись выполняются в фоне,
+        # имя файла - хэш содержимого (список по тестам - в index.jsonl)
+        future = writer.submit(request.node.nodeid, driver.get_screenshot_as_png())
+        reporter = request.config.stream_reporter
+        if future and reporter:
+            # Путь к скриншоту известен только после записи, он дописывается в поток отдельным событием
+            nodeid = request.node.nodeid
+            future.add_done_callback(
+                lambda done: reporter.record_artifact(nodeid, None if done.exception() else done.result())
+            )
+        print(f"Скриншот поставлен в очередь записи: {writer.directory}")
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -493,6 +8393,43 @@ def pytest_runtest_makereport(item, call):
     
     # Установить атрибут для последующего использования в фикстуре screenshot_on_failure
     setattr(item, f"rep_{rep.when}", rep)
+    
+    # Суммировать длительность фаз setup, call и teardown для планировщика
+    durations = item.config.measured_durations
+    durations[item.nodeid] = durations.get(item.nodeid, 0.0) + rep.duration
+    
+    # Лог теста известен, пока фикстура драйвера не сбросила его в teardown
+    if rep.when == "call":
+        item.test_log = current_test_log.get()
+    
+    # Сохранить трассу, пока драйвер теста ещё не возвращён в пул
+    if rep.failed and item.config.tracer:
+        trace_path = item.config.tracer.flush(item.config.traces_dir, rep.when)
+        if trace_path:
+            rep.sections.append(("trace", trace_path))
+            item.trace_paths = getattr(item, "trace_paths", []) + [trace_path]
+    
+    if rep.when == "teardown":
+        reports = [getattr(item, f"rep_{when}", None) for when in ("setup", "call", "teardown")]
+        outcomes = [r.outcome for r in reports if r is not None]
+        outcome = "failed" if "failed" in outcomes else "skipped" if "skipped" in outcomes else "passed"
+        if item.config.profiler:
+            item.config.profiler.finish_test(durations[item.nodeid], outcome)
+        if hasattr(item, "result_key") and not getattr(item, "result_cached", False):
+            item.config.result_cache.record(item.nodeid, item.result_key, outcome)
+        if item.config.stream_reporter:
+            failed = [r for r in reports if r is not None and (r.failed or r.skipped)]
+            message = None
+            if failed:
+                # У пропущенного теста longrepr - кортеж (файл, строка, причина)
+                longrepr = failed[0].longrepr
+                message = longrepr[2] if isinstance(longrepr, tuple) else failed[0].longreprtext
+            item.config.stream_reporter.record(
+                item.nodeid, outcome, durations[item.nodeid],
+                message=message,
+                log_path=getattr(item, "test_log", None),
+                artifacts=getattr(item, "trace_paths", ()),
+            )
 
 # requirements.txt
 selenium==4.10.0
@@ -502,3 +8439,9 @@ webdriver-manager==4.0.0
 requests==2.31.0
 python-dotenv==1.0.0
 allure-pytest==2.13.2
+psutil==5.9.5
+# Необязательные: визуальные проверки и уменьшение скриншотов
+numpy==1.24.3
+Pillow==9.5.0
+aiohttp==3.8.5
+PyYAML==6.0.1